@@ -0,0 +1,213 @@
+import hashlib
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from lib.clock_logging import logger
+from lib.image_store import image_store, load_image
+
+# Every image derived from one cover kept on disk: the 199px and 46px resizes and their four-gray
+# dithers (cheaper stand-in dithers, see lib/render_quality.py, are kept in memory only)
+VARIANTS = ("resize", "thumbnail", "dither", "thumbnail_dither")
+# Covers that are never evicted (the "no album art" fallback)
+PINNED_KEYS = ("NA",)
+
+
+def art_key(track_image_link: str) -> str:
+    """
+    Content key for a cover, a short hash of its URL (Spotify image URLs are immutable per image).
+    """
+    return hashlib.sha1(track_image_link.encode("utf-8")).hexdigest()[:16]
+
+
+class AlbumArtCache:
+    """
+    Derived album art variants, kept as decoded images in memory for the few most recently
+    used covers and, if persist is set, written behind to cache/album_art/{key}_{variant}.PNG
+    by a background thread so a later start (or a cover that fell out of memory) can
+    skip the download, resize and dither too.
+
+    Nothing on the draw path waits on the disk: put() hands images straight to the caller's
+    next get(). Safe to use from the album art worker's threads as well as the main one.
+
+    On disk, covers are evicted least recently used first once there are more than
+    max_entries of them or they take up more than max_bytes; recency is kept in the
+    files' mtimes so it survives restarts.
+    """
+    def __init__(self, cache_dir: str = "cache/album_art", max_entries: int = 48, max_bytes: int = 8 * 1024 * 1024, max_memory_entries: int = 4, persist: bool = True):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_memory_entries = max_memory_entries
+        self.persist = persist
+        # key -> {variant: image}, least recently used first
+        self.images: Dict[str, Dict[str, Image.Image]] = OrderedDict()
+        # key -> total bytes of its variants on disk, least recently used first
+        self.entries: Dict[str, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.write_queue: "queue.Queue[Tuple[str, str, Image.Image]]" = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+        if persist:
+            self._scan()
+
+    def _scan(self) -> None:
+        """
+        Rebuild the on-disk LRU order from whatever's already there, oldest mtime first.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pattern = re.compile(r"^([0-9a-f]{16})_(%s)\.PNG$" % "|".join(VARIANTS))
+        found: Dict[str, list] = {}
+        for name in os.listdir(self.cache_dir):
+            match = pattern.match(name)
+            if match:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entry = found.setdefault(match.group(1), [0.0, 0])
+                entry[0] = max(entry[0], stat.st_mtime)
+                entry[1] += stat.st_size
+        for key, (_, size) in sorted(found.items(), key=lambda item: item[1][0]):
+            self.entries[key] = size
+
+    def path(self, key: str, variant: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}_{variant}.PNG")
+
+    def has(self, key: str, *variants: str) -> bool:
+        """
+        True if every one of the given variants of key is in memory or on disk.
+        """
+        in_memory = self.images.get(key, {})
+        return all(variant in in_memory or (self.persist and os.path.exists(self.path(key, variant))) for variant in variants)
+
+    def lookup(self, key: str, *variants: str) -> bool:
+        """
+        Like has(), but counts a hit or miss and marks key as just used on a hit.
+        """
+        if not self.has(key, *variants):
+            self.misses += 1
+            return False
+        self.hits += 1
+        self.touch(key)
+        return True
+
+    def get(self, key: str, variant: str) -> Optional[Image.Image]:
+        """
+        Return a variant of key, decoding it from disk into memory if it isn't there yet.
+        """
+        image = self.images.get(key, {}).get(variant)
+        if image is None and self.persist:
+            try:
+                image = load_image(self.path(key, variant))
+            except (FileNotFoundError, OSError):
+                return None
+            self._remember(key, variant, image)
+        return image
+
+    def put(self, key: str, variant: str, image: Image.Image, persist: bool = True) -> None:
+        """
+        Store a variant of key in memory and, unless persist is False, queue it to be written to disk.
+        """
+        self._remember(key, variant, image)
+        if not (persist and self.persist):
+            return
+        if self.writer is None:
+            self.writer = threading.Thread(target=self._write_behind, name="album-art-writer", daemon=True)
+            self.writer.start()
+        self.write_queue.put((key, variant, image))
+
+    def _remember(self, key: str, variant: str, image: Image.Image) -> None:
+        """
+        Keep image in memory as key's variant. Covers pushed out of memory are only dropped,
+        not closed: the draw path, the album art worker or the disk writer may still be using
+        their images, and they're freed once the last of those lets go.
+        """
+        evicted = []
+        with self.lock:
+            variants = self.images.setdefault(key, {})
+            variants[variant] = image
+            image_store.track("album_art", key, variants.values())
+            self.images.move_to_end(key)
+            while len(self.images) > self.max_memory_entries:
+                oldest = next(iter(self.images))
+                if oldest == key:
+                    break
+                del self.images[oldest]
+                evicted.append(oldest)
+        for oldest in evicted:
+            image_store.release("album_art", oldest)
+
+    def _write_behind(self) -> None:
+        while True:
+            key, variant, image = self.write_queue.get()
+            try:
+                image.save(self.path(key, variant), "PNG")
+                self.record(key)
+            except OSError as e:
+                logger.error("Failed to write %s: %s", self.path(key, variant), e)
+            finally:
+                self.write_queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Block until every queued variant has been written to disk.
+        """
+        self.write_queue.join()
+
+    def touch(self, key: str) -> None:
+        """
+        Mark key as the most recently used cover.
+        """
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+        if not self.persist:
+            return
+        for variant in VARIANTS:
+            try:
+                os.utime(self.path(key, variant))
+            except OSError:
+                pass
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+
+    def record(self, key: str) -> None:
+        """
+        Account for key's variants on disk after new ones were written, then evict down to the bounds.
+        """
+        size = 0
+        for variant in VARIANTS:
+            try:
+                size += os.path.getsize(self.path(key, variant))
+            except OSError:
+                pass
+        with self.lock:
+            self.entries[key] = size
+            self.entries.move_to_end(key)
+            self.evict(keep=key)
+
+    def evict(self, keep: str = "") -> None:
+        """
+        Delete the least recently used covers (never keep, or a pinned key) from disk until
+        within max_entries and max_bytes. Call with self.lock held.
+        """
+        evictable = [key for key in self.entries if key != keep and key not in PINNED_KEYS]
+        while evictable and (len(self.entries) > self.max_entries or sum(self.entries.values()) > self.max_bytes):
+            key = evictable.pop(0)
+            for variant in VARIANTS:
+                try:
+                    os.remove(self.path(key, variant))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error("Failed to evict %s: %s", self.path(key, variant), e)
+            del self.entries[key]
+            logger.info("Evicted album art %s from cache", key)
+
+
+album_art_cache = AlbumArtCache()
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from lib.album_art_cache import album_art_cache
+from lib.clock_logging import logger
+from lib.dither import dither_variant
+from lib.misc import Misc
+
+
+class AlbumArtWorker:
+    """
+    Runs the album art pipeline (download, resize and, if pre_dither is set, both dithers) in
+    the background, so the clock can start it the moment Spotify reports a new cover and
+    only collect the result when it draws.
+
+    One thread fetches and resizes covers, one at a time, then dithers the 199px resize
+    while a second thread dithers the 46px thumbnail. The dithers spend most of their
+    time in Pillow and NumPy, which release the GIL, so the two really run side by side.
+    """
+    def __init__(self, misc: Misc, pre_dither: bool, dither_algorithm: str):
+        self.misc = misc
+        self.pre_dither = pre_dither
+        self.dither_algorithm = dither_algorithm
+        self.fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="album-art")
+        self.ditherer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="album-art-dither")
+        self.lock = threading.Lock()
+        self.track_image_link: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    def submit(self, track_image_link: str) -> Future:
+        """
+        Start processing the cover at track_image_link, unless it's already processing or done.
+        A cover whose download failed is tried again.
+
+        Returns:
+            Future: Resolves to the cover's album art cache key, or None if it couldn't be downloaded.
+        """
+        with self.lock:
+            if track_image_link == self.track_image_link and not self._failed(self.future):
+                return self.future
+            self.track_image_link = track_image_link
+            self.future = self.fetcher.submit(self._process, track_image_link)
+            return self.future
+
+    @staticmethod
+    def _failed(future: Future) -> bool:
+        return future.done() and (future.exception() is not None or future.result() is None)
+
+    def _process(self, track_image_link: str) -> Optional[str]:
+        key = self.misc.get_album_art(track_image_link)
+        if key is None or not self.pre_dither:
+            return key
+        thumbnail = self.ditherer.submit(dither_variant, key, "thumbnail_dither", self.dither_algorithm)
+        dither_variant(key, "dither", self.dither_algorithm)
+        thumbnail.result()
+        return key
+
+    def result(self, track_image_link: str, timeout: float) -> Optional[str]:
+        """
+        Wait up to timeout seconds for the cover at track_image_link, submitting it if it wasn't yet.
+
+        Returns:
+            Optional[str]: The cover's album art cache key, or None if it isn't ready in time or failed.
+        """
+        future = self.submit(track_image_link)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.info("Album art still processing after %.1fs, keeping the previous cover for now", timeout)
+        except Exception as e:
+            logger.error("Album art processing failed: %s", e)
+        return None
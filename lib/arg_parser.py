@@ -1,8 +1,21 @@
 import argparse
 
-parser = argparse.ArgumentParser()
+# Every lib module imports these flags, including the ones run as their own scripts
+# (python -m lib.spotify_reauth) and under pytest, so leave arguments and --help we
+# don't know about to those scripts' own parsers. main.py checks its whole command
+# line with main_parser().
+parser = argparse.ArgumentParser(add_help=False)
 parser.add_argument('-v', action='store_true', help='Enable Verbose Logging')
 parser.add_argument('--clock', action='store_true', help='Enable clock')
 parser.add_argument('--local', action='store_true', help='Force write to test_output/')
+parser.add_argument('--fake_epd', action='store_true', help='Drive a simulated EPD (lib/fake_epd.py) instead of the Waveshare panel')
+parser.add_argument('--serve', metavar='[HOST:]PORT', help='Also serve each frame as a packed panel buffer over HTTP (lib/frame_server.py), on loopback unless HOST is given')
 
-args = parser.parse_args()
+args, _ = parser.parse_known_args()
+
+
+def main_parser() -> argparse.ArgumentParser:
+    """
+    The clock's own command line: the flags above plus --help, rejecting anything else.
+    """
+    return argparse.ArgumentParser(parents=[parser])
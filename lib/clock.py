@@ -1,15 +1,27 @@
 import json
-import os
 import re
-import shutil
 import sys
 import threading
 from time import time, sleep
 from datetime import timedelta, datetime as dt
 from typing import NoReturn, Optional, Tuple
 
+from lib.album_art_cache import album_art_cache
+from lib.album_art_worker import AlbumArtWorker
+from lib.arg_parser import args
+from lib.clock_state import ClockState, TrackState, freeze
 from lib.display_settings import DisplaySettings, display_settings
 from lib.draw import Draw
+from lib.epd_buffer import EPD_WIDTH, EPD_HEIGHT, pack_frame
+from lib.fake_epd import FakeEPD
+from lib.frame_diff import FrameGate
+from lib.frame_ring import FrameRing
+from lib.frame_server import FrameServer, parse_address
+from lib.image_store import image_store
+from lib.partial_refresh import align_window, display_window
+from lib.refresh_policy import GhostingPolicy, RefreshPolicy
+from lib.render_quality import TIERS, ArtQuality, tier_variant
+from lib.refresh_timer import RefreshTimer
 from lib.weather import Weather, WeatherInfo, SunsetInfo, FourHourForecast
 from lib.spotify_user import SpotifyUser
 from lib.misc import Misc
@@ -18,6 +30,10 @@ from lib.clock_logging import logger
 # How many days out from a refresh token's 180-day expiry to start showing
 # the on-screen reauth warning (see SpotifyUser.days_until_reauth_required).
 REAUTH_WARNING_DAYS = 14
+# How long build_image waits on a new cover before drawing the previous one instead
+ALBUM_ART_DEADLINE_SECONDS = 1.5
+# Margin on top of the render and refresh estimates when scheduling a frame
+PUSH_SLACK_SECONDS = 1.0
 
 class Clock:
     """
@@ -27,52 +43,100 @@ class Clock:
     def __init__(self) -> None:
         logger.info("\n\t-- Clock Init --\n-----------------------------------------------------------------------------------------------------")
         self.local_run: bool = False
-        try:
-            from waveshare_epd import epd4in2_V2, epd4in2 # type: ignore
-        except ImportError:
-            self.local_run = True
 
         # EPD vars/settings
         self.ds: DisplaySettings = display_settings
-        self.epd: Optional[None] = None
-        if not self.local_run:
-            self.epd = epd4in2_V2.EPD() if self.ds.use_epd_lib_V2 else epd4in2.EPD()
+        self.epd: Optional[None] = self.make_epd()
         self.did_epd_init: bool = False
+        self.refresh_policy: RefreshPolicy = self.make_refresh_policy()
         self.loops_until_weather_refresh: int = 5
         self.weather_refresh_loop_count: int = 0
-        self.time_elapsed: float = 15.0
-        self.old_time: Optional[dt] = None
+        self.refresh_timer: RefreshTimer = RefreshTimer()
         self.flip_to_dark: bool = self.ds.always_dark_mode
+        self.frame_gate: FrameGate = FrameGate()
+        self.frame_server: Optional[FrameServer] = self.make_frame_server()
+        self.frame_ring: Optional[FrameRing] = self.make_frame_ring()
+        # how long Draw took over the frame on the canvas
+        self.render_ms: float = 0.0
+        # the ClockState the canvas currently shows
+        self.rendered_state: Optional[ClockState] = None
 
         # Weather/Sunset vars
         self.weather_info: Optional[WeatherInfo] = None
         self.sunset_info: Optional[SunsetInfo] = None
         self.four_hour_forecast: Optional[FourHourForecast] = None
-        self.get_new_album_art: Optional[bool] = False if self.ds.single_user else None
         self.draw_detailed_weather: bool = False
 
         # Initialize Info/Drawing Libs/Users
         self.image_obj: Draw = Draw(self.local_run)
-        self.weather: Weather = Weather()
-        self.misc: Misc = Misc()
-        self.spotify_user_1: SpotifyUser = SpotifyUser(self.ds.name_1, self.ds.single_user)
+        self.weather: Weather = self.make_weather()
+        self.misc: Misc = self.make_misc()
+        # with a render budget, covers are dithered at the tier each frame can afford instead of up front
+        self.art_quality: ArtQuality = ArtQuality(self.ds.render_budget_seconds)
+        # the cover waiting to be dithered in spare time while an older one stands in for it
+        self.pending_album_art: Optional[str] = None
+        self.album_art_worker: Optional[AlbumArtWorker] = AlbumArtWorker(self.misc, self.ds.four_gray_scale and not self.ds.render_budget_seconds, self.ds.dither_algorithm) if self.ds.single_user else None
+        self.spotify_user_1: SpotifyUser = self.make_spotify_user(self.ds.name_1, main_user=True)
         self.track_1 = ""
         self.artist_1 = ""
         self.time_since_1 = ""
         self.track_image_link = ""
         self.ctx_type_1: str = ""
         self.ctx_title_1: str = ""
-        self.old_album_name1: str = ""
         self.album_name_1: str = ""
-        self.spotify_user_2: Optional[SpotifyUser] = SpotifyUser(self.ds.name_2, self.ds.single_user, main_user=False) if not self.ds.single_user else None
+        self.album_art_key: str = "NA"
+        self.spotify_user_2: Optional[SpotifyUser] = self.make_spotify_user(self.ds.name_2, main_user=False) if not self.ds.single_user else None
         self.ctx_type_2: str = ""
         self.ctx_title_2: str = ""
 
+    def make_epd(self):
+        """
+        The panel to push frames to: the simulated one with --fake_epd, the Waveshare one if its
+        library is installed, else None and local_run is set so frames are saved to test_output/.
+        """
+        if args.fake_epd:
+            return FakeEPD(v2=self.ds.use_epd_lib_V2)
+        try:
+            from waveshare_epd import epd4in2_V2, epd4in2 # type: ignore
+        except ImportError:
+            self.local_run = True
+            return None
+        return epd4in2_V2.EPD() if self.ds.use_epd_lib_V2 else epd4in2.EPD()
+
+    def make_frame_server(self) -> Optional[FrameServer]:
+        """
+        The server thin clients fetch frames from, started if --serve was given.
+        """
+        if not args.serve:
+            return None
+        server = FrameServer(*parse_address(args.serve))
+        server.start()
+        return server
+
+    def make_frame_ring(self) -> Optional[FrameRing]:
+        """
+        Where every pushed frame is kept for looking back at (python -m lib.frame_ring), unless frame_ring_slots is 0.
+        """
+        return FrameRing(self.ds.frame_ring_slots) if self.ds.frame_ring_slots else None
+
+    def make_weather(self) -> Weather:
+        """
+        Where the clock's data comes from: make_weather, make_misc (album art downloads) and
+        make_spotify_user. lib/render_bench.py overrides them to render from fixtures.
+        """
+        return Weather()
+
+    def make_misc(self) -> Misc:
+        return Misc()
+
+    def make_spotify_user(self, name: str, main_user: bool) -> SpotifyUser:
+        return SpotifyUser(name, self.ds.single_user, main_user=main_user)
+
     def get_reauth_warning_days(self) -> Optional[int]:
         """
         Days left before a configured user's Spotify refresh token expires,
         if within the warning window (or already expired, at 0) — else None.
-        Drives the bottom-bar reauth banner in Draw.draw_date_time_temp.
+        Drives the bottom-bar reauth banner in Draw.update_bottom_bar.
         """
         users = [self.spotify_user_1] + ([self.spotify_user_2] if self.spotify_user_2 else [])
         if any(u.needs_reauth for u in users):
@@ -94,11 +158,8 @@ class Clock:
         Sets the sunset information for the clock.
         """
         self.sunset_info: SunsetInfo = self.weather.get_sunset_info()
-        flip_to_dark_before: bool = self.flip_to_dark
         if self.ds.sunset_flip:
             self.flip_to_dark = self.misc.has_sun_set(self.sunset_info, self.ds.sunset_flip) or self.ds.always_dark_mode
-            if not flip_to_dark_before and self.flip_to_dark:
-                self.get_new_album_art = True
 
     def set_four_hour_forecast(self) -> None:
         """
@@ -132,22 +193,46 @@ class Clock:
             except Exception as cleanup_err:
                 logger.error("Failed to clean up EPD GPIO/SPI after failed init: %s", cleanup_err)
 
+    def start_epd(self) -> bool:
+        """
+        Initializes the EPD in a thread, giving it 45 seconds before giving up on the process entirely.
+        Only called right before a push, so frames the FrameGate skips never wake the panel.
+
+        Returns:
+            bool: True if the EPD is ready for a push, False if init failed and should be retried next loop.
+        """
+        self.epd_init_success = False
+        thread = threading.Thread(target=self.init_epd)
+        thread.start()
+        thread.join(45)
+        if thread.is_alive():
+            logger.error("Failed to init EPD in 45 seconds")
+            print("Failed to initialize EPD within 45 seconds, exiting program.", file=sys.stdout)
+            sys.exit(1)
+        if not self.epd_init_success:
+            return False
+        logger.info("EPD Initialized")
+        self.did_epd_init = True
+        return True
+
     def tick_tock(self):
         """
         Main loop for the clock functionality.
         continuously updates the clock display and handles various operations based on the current time.
 
+        Each frame is rendered ahead of the minute it shows, then held until the push can
+        start just early enough for the refresh to finish on that minute, going by the
+        RefreshTimer's running estimates of how long rendering and each refresh mode take.
+
         The loop body is wrapped in try/except so a single bad iteration logs and sleeps
         instead of crashing the process and forcing launch_epaper.sh to restart it.
         SystemExit (e.g. EPD init failure) and BaseException are deliberately not caught.
         """
         while True:
             try:
-                # Get 24H clock c_hour to determine sleep duration before refresh
-                date = dt.now() + timedelta(seconds=self.time_elapsed)
-                c_hour = int(date.strftime("%-H"))
-                # Used to 'push' our clock timing forward to account for EPD time
-                start = time()
+                # The minute boundary the next frame is for, far enough out to render and push it in time
+                target = self.next_frame_time()
+                c_hour = target.hour
 
                 # from 2:01 - 5:59am, put the EPD to sleep and idle in-process
                 # (checking every 5 min) instead of exiting — keeps us off
@@ -161,95 +246,57 @@ class Clock:
                         logger.info("still sleeping... %s", dt.now().strftime('%-I:%M%p'))
                         sleep(300)
                     continue
-                elif not self.did_epd_init:
-                    if not self.local_run:
-                        # try initing the EPD for a total of 45 seconds
-                        self.epd_init_success = False
-                        thread = threading.Thread(target=self.init_epd)
-                        thread.start()
-                        thread.join(45)
-                        if thread.is_alive():
-                            logger.error("Failed to init EPD in 45 seconds")
-                            print("Failed to initialize EPD within 45 seconds, exiting program.", file=sys.stdout)
-                            sys.exit(1)
-                        elif not self.epd_init_success:
-                            logger.error("EPD init failed, retrying next loop")
-                            sleep(30)
-                            continue
-                        else:
-                            logger.info("EPD Initialized")
-                    self.did_epd_init = True
-
-                self.image_obj.clear_image()
+
+                render_start = time()
                 if self.weather_info is None or self.weather_refresh_loop_count >= self.loops_until_weather_refresh:
                     self.set_weather()
                     self.set_sunset_info()
                     if self.ds.detailed_weather_forecast and self.draw_detailed_weather:
                         self.set_four_hour_forecast()
-                sec_left, time_str = self.get_time_from_date_time()
+                time_str = self.format_time(target)
                 logger.info("Time: %s", time_str)
-                try:
-                    open_fd_count = len(os.listdir(f"/proc/{os.getpid()}/fd"))
-                    logger.info("Open FDs: %d", open_fd_count)
-                except OSError:
-                    pass
+                logger.info("Resources: %s", image_store.report())
 
                 self.build_image(time_str)
+                self.refresh_timer.record("render", time() - render_start)
+                layout_cache = self.image_obj.layout_cache
+                logger.info("Layout cache: %d hits, %d misses, %d entries", layout_cache.hits, layout_cache.misses, len(layout_cache))
+                logger.info("Widget render ms: %s", self.image_obj.widget_timings())
+
+                frame_changed = not self.frame_gate.is_unchanged(self.image_obj.get_image_obj())
+                if frame_changed and not self.local_run and not self.did_epd_init and not self.start_epd():
+                    logger.error("EPD init failed, retrying next loop")
+                    sleep(30)
+                    continue
+                self.show_frame(target)
+                if not self.local_run and self.did_epd_init and self.ds.sleep_epd and (not self.ds.partial_update or self.flip_to_dark):
+                    logger.info("\tSleeping EPD")
+                    self.epd.sleep()
+                    self.did_epd_init = False
 
-                if self.did_epd_init:
-                    if not self.local_run:
-                        logger.info("\tDrawing Image to EPD")
-                        if self.ds.four_gray_scale:
-                            self.epd.display_4Gray(self.epd.getbuffer_4Gray(self.image_obj.get_image_obj()))
-                        else:
-                            self.epd.display(self.epd.getbuffer(self.image_obj.get_image_obj()))
-                        if self.ds.sleep_epd and (not self.ds.partial_update or self.flip_to_dark):
-                            logger.info("\tSleeping EPD")
-                            self.epd.sleep()
-                            self.did_epd_init = False
-                    else:
-                        logger.info("\tSaving Image Locally")
-                        self.save_local_file()
-
-                # Look @ start variable above. find out how long it takes to compute our image
-                stop = time()
-
-                self.time_elapsed = stop - start
-                remaining_time = sec_left - self.time_elapsed
                 if 5 < c_hour and c_hour < 23:
                     # 6:00am - 10:59pm update screen every 3 minutes
-                    logger.info("\t%.2f\tseconds per loop\tsleeping for %d seconds", round(self.time_elapsed, 2), int(remaining_time/1+120))
-                    if not (self.ds.partial_update and not self.flip_to_dark):
-                        sleep(max(2+remaining_time+120, 0))
-                    else:
+                    frame_minutes = 3
+                    if self.ds.partial_update and not self.flip_to_dark:
                         # if we do partial updates and darkmode, you get a worrisome zebra stripe artifact on the EPD
-                        # Create new time image, push to display, full update after 2 partials
-                        partial_update_count = 0
-                        while partial_update_count < 3:
-                            date = dt.now()
-                            sec_left = 62 - int(date.strftime("%S"))
-
-                            if partial_update_count < 2:
-                                logger.info("\t%s sleep, partial_update", round(sec_left, 2))
-                                sleep(sec_left)
-                            else:
-                                logger.info("\t%.2f\tseconds per loop\tsleeping for %d seconds", round(self.time_elapsed, 2), int(remaining_time/1+120))
-                                sleep(sec_left-self.time_elapsed)
-
-                            if sec_left > 5 and partial_update_count < 2:
-                                date = dt.now()
-                                time_str = date.strftime("%-H:%M") if self.ds.twenty_four_hour_clock else date.strftime("%-I:%M") + date.strftime("%p").lower()
-                                logger.info("\ttime_str:%s", time_str)
-                                self.image_obj.draw_date_time_temp(self.weather_info, time_str)
-                                if not self.local_run:
-                                    self.epd.display_Fast(self.epd.getbuffer(self.image_obj.get_image_obj()))
-                                else:
-                                    self.save_local_file()
-                            partial_update_count += 1
-                elif c_hour >= 23 or c_hour < 2:
+                        # Render the next two minutes' time ahead and push just the changed window for each; the
+                        # refresh policy forces a full update once ghosting or the full refresh interval calls for one
+                        for minute in (1, 2):
+                            boundary = target + timedelta(minutes=minute)
+                            self.sleep_until(boundary, self.refresh_timer.estimate("render") + self.refresh_timer.estimate("window") + PUSH_SLACK_SECONDS)
+                            time_str = self.format_time(boundary)
+                            logger.info("\ttime_str:%s", time_str)
+                            self.render_state(self.rendered_state._replace(time_str=time_str, reauth_days_left=self.get_reauth_warning_days()))
+                            if self.local_run or self.did_epd_init or self.start_epd():
+                                self.show_frame(boundary)
+                else:
                     # 11:00pm - 1:59am update screen every 5ish minutes
-                    logger.info("\t%.2f\tseconds per loop\tsleeping for %d seconds", round(self.time_elapsed, 2), int(remaining_time+240))
-                    sleep(max(2+remaining_time+240, 0))
+                    frame_minutes = 5
+                next_target = target + timedelta(minutes=frame_minutes)
+                logger.info("\tNext frame for %s, refresh estimates: %s", self.format_time(next_target), {mode: round(seconds, 2) for mode, seconds in self.refresh_timer.estimates.items()})
+                self.upgrade_album_art(next_target)
+                # wake a little early so next_frame_time() still lands on next_target
+                self.sleep_until(next_target, self.frame_lead_seconds() + PUSH_SLACK_SECONDS)
 
                 # Increment counter for Weather requests
                 self.weather_refresh_loop_count = 0 if self.weather_refresh_loop_count == self.loops_until_weather_refresh else self.weather_refresh_loop_count + 1
@@ -257,21 +304,163 @@ class Clock:
                 logger.exception("tick_tock iteration failed: %s — sleeping 30s and retrying", e)
                 sleep(30)
 
+    def frame_lead_seconds(self) -> float:
+        """
+        How long before a minute boundary to start building its frame: the estimated render
+        time plus the estimated refresh time of the slowest push the frame might need.
+        """
+        push_mode = "4gray" if self.ds.four_gray_scale else "full"
+        return self.refresh_timer.estimate("render") + self.refresh_timer.estimate(push_mode) + PUSH_SLACK_SECONDS
+
+    def next_frame_time(self) -> dt:
+        """
+        The next minute boundary at least frame_lead_seconds() away, i.e. the minute the next frame should show.
+        """
+        earliest = dt.now() + timedelta(seconds=self.frame_lead_seconds())
+        return earliest.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+    def sleep_until(self, boundary: dt, lead_seconds: float = 0.0) -> None:
+        """
+        Sleep until lead_seconds before boundary (not at all if that's already passed).
+        """
+        seconds = (boundary - dt.now()).total_seconds() - lead_seconds
+        if seconds > 0:
+            sleep(seconds)
+
+    def make_refresh_policy(self) -> RefreshPolicy:
+        """
+        The policy deciding how each frame is pushed: with partial updates, partials wherever ghosting allows
+        (windowed partials need the V2 panel's SSD1683 controller, V1 falls back to full-buffer display_Fast),
+        otherwise a full or four gray refresh every time.
+        """
+        if not self.ds.partial_update:
+            return RefreshPolicy(self.ds.four_gray_scale)
+        return GhostingPolicy(
+            EPD_WIDTH, EPD_HEIGHT,
+            windowed=self.ds.use_epd_lib_V2,
+            ghosting_budget=self.ds.partial_refresh_budget,
+            full_interval=self.ds.full_refresh_interval_minutes * 60,
+            power_budget=self.ds.power_budget,
+        )
+
+    def show_frame(self, boundary: dt) -> None:
+        """
+        Put the rendered frame on the display so its refresh finishes at boundary: ask the refresh
+        policy how to push it, wait until the current estimate for that refresh mode before boundary,
+        push, and fold the measured refresh time back into the estimate. Unchanged frames are skipped;
+        local runs just save it. Changed frames are also published to the frame server, if serving,
+        and kept in the frame ring once shown.
+        """
+        frame = self.image_obj.get_image_obj()
+        if self.frame_gate.is_unchanged(frame):
+            self.frame_gate.record_skip()
+            logger.info("\tFrame unchanged, skipping EPD refresh (%d skipped, %d pushed)", self.frame_gate.skipped, self.frame_gate.pushed)
+            return
+        packed, bits = pack_frame(frame)
+        if self.frame_server:
+            self.frame_server.publish(packed, bits, due=boundary.timestamp())
+        if self.local_run:
+            logger.info("\tSaving Image Locally")
+            self.save_local_file()
+            self.frame_gate.record_push(frame)
+            self.keep_frame(packed, bits, "local")
+            return
+
+        decision = self.refresh_policy.decide(frame.size, self.frame_gate.changed_bbox(frame), self.flip_to_dark, time())
+        mode = decision.mode
+        self.sleep_until(boundary, self.refresh_timer.estimate(mode))
+        logger.info("\tDrawing Image to EPD (%s refresh: %s)", mode, decision.reason)
+        push_start = time()
+        if mode == "4gray":
+            self.epd.display_4Gray(packed)
+        elif mode == "window":
+            box = align_window(decision.box, frame.width, frame.height)
+            sent = display_window(self.epd, frame, box)
+            logger.info("\tPartial refresh of %s, %d bytes", box, sent)
+        elif mode == "fast":
+            self.epd.display_Fast(packed)
+        else:
+            self.epd.display(packed)
+        push_seconds = time() - push_start
+        self.frame_gate.record_push(frame)
+        self.keep_frame(packed, bits, mode)
+        self.refresh_policy.record(decision, time())
+        estimate = self.refresh_timer.record(mode, push_seconds)
+        logger.info("\t%s refresh took %.2fs (estimate now %.2fs), done %+.2fs from %s", mode, push_seconds, estimate, (dt.now() - boundary).total_seconds(), self.format_time(boundary))
+        logger.info("\tRefresh policy: %s", self.refresh_policy.stats(time()))
+
+    def keep_frame(self, packed: bytearray, bits: int, mode: str) -> None:
+        """
+        Copy a frame just shown into the frame ring, if there is one.
+        """
+        if self.frame_ring:
+            self.frame_ring.record(packed, bits, mode, self.rendered_state.digest(), self.render_ms, time())
+
     def build_image(self, time_str: Optional[str] = None) -> None:
         """
         This function builds the image for the ePaper display by drawing Spotify information, weather, date/time, and borders.
         It handles the information for two Spotify users or album art display and dark mode.
 
+        Everything the frame depends on is gathered into a ClockState first. If it equals the state
+        last rendered, the canvas already holds this frame and Draw isn't touched at all; otherwise
+        the fields that changed are logged and the state is rendered.
+
         Args:
             time_str (Optional[str]): The time string to be displayed. If not provided, the current time is used.
         """
+        state = self.snapshot(time_str)
+        if self.rendered_state is None:
+            logger.info("Rendering first frame")
+        else:
+            changes = state.diff(self.rendered_state)
+            if not changes:
+                logger.info("Clock state unchanged, skipping render")
+                return
+            logger.info("Rendering, state changed: %s", ", ".join(f"{field} {old!r} -> {new!r}" for field, (old, new) in changes.items()))
+        self.render_state(state)
+
+    def snapshot(self, time_str: Optional[str] = None) -> ClockState:
+        """
+        Fetch everything shown on the display (weather, Spotify, album art) and return it as one ClockState.
+        """
         self.set_weather_and_sunset_info()
         time_str = self.get_time_str(time_str)
-        self.image_obj.draw_date_time_temp(self.weather_info, time_str, self.get_reauth_warning_days())
-        self.image_obj.draw_border_lines()
-        self.handle_spotify_user_1()
-        self.handle_spotify_user_2_or_album_art_display()
-        self.handle_dark_mode()
+        user_1 = self.handle_spotify_user_1()
+        user_2, detailed, art_name, art_tier = None, False, "NA", "full"
+        if not self.ds.single_user:
+            user_2 = self.handle_spotify_user_2()
+        else:
+            detailed = self.ds.detailed_weather_forecast and self.handle_detailed_weather_forecast()
+            art_name, art_tier = self.choose_album_art(self.handle_album_art(), detailed)
+        forecast = freeze(self.four_hour_forecast) if detailed and self.four_hour_forecast else None
+        weather_info = tuple(self.weather_info) if self.weather_info else None
+        return ClockState(
+            time_str, self.flip_to_dark, weather_info, self.get_reauth_warning_days(),
+            user_1, user_2, self.album_name_1, art_name, art_tier, detailed, forecast,
+        )
+
+    def render_state(self, state: ClockState) -> None:
+        """
+        Register every widget with Draw from state and render the frame. Draw only re-renders
+        the widgets whose part of the state changed.
+        """
+        x_spot_info = 5 if (self.ds.single_user and self.ds.album_art_right_side) or not self.ds.single_user else 207
+        self.image_obj.update_bottom_bar(state.weather_info, state.time_str, state.reauth_days_left)
+        self.image_obj.update_track_info(*self.track_info_args(state.user_1), x_spot_info, 26, state.user_1.user_name, state.user_1.time_since)
+        if state.user_2 is not None:
+            self.image_obj.update_track_info(*self.track_info_args(state.user_2), 207, 26, state.user_2.user_name, state.user_2.time_since)
+        else:
+            self.handle_album_art_display(state)
+        render_start = time()
+        self.image_obj.render_frame(state.dark_mode)
+        render_seconds = time() - render_start
+        self.render_ms = render_seconds * 1000
+        self.art_quality.record("frame", max(render_seconds - self.take_dither_seconds(), 0.0))
+        self.rendered_state = state
+
+    @staticmethod
+    def track_info_args(user: TrackState) -> Tuple[str, str, str, str]:
+        return user.track, user.artist, user.ctx_type, user.ctx_title
 
     def set_weather_and_sunset_info(self) -> None:
         """
@@ -293,76 +482,84 @@ class Clock:
         Returns:
             str: The time string.
         """
-        if not time_str:
-            date = dt.now()
-            time_str = date.strftime("%-H:%M") if self.ds.twenty_four_hour_clock else date.strftime("%-I:%M") + date.strftime("%p").lower()
-        return time_str
+        return time_str or self.format_time(dt.now())
 
-    def handle_spotify_user_1(self) -> None:
+    def format_time(self, date: dt) -> str:
+        """
+        The time text displayed for date, in 24 hour or am/pm form per display settings.
+        """
+        return date.strftime("%-H:%M") if self.ds.twenty_four_hour_clock else date.strftime("%-I:%M") + date.strftime("%p").lower()
+
+    def handle_spotify_user_1(self) -> TrackState:
         """
         This function handles the information for Spotify User 1.
-        It retrieves the Spotify information for User 1 and draws the track info on the image.
+        It retrieves the Spotify information for User 1.
         Wrapped in a try/except so a transient Spotify failure can't kill the loop.
+        With album art shown, its cover starts processing in the background right away.
+
+        Returns:
+            TrackState: What User 1's column shows.
         """
-        self.old_album_name1 = self.album_name_1
         try:
             self.track_1, self.artist_1, self.time_since_1, self.ctx_type_1, self.ctx_title_1, self.track_image_link, self.album_name_1 = self.spotify_user_1.get_spotipy_info()
         except Exception as e:
             logger.exception("handle_spotify_user_1 swallowed: %s", e)
             self.track_1, self.artist_1, self.time_since_1 = "—", "Spotify unavailable", ""
             self.ctx_type_1, self.ctx_title_1, self.track_image_link, self.album_name_1 = "", "", None, ""
-        x_spot_info = 5 if (self.ds.single_user and self.ds.album_art_right_side) or not self.ds.single_user else 207
-        y_spot_info = 26
-        self.draw_track_info(self.track_1, self.artist_1, self.ctx_type_1, self.ctx_title_1, x_spot_info, y_spot_info, self.spotify_user_1, self.time_since_1)
+        if self.album_art_worker and self.track_image_link:
+            self.album_art_worker.submit(self.track_image_link)
+        return TrackState(self.spotify_user_1.name, self.track_1, self.artist_1, self.time_since_1, self.ctx_type_1, self.ctx_title_1)
 
-    def handle_spotify_user_2_or_album_art_display(self) -> None:
+    def handle_spotify_user_2(self) -> TrackState:
         """
-        This function handles the information for Spotify User 2 or album art display.
-        If there is a single user, it calls the function to handle album art display.
-        Otherwise, it retrieves the Spotify information for User 2 and draws the track info on the image.
+        This function handles the information for Spotify User 2, when there are two users.
 
-        Args:
-            time_str (str): The time string to be displayed.
+        Returns:
+            TrackState: What User 2's column shows.
         """
-        if not self.ds.single_user:
-            try:
-                track_2, artist_2, time_since_2, ctx_type_2, ctx_title_2, _, _ = self.spotify_user_2.get_spotipy_info()
-            except Exception as e:
-                logger.exception("handle_spotify_user_2 swallowed: %s", e)
-                track_2, artist_2, time_since_2, ctx_type_2, ctx_title_2 = "—", "Spotify unavailable", "", "", ""
-            self.draw_track_info(track_2, artist_2, ctx_type_2, ctx_title_2, 207, 26, self.spotify_user_2, time_since_2)
-        else:
-            self.handle_album_art_display()
+        try:
+            track_2, artist_2, time_since_2, ctx_type_2, ctx_title_2, _, _ = self.spotify_user_2.get_spotipy_info()
+        except Exception as e:
+            logger.exception("handle_spotify_user_2 swallowed: %s", e)
+            track_2, artist_2, time_since_2, ctx_type_2, ctx_title_2 = "—", "Spotify unavailable", "", "", ""
+        return TrackState(self.spotify_user_2.name, track_2, artist_2, time_since_2, ctx_type_2, ctx_title_2)
 
-    def handle_album_art_display(self) -> None:
+    def handle_album_art_display(self, state: ClockState) -> None:
         """
         This function handles the album art display. 
         It determines the positions for the album and context based on the album art side. 
-        If detailed weather forecast is enabled, it handles that. 
+        If the detailed weather forecast is up, it draws that. 
         Otherwise, it draws the album context. 
-        Finally, it handles the album art.
+        Finally, it draws the album art.
 
-        Args:
-            time_str (str): The time string to be displayed.
+        The whole panel is one widget: its inputs are its part of state, and the render
+        closure only draws, so an unchanged panel costs nothing to keep on screen.
         """
         album_pos = (201, 0) if self.ds.album_art_right_side else (0, 0)
         context_pos = (227, 204) if self.ds.album_art_right_side else (25, 204)
-        if self.ds.detailed_weather_forecast:
-            self.handle_detailed_weather_forecast(context_pos)
-        else:
-            self.image_obj.draw_spot_context("album", self.album_name_1, context_pos[0], context_pos[1])
-        self.handle_album_art(album_pos)
+        panel_rect = (200, 0, 400, 224) if self.ds.album_art_right_side else (0, 0, 201, 224)
+        detailed, album_name, art_name, art_tier, forecast = state.detailed_weather, state.album_name, state.album_art_key, state.album_art_tier, state.forecast_dict()
+        self.image_obj.set_weather_mode(detailed)
+
+        def render() -> None:
+            if detailed:
+                self.image_obj.detailed_weather_album_name(album_name)
+                self.image_obj.draw_detailed_weather_information(forecast)
+            else:
+                self.image_obj.draw_spot_context("album", album_name, context_pos[0], context_pos[1])
+            self.image_obj.draw_album_image(art_name, pos=album_pos, tier=art_tier)
+
+        inputs = (album_name, detailed, state.forecast, art_name, art_tier, album_pos)
+        self.image_obj.update_widget("album_art", inputs, [panel_rect], render)
 
-    def handle_detailed_weather_forecast(self, context_pos: Tuple[int, int]) -> None:
+    def handle_detailed_weather_forecast(self) -> bool:
         """
         This function handles the detailed weather forecast. 
         It determines whether to draw the detailed weather based on the time since the last song was played. 
-        If detailed weather is to be drawn, it sets the weather mode, retrieves the four hour forecast if not already available, 
-        and draws the detailed weather information. 
-        Otherwise, it draws the album context.
+        If detailed weather is to be drawn, it retrieves the four hour forecast.
 
-        Args:
-            context_pos (Tuple[int, int]): The position to draw the album context if detailed weather is not to be drawn.
+        Returns:
+            bool: True if the detailed weather should be drawn in place of the album context.
         """
         self.draw_detailed_weather = (
             "is listening to" in self.time_since_1 and self.ds.minutes_idle_until_detailed_weather == 0
@@ -370,123 +567,128 @@ class Clock:
             or "hour" in self.time_since_1 and self.ds.minutes_idle_until_detailed_weather <= int(re.search(r'\d+', self.time_since_1).group()) * 60
             or "day" in self.time_since_1 and self.ds.minutes_idle_until_detailed_weather <= int(re.search(r'\d+', self.time_since_1).group()) * 1440
         )
-        self.image_obj.set_weather_mode(self.draw_detailed_weather)
         if self.draw_detailed_weather:
             self.set_four_hour_forecast()
-            self.image_obj.draw_detailed_weather_border()
-            self.image_obj.detailed_weather_album_name(self.album_name_1)
-            self.image_obj.draw_detailed_weather_information(self.four_hour_forecast)
-        else:
-            self.image_obj.draw_spot_context("album", self.album_name_1, context_pos[0], context_pos[1])
+        return self.draw_detailed_weather
 
-    def handle_album_art(self, album_pos: Tuple[int, int]) -> None:
+    def handle_album_art(self) -> str:
         """
         This function handles the album art. 
-        It determines whether to get new album art based on whether the album name has changed or new album art is needed. 
-        If new album art is needed and a track image link is available, it retrieves the album art. 
-        It then determines the image file name based on whether a track image link is available. 
-        If no track image link is available, it logs a warning. 
-        It then draws the album image, date/time/temp, and border lines.
+        It collects the current cover from the album art worker (which started on it as soon as
+        handle_spotify_user_1 saw its link), waiting at most ALBUM_ART_DEADLINE_SECONDS. If it isn't
+        ready by then, or couldn't be downloaded, the previous cover stays up until a later build.
+        If no track image link is available, it logs a warning and falls back to NA.png. 
 
-        Args:
-            time_str (str): The time string to be displayed.
-            album_pos (Tuple[int, int]): The position to draw the album image.
-        """
-        self.get_new_album_art = self.old_album_name1 != self.album_name_1 or self.get_new_album_art
-        got_new_album_art = False
-        if self.get_new_album_art and self.track_image_link:
-            got_new_album_art = self.misc.get_album_art(self.track_image_link)
-            if got_new_album_art:
-                self.get_new_album_art = False
-        image_file_name = "NA.png" if not self.track_image_link else None
-        image_file_path = "Icons/album_na/" if not self.track_image_link else "cache/album_art/"
+        Returns:
+            str: The album art cache key of the cover for Draw.draw_album_image, "NA" for the fallback.
+        """
+        if self.track_image_link:
+            album_art_key = self.album_art_worker.result(self.track_image_link, ALBUM_ART_DEADLINE_SECONDS)
+            if album_art_key:
+                self.album_art_key = album_art_key
         if not self.track_image_link:
             logger.warning("No album art found, drawing NA.png")
+        if not self.track_image_link or self.album_art_key == "NA":
             self.ensure_na_album_art()
-        self.image_obj.draw_album_image(self.flip_to_dark, image_file_name=image_file_name, image_file_path=image_file_path, pos=album_pos, convert_image=got_new_album_art)
+            return "NA"
+        return self.album_art_key
 
-    def ensure_na_album_art(self) -> None:
+    def choose_album_art(self, art_name: str, detailed: bool) -> Tuple[str, str]:
         """
-        Generates cache/album_art/NA_resize.PNG and NA_thumbnail.PNG from
-        Icons/album_na/NA.png if missing, mirroring the resize step that
-        real downloaded album art gets via Misc.get_album_art(). Without
-        this, dithering the "no album art" fallback fails since those
-        derived files are only ever produced by the download path.
-        """
-        na_resize = "cache/album_art/NA_resize.PNG"
-        na_thumbnail = "cache/album_art/NA_thumbnail.PNG"
-        if os.path.exists(na_resize) and os.path.exists(na_thumbnail):
-            return
-        os.makedirs("cache/album_art", exist_ok=True)
-        try:
-            shutil.copyfile("Icons/album_na/NA.png", "cache/album_art/NA.png")
-        except OSError as e:
-            logger.error("Failed to stage NA.png for resizing: %s", e)
-            return
-        self.misc.resize_image("NA.png")
-        self.misc.resize_image("NA.png", (46, 46))
+        The cover to draw this frame and its quality tier in 4 Gray Scale: the best tier already
+        dithered or affordable within render_budget_seconds (always full without a budget).
+        At the threshold tier nothing is dithered during the frame, so a cover without a cached
+        threshold variant is stood in for by the cover already on screen, or NA, and left
+        pending for upgrade_album_art().
 
-    def handle_dark_mode(self) -> None:
-        """
-        This function handles the dark mode of the display. 
-        If flip_to_dark is True, it calls the function to flip the display to dark mode.
-        """
-        if self.flip_to_dark:
-            self.image_obj.dark_mode_flip()
+        Returns:
+            Tuple[str, str]: The album art cache key and tier to draw.
+        """
+        self.pending_album_art = None
+        if not self.ds.four_gray_scale:
+            return art_name, "full"
+        variant = "thumbnail_dither" if detailed else "dither"
+        tier = self.art_quality.choose(tier for tier in TIERS if album_art_cache.has(art_name, tier_variant(variant, tier)))
+        if tier != "full":
+            logger.info("Album art at %s quality, full quality estimated at %.2fs with %.2fs of the frame's %.2fs budget spare",
+                        tier, self.art_quality.estimate("full"), self.ds.render_budget_seconds - self.art_quality.estimate("frame"), self.ds.render_budget_seconds)
+        if tier == "threshold" and not album_art_cache.has(art_name, tier_variant(variant, tier)):
+            self.pending_album_art = art_name
+            art_name, tier = self.album_art_stand_in(variant)
+            logger.info("Showing album art %s at %s quality until %s is dithered", art_name, tier, self.pending_album_art)
+        return art_name, tier
+
+    def album_art_stand_in(self, variant: str) -> Tuple[str, str]:
+        """
+        The cover on screen, if variant of it is still cached, else NA at its best cached tier
+        (dithered in full the one time it isn't, after which the pinned NA stays cached).
 
-    def draw_track_info(self, track: str, artist: str, ctx_type: str, ctx_title: str, x: int, y: int, spotify_user: SpotifyUser, time_since: str) -> None:
+        Returns:
+            Tuple[str, str]: The album art cache key and tier to draw.
         """
-        Draws the track information on the ePaper display.
+        keys = ["NA"]
+        if self.rendered_state is not None and self.rendered_state.album_art_key != "NA":
+            keys.insert(0, self.rendered_state.album_art_key)
+        for key in keys:
+            for tier in TIERS:
+                if album_art_cache.has(key, tier_variant(variant, tier)):
+                    return key, tier
+        self.ensure_na_album_art()
+        return "NA", "full"
 
-        Parameters:
-        - track (str): The name of the track.
-        - artist (str): The name of the artist.
-        - ctx_type (str): The context type of the track (e.g., album, playlist).
-        - ctx_title (str): The title of the context.
-        - x (int): The x-coordinate of the starting position.
-        - y (int): The y-coordinate of the starting position.
-        - spotify_user (User): The Spotify user object.
-        - time_since (str): The time since the track was played.
+    def take_dither_seconds(self) -> float:
         """
-        ctx_type_is_album = ctx_type == "album"
-        track_line_count, track_text_size = self.image_obj.draw_track_text(track, x, y)
-        y = 210 if ctx_type_is_album else 190
-        self.image_obj.draw_artist_text(artist, track_line_count, track_text_size, x, y)
-        if not ctx_type_is_album:
-            self.image_obj.draw_spot_context(ctx_type, ctx_title, x + 20, 204)
+        Record the time Draw spent dithering album art since last asked, per tier, with art_quality.
 
-        name_width, name_height = self.image_obj.draw_name(spotify_user.name, x + 3, 0)
-        self.image_obj.draw_user_time_ago(time_since, x + 13 + name_width, name_height // 2)
+        Returns:
+            float: The total.
+        """
+        for tier, seconds in self.image_obj.dither_seconds.items():
+            self.art_quality.record(tier, seconds)
+        total = sum(self.image_obj.dither_seconds.values())
+        self.image_obj.dither_seconds.clear()
+        return total
 
-    def get_time_from_date_time(self) -> Tuple[int, str]:
+    def upgrade_album_art(self, deadline: dt) -> None:
+        """
+        If the cover on screen was drawn below full quality, or is standing in for a pending one,
+        dither it at full quality now, while waiting for the frame due at deadline, so that frame
+        shows it. If full quality doesn't fit before that frame has to start rendering, a pending
+        cover gets its threshold variant instead, if that fits, and the rest is left for a later frame.
         """
-        Return time information from datetime including seconds, time, date, and the current_minute of update.
+        state = self.rendered_state
+        if state is None:
+            return
+        key = self.pending_album_art or (state.album_art_key if state.album_art_tier != "full" else None)
+        if key is None:
+            return
+        spare = (deadline - dt.now()).total_seconds() - self.frame_lead_seconds() - PUSH_SLACK_SECONDS
+        if spare >= self.art_quality.estimate("full"):
+            self.image_obj.dither_album_art(key)
+            logger.info("Upgraded album art %s to full quality in %.2fs", key, self.take_dither_seconds())
+        elif self.pending_album_art and spare >= self.art_quality.estimate("threshold"):
+            self.image_obj.dither_album_art(key, "threshold")
+            logger.info("Made album art %s at threshold quality in %.2fs", key, self.take_dither_seconds())
+        else:
+            logger.info("Not upgrading album art yet, %.2fs spare and full quality estimated at %.2fs", spare, self.art_quality.estimate("full"))
 
-        Returns:
-            sec_left (int): used to know how long we should sleep for before next update on the current_minute
-            time_str (str): time text to be displayed
-        """
-        date = dt.now() + timedelta(seconds=self.time_elapsed)
-        am_pm = date.strftime("%p")
-        hour = int(date.strftime("%-H"))
-        new_min = int(date.strftime("%M")[-1])
-
-        # Here we make some considerations so the screen isn't updated too frequently
-        # We air on the side of caution, and would rather add an additional current_minute than shrink by a current_minute
-        if self.old_time and (5 < hour < 24):
-            # 6:00am - 11:59pm update screen every 3 mins
-            while int(abs(self.old_time - new_min)) < 3:
-                date = dt.now() + timedelta(seconds=self.time_elapsed)
-                new_min = int(date.strftime("%M")[-1])
-                sleep(0.5)
-        # 12:00am - 1:59am update screen every 5 mins at least
-        elif self.old_time and hour < 2:
-            while int(abs(self.old_time - new_min)) < 5:
-                date = dt.now() + timedelta(seconds=self.time_elapsed)
-                new_min = int(date.strftime("%M")[-1])
-                sleep(0.5)
-        # 2:00am - 5:59am check time every 15ish minutes, granularity here is not paramount
-        sec_left = 60 - int(date.strftime("%S"))
-
-        time_str = date.strftime("%-H:%M") if self.ds.twenty_four_hour_clock else date.strftime("%-I:%M") + am_pm.lower()
-        return sec_left, time_str
+    def ensure_na_album_art(self) -> None:
+        """
+        Puts the resize and thumbnail variants of Icons/album_na/NA.png into the
+        album art cache under "NA" if missing, mirroring the resize step that
+        real downloaded album art gets via AlbumArtWorker. Without
+        this, dithering the "no album art" fallback fails since those
+        variants are otherwise only ever produced by the download path.
+        """
+        if album_art_cache.has("NA", "resize", "thumbnail"):
+            return
+        try:
+            with open("Icons/album_na/NA.png", "rb") as f:
+                na_data = f.read()
+        except OSError as e:
+            logger.error("Failed to read Icons/album_na/NA.png: %s", e)
+            return
+        for variant, size in (("resize", (199, 199)), ("thumbnail", (46, 46))):
+            resized = self.misc.resize_image(na_data, size)
+            if resized is not None:
+                album_art_cache.put("NA", variant, resized)
@@ -0,0 +1,127 @@
+import hashlib
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class TrackState(NamedTuple):
+    """
+    What one Spotify user's column shows.
+    """
+    user_name: str
+    track: str
+    artist: str
+    time_since: str
+    ctx_type: str
+    ctx_title: str
+
+
+class ClockState(NamedTuple):
+    """
+    Every input to one frame, gathered by Clock before anything is drawn. Immutable and
+    hashable, so Clock can skip Draw entirely when a snapshot equals the one last rendered,
+    and diff() says which inputs changed when it doesn't.
+
+    user_2 is None in single user mode; album_name, album_art_key, album_art_tier, detailed_weather
+    and forecast are only used there. album_art_tier is the quality tier of the cover's dither in
+    4 Gray Scale (see lib/render_quality.py). forecast is the four hour forecast passed through freeze().
+    """
+    time_str: str
+    dark_mode: bool
+    weather_info: Optional[Tuple[Any, Any, Any]]
+    reauth_days_left: Optional[int]
+    user_1: TrackState
+    user_2: Optional[TrackState]
+    album_name: str
+    album_art_key: str
+    album_art_tier: str
+    detailed_weather: bool
+    forecast: Optional["FrozenDict"]
+
+    def diff(self, other: Optional["ClockState"]) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Fields that differ from other (the earlier state) as {field: (old, new)}, with a changed
+        user's fields listed individually (e.g. "user_1.track"); every field if other is None.
+        """
+        if other is None:
+            return {field: (None, value) for field, value in zip(self._fields, self)}
+        changes = {}
+        for field, old, new in zip(self._fields, other, self):
+            if old == new:
+                continue
+            if isinstance(old, TrackState) and isinstance(new, TrackState):
+                changes.update({f"{field}.{name}": (a, b) for name, a, b in zip(TrackState._fields, old, new) if a != b})
+            else:
+                changes[field] = (old, new)
+        return changes
+
+    def digest(self) -> int:
+        """
+        A 64 bit hash of the state that, unlike hash(), is the same from one run to the next.
+        """
+        return int.from_bytes(hashlib.blake2b(repr(self).encode(), digest_size=8).digest(), "little")
+
+    def forecast_dict(self) -> Optional[dict]:
+        """
+        The four hour forecast back in the nested dict form Draw expects.
+        """
+        return thaw(self.forecast) if self.forecast is not None else None
+
+
+class Frozen(tuple):
+    """
+    A dict or list made hashable by freeze(). Only equal to a frozen value of the same
+    kind, so thaw() never has to guess what a tuple used to be.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and tuple.__eq__(self, other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, tuple(self)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({tuple.__repr__(self)})"
+
+
+class FrozenDict(Frozen):
+    """
+    A frozen dict: its (key, value) pairs in order.
+    """
+    __slots__ = ()
+
+
+class FrozenList(Frozen):
+    """
+    A frozen list: its items in order.
+    """
+    __slots__ = ()
+
+
+def freeze(value: Any) -> Any:
+    """
+    Make a JSON-like value hashable: dicts become FrozenDicts, lists become FrozenLists and
+    tuples stay tuples, all frozen through.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Undo freeze().
+    """
+    if isinstance(value, FrozenDict):
+        return {key: thaw(item) for key, item in value}
+    if isinstance(value, FrozenList):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    return value
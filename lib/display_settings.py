@@ -1,6 +1,7 @@
 import json
 
 from lib.clock_logging import logger
+from lib.dither import ALGORITHMS as DITHER_ALGORITHMS
 
 class DisplaySettings:
     """
@@ -35,7 +36,8 @@ class DisplaySettings:
         main_settings (dict): A dictionary containing the main settings.
 
         Raises:
-        ValueError: If partial updates are enabled in 4 Gray Scale mode.
+        ValueError: If partial updates are enabled in 4 Gray Scale mode, the partial refresh budget, full refresh
+        interval, power budget, frame ring size or render budget is negative, or the dither algorithm is unknown.
         """
         # switch to Dark Mode mode 30 minutes after sunset from current location
         self.sunset_flip = main_settings["sunset_flip"]
@@ -43,16 +45,47 @@ class DisplaySettings:
         # am/pm or 24 hour clock
         self.twenty_four_hour_clock = main_settings["twenty_four_hour_clock"]
         self.partial_update = main_settings["partial_update"]
+        # how many partial refreshes any area of the panel takes before a full refresh clears the ghosting they leave behind
+        self.partial_refresh_budget = main_settings.get("partial_refresh_budget", 10)
+        # with partial updates, a full refresh at least this often even if no area has used up its budget
+        self.full_refresh_interval_minutes = main_settings.get("full_refresh_interval_minutes", 60)
+        # most refreshes per hour, in full refreshes' worth of energy, before interval full refreshes are put off (0 for no limit)
+        self.power_budget = main_settings.get("power_budget", 0)
+        # how many of the last pushed frames to keep in cache/frame_ring.bin (0 to keep none)
+        self.frame_ring_slots = main_settings.get("frame_ring_slots", 32)
         self.time_on_right = main_settings["time_on_right"]
         # it is not recommended to set sleep_epd to False as it might damage the display
         self.sleep_epd = main_settings["sleep_epd"]
         self.four_gray_scale = main_settings["four_gray_scale"]
+        # how album art is dithered in 4 Gray Scale: bayer is cheapest, quantize/floyd_steinberg smoothest
+        self.dither_algorithm = main_settings.get("dither_algorithm", "quantize")
+        # in 4 Gray Scale, most seconds rendering a frame should take before new album art is drawn with a
+        # cheaper dither and upgraded in a later frame (0 for no limit: covers are always dithered in full first)
+        self.render_budget_seconds = main_settings.get("render_budget_seconds", 0)
         # Use WaveShare's 4in2epd.py or 4in2epdv2.py
         self.use_epd_lib_V2 = main_settings["use_epd_libV2"]
 
         if self.partial_update and self.four_gray_scale:
             raise ValueError("Partial updates are not supported in 4 Gray Scale, you must choose one or another")
 
+        if not isinstance(self.partial_refresh_budget, int) or self.partial_refresh_budget < 0:
+            raise ValueError("partial_refresh_budget must be a whole number of partial refreshes, 0 or more")
+
+        if not isinstance(self.full_refresh_interval_minutes, (int, float)) or self.full_refresh_interval_minutes < 0:
+            raise ValueError("full_refresh_interval_minutes must be a number of minutes, 0 or more")
+
+        if not isinstance(self.power_budget, (int, float)) or self.power_budget < 0:
+            raise ValueError("power_budget must be a number of full refreshes per hour, 0 or more (0 for no limit)")
+
+        if not isinstance(self.frame_ring_slots, int) or not 0 <= self.frame_ring_slots <= 0xFFFF:
+            raise ValueError("frame_ring_slots must be a whole number of frames, 0 to 65535")
+
+        if not isinstance(self.render_budget_seconds, (int, float)) or self.render_budget_seconds < 0:
+            raise ValueError("render_budget_seconds must be a number of seconds, 0 or more (0 for no limit)")
+
+        if self.dither_algorithm not in DITHER_ALGORITHMS:
+            raise ValueError(f"dither_algorithm must be one of {', '.join(DITHER_ALGORITHMS)}")
+
         if self.sunset_flip and self.always_dark_mode:
             logger.warning("You have both sunset_flip and always_dark_mode enabled, always_dark_mode supersedes sunset_flip")
 
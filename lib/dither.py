@@ -0,0 +1,187 @@
+"""
+NumPy dithering of album art down to the 4.2in panel's four gray levels.
+
+The algorithms:
+    threshold        no dithering, each pixel rounded to the nearest level (the cheapest stand-in)
+    bayer            ordered dithering with a 4x4 Bayer matrix, one vectorized pass
+    atkinson         error diffusion spreading 6/8 of each pixel's error (crisper, less noise)
+    floyd_steinberg  error diffusion spreading all of it (smoothest gradients)
+    quantize         Pillow's own Floyd-Steinberg in C via Image.quantize(), what the clock
+                     always used before; the reference the others are measured against
+
+Error diffusion is sequential by nature, but every pixel only takes error from pixels
+before it in the order x + 2y, so all pixels on one such diagonal can be quantized at
+once: a 199px cover takes ~600 vectorized steps instead of ~40,000 per-pixel ones.
+
+Every function returns an 'L' image holding only FOUR_GRAY_LEVELS values.
+dither_variant() uses them to make a cover's dither variants in the album art cache.
+Benchmark them with `python -m lib.dither_bench`.
+"""
+from functools import lru_cache
+from time import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from lib.album_art_cache import album_art_cache
+from lib.clock_logging import logger
+from lib.epd_buffer import FOUR_GRAY_LEVELS, four_gray_palette
+from lib.render_quality import tier_variant
+
+# The levels in ascending order, and the midpoints between neighbouring ones
+_LEVELS = np.array(sorted(FOUR_GRAY_LEVELS), dtype=np.float32)
+_THRESHOLDS = (_LEVELS[1:] + _LEVELS[:-1]) / 2
+
+BAYER_4X4 = np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5],
+], dtype=np.float32)
+
+# (dx, dy, weight) of the neighbours each pixel's quantization error is pushed onto
+ATKINSON_KERNEL: List[Tuple[int, int, float]] = [
+    (1, 0, 1 / 8), (2, 0, 1 / 8),
+    (-1, 1, 1 / 8), (0, 1, 1 / 8), (1, 1, 1 / 8),
+    (0, 2, 1 / 8),
+]
+FLOYD_STEINBERG_KERNEL: List[Tuple[int, int, float]] = [
+    (1, 0, 7 / 16),
+    (-1, 1, 3 / 16), (0, 1, 5 / 16), (1, 1, 1 / 16),
+]
+
+# Margin around the working buffer so kernel taps past the edges land somewhere harmless
+_PAD = 2
+
+
+def _gray(image: Image.Image) -> np.ndarray:
+    return np.asarray(image.convert('L'), dtype=np.float32)
+
+
+def _to_image(levels: np.ndarray) -> Image.Image:
+    return Image.fromarray(levels.astype(np.uint8), 'L')
+
+
+def threshold(image: Image.Image) -> Image.Image:
+    """
+    Round each pixel to the nearest gray level.
+    """
+    return _to_image(_LEVELS[np.searchsorted(_THRESHOLDS, _gray(image))])
+
+
+def bayer(image: Image.Image) -> Image.Image:
+    """
+    Ordered dithering: each pixel rounds up to the next gray level if its position
+    between the two levels around it is past that pixel's Bayer threshold.
+    """
+    pixels = _gray(image)
+    upper = np.clip(np.searchsorted(_LEVELS, pixels, side='right'), 1, len(_LEVELS) - 1)
+    low, high = _LEVELS[upper - 1], _LEVELS[upper]
+    fraction = (pixels - low) / (high - low)
+
+    height, width = pixels.shape
+    thresholds = (np.tile(BAYER_4X4, (height // 4 + 1, width // 4 + 1))[:height, :width] + 0.5) / 16
+    return _to_image(np.where(fraction > thresholds, high, low))
+
+
+@lru_cache(maxsize=4)
+def _wavefronts(width: int, height: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (ys, xs) of every pixel on each diagonal x + 2y = t, in increasing t. Cached, since
+    covers only ever come in a couple of sizes.
+    """
+    fronts = []
+    for t in range(width + 2 * (height - 1)):
+        ys = np.arange(max(0, (t - width + 2) // 2), min(height - 1, t // 2) + 1)
+        fronts.append((ys, t - 2 * ys))
+    return fronts
+
+
+def diffuse(image: Image.Image, kernel: List[Tuple[int, int, float]]) -> Image.Image:
+    """
+    Error diffusion with any kernel whose taps are all after the pixel in x + 2y order
+    (to the right on the same row, or up to one pixel left per row below).
+    """
+    pixels = _gray(image)
+    height, width = pixels.shape
+    work = np.zeros((height + 2 * _PAD, width + 2 * _PAD), dtype=np.float32)
+    work[_PAD:_PAD + height, _PAD:_PAD + width] = pixels
+    out = np.empty_like(pixels)
+
+    for ys, xs in _wavefronts(width, height):
+        wy, wx = ys + _PAD, xs + _PAD
+        values = work[wy, wx]
+        quantized = _LEVELS[np.searchsorted(_THRESHOLDS, values)]
+        out[ys, xs] = quantized
+        error = values - quantized
+        for dx, dy, weight in kernel:
+            work[wy + dy, wx + dx] += error * weight
+    return _to_image(out)
+
+
+def atkinson(image: Image.Image) -> Image.Image:
+    return diffuse(image, ATKINSON_KERNEL)
+
+
+def floyd_steinberg(image: Image.Image) -> Image.Image:
+    return diffuse(image, FLOYD_STEINBERG_KERNEL)
+
+
+def quantize(image: Image.Image) -> Image.Image:
+    return image.convert('RGB').quantize(palette=four_gray_palette(), dither=Image.Dither.FLOYDSTEINBERG).convert('L')
+
+
+ALGORITHMS: Dict[str, Callable[[Image.Image], Image.Image]] = {
+    "threshold": threshold,
+    "bayer": bayer,
+    "atkinson": atkinson,
+    "floyd_steinberg": floyd_steinberg,
+    "quantize": quantize,
+}
+
+
+def dither(image: Image.Image, algorithm: str = "quantize") -> Image.Image:
+    """
+    Dither image to the four gray levels with the named algorithm.
+
+    Args:
+        image (Image.Image): Any image; it's converted to grayscale first.
+        algorithm (str): One of ALGORITHMS.
+
+    Returns:
+        Image.Image: An 'L' image of the same size holding only FOUR_GRAY_LEVELS.
+
+    Raises:
+        ValueError: For an unknown algorithm.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown dither algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}")
+    return ALGORITHMS[algorithm](image)
+
+
+# dither variant -> the resized variant it's made from
+DITHER_SOURCES = {"dither": "resize", "thumbnail_dither": "thumbnail"}
+
+
+def dither_variant(key: str, variant: str, algorithm: str, tier: str = "full") -> bool:
+    """
+    Make one dither variant of a cover in the album art cache from its resized variant,
+    unless it's already cached. Below the full quality tier, the variant is the tier's
+    stand-in (see lib/render_quality.py), kept in memory only.
+
+    Returns:
+        bool: True if the variant is in the cache afterwards, False if its resized variant is missing.
+    """
+    name = tier_variant(variant, tier)
+    if album_art_cache.has(key, name):
+        return True
+    resized = album_art_cache.get(key, DITHER_SOURCES[variant])
+    if resized is None:
+        logger.error("Error: Album art %s has no %s variant.", key, DITHER_SOURCES[variant])
+        return False
+
+    start_time = time()
+    album_art_cache.put(key, name, dither(resized, algorithm), persist=tier == "full")
+    logger.info("* Dithering %s %s (%s) took %.2f seconds *", key, name, algorithm, time() - start_time)
+    return True
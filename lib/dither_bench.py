@@ -0,0 +1,118 @@
+"""
+Benchmark of the album art dithering algorithms in lib/dither.py: how long each takes
+and how close its output looks to the grayscale cover, at both sizes the clock draws
+album art (the 199px panel and the 46px weather mode thumbnail).
+
+Quality is the PSNR between the cover and its dither after both are blurred a little,
+roughly what the eye averages a dither pattern into at arm's length; higher is better.
+
+    python -m lib.dither_bench [cover.jpg ...] [--repeat N]
+
+With no covers given it uses a generated cover (see fixture_cover()) plus every cover in
+the album art cache, so a fresh checkout with an empty cache still has something to score.
+"""
+import argparse
+import glob
+import io
+import math
+import sys
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from lib.dither import ALGORITHMS
+from lib.misc import Misc
+
+SIZES = ((199, 199), (46, 46))
+BLUR_RADIUS = 1.0
+FIXTURE_SIZE = 640
+FIXTURE_SEED = 14
+
+
+def blurred_mse(reference: Image.Image, dithered: Image.Image) -> float:
+    """
+    Mean squared error between two same size grayscale images, both blurred by BLUR_RADIUS first.
+    """
+    blur = ImageFilter.GaussianBlur(BLUR_RADIUS)
+    a = np.asarray(reference.filter(blur), dtype=np.float64)
+    b = np.asarray(dithered.filter(blur), dtype=np.float64)
+    return float(np.mean((a - b) ** 2))
+
+
+def psnr(mse: float) -> float:
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def fixture_cover() -> bytes:
+    """
+    A deterministic stand-in for a photographic cover, as PNG bytes: a full range gradient
+    and two soft blobs for smooth tones, a hard edged disc, and low-frequency noise for
+    texture, the kind of content that separates the algorithms (a flat placeholder like
+    NA.png dithers perfectly with any of them).
+    """
+    rng = np.random.default_rng(FIXTURE_SEED)
+    y, x = np.mgrid[0:FIXTURE_SIZE, 0:FIXTURE_SIZE] / FIXTURE_SIZE
+    gray = 0.15 + 0.7 * x
+    for cx, cy, radius, weight in ((0.3, 0.3, 0.15, 0.35), (0.75, 0.7, 0.2, -0.4)):
+        gray += weight * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * radius ** 2))
+    gray[(x - 0.3) ** 2 + (y - 0.75) ** 2 < 0.12 ** 2] = 0.9
+    noise = Image.fromarray(rng.integers(0, 256, (FIXTURE_SIZE // 40, FIXTURE_SIZE // 40), dtype=np.uint8))
+    gray += 0.12 * (np.asarray(noise.resize((FIXTURE_SIZE, FIXTURE_SIZE), Image.BICUBIC), dtype=np.float64) / 255 - 0.5)
+    gray = np.clip(gray, 0, 1)
+    # tint it so the cover goes through the same RGB to grayscale conversion a real one does
+    rgb = np.stack((gray, gray ** 1.2, gray ** 0.8), axis=-1)
+    out = io.BytesIO()
+    Image.fromarray((rgb * 255).round().astype(np.uint8), "RGB").save(out, "PNG")
+    return out.getvalue()
+
+
+def bench(covers: List[bytes], repeat: int) -> Dict[Tuple[str, Tuple[int, int]], Tuple[float, float]]:
+    """
+    Dither every cover (encoded image bytes) at every size with every algorithm.
+
+    Returns:
+        Dict: (algorithm, size) -> (median milliseconds per cover, PSNR in dB of the mean error over every cover).
+    """
+    misc = Misc()
+    results = {}
+    for size in SIZES:
+        sources = []
+        for cover in covers:
+            resized = misc.resize_image(cover, size)
+            if resized is not None:
+                sources.append(resized)
+        if not sources:
+            continue
+        for name, algorithm in ALGORITHMS.items():
+            times, errors = [], []
+            for source in sources:
+                for _ in range(repeat):
+                    start = perf_counter()
+                    dithered = algorithm(source)
+                    times.append(perf_counter() - start)
+                errors.append(blurred_mse(source, dithered))
+            results[name, size] = (float(np.median(times)) * 1000, psnr(float(np.mean(errors))))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time and score each album art dithering algorithm.")
+    parser.add_argument('covers', nargs='*', help="Cover images to dither (default: a generated cover and the album art cache)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per cover and size, the median time is reported")
+    parsed_args = parser.parse_args()
+
+    cover_data = [] if parsed_args.covers else [fixture_cover()]
+    for cover_path in parsed_args.covers or sorted(glob.glob("cache/album_art/*_resize.PNG")):
+        with open(cover_path, "rb") as f:
+            cover_data.append(f.read())
+    bench_results = bench(cover_data, max(1, parsed_args.repeat))
+    if not bench_results:
+        print("No covers could be decoded.")
+        sys.exit(1)
+
+    print(f"{len(cover_data)} cover(s), {parsed_args.repeat} run(s) each")
+    print(f"{'algorithm':<16} {'size':>7} {'ms':>8} {'PSNR dB':>8}")
+    for (name, size), (ms, score) in bench_results.items():
+        print(f"{name:<16} {size[0]:>3}x{size[1]:<3} {ms:>8.2f} {score:>8.2f}")
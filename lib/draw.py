@@ -1,12 +1,31 @@
 import os
-from time import time
 from datetime import datetime as dt
-from typing import List, Optional, Tuple
+from time import time
+from typing import Dict, List, Optional, Tuple
 
-from PIL import Image, ImageFont, ImageDraw, ImageMath
+from PIL import Image, ImageFont, ImageDraw
 
+from lib.album_art_cache import album_art_cache
 from lib.clock_logging import logger
 from lib.display_settings import display_settings
+from lib.dither import dither_variant
+from lib.glyph_atlas import GlyphAtlas
+from lib.icon_atlas import INVERT_LUT, IconAtlas
+from lib.image_store import image_store
+from lib.layout_cache import LayoutCache, TextLayout
+from lib.line_breaker import ARTIST_Y_NUDGES, LINE_HEIGHTS, SMALL_TRACK_DROP, TEXT_HEIGHTS, LineBreaker
+from lib.render_quality import tier_algorithm, tier_variant
+from lib.text_metrics import TextMetrics
+from lib.widgets import Rect, WidgetTree
+
+# Widget rects on the 400x300 canvas, (left, top, right, bottom) with right/bottom exclusive.
+# The bottom bar is everything under the 3px horizontal border.
+LEFT_PANEL: Rect = (0, 0, 199, 224)
+RIGHT_PANEL: Rect = (202, 0, 400, 224)
+BOTTOM_BAR_TOP = 227
+# Z-order for the widget tree, back to front. The border lines, detailed weather rule and
+# user names never change, so they're part of the chrome base layer rather than widgets.
+WIDGET_ORDER = ["weather", "time", "date", "spotify_left", "spotify_right", "album_art"]
 
 class Draw:
     """ 
@@ -22,60 +41,51 @@ class Draw:
     def __init__(self, local_run: bool = False):
         self.local_run = local_run
         self.width, self.height = 400, 300
-        self.set_dictionaries()
+        self.text_metrics = TextMetrics()
+        self.line_breaker = LineBreaker(self.text_metrics)
+        self.layout_cache = LayoutCache()
         self.ds = display_settings
         self.load_resources()
-        self.album_image = None
         self.dt = None
         self.time_str = None
         self.weather_mode = False
-
-        # Make and get the full path to the 'album_art' directory
-        os.makedirs("cache", exist_ok=True)
-        os.makedirs("cache/album_art", exist_ok=True)
-        self.dir_path = os.path.abspath('cache/album_art')
+        # dark mode is drawn natively: every fill goes through ink() and icons through icon()
+        self.dark_mode = False
 
         self.image_mode = 'L' if self.ds.four_gray_scale else '1'
-        if self.ds.four_gray_scale:
-            self._four_gray_palette = self._make_four_gray_palette()
-        
+
+        # image_obj is the retained canvas widgets draw into; frame is what gets pushed to the EPD
+        # (the canvas itself, unless dark_mode_flip() inverted a copy of a light mode canvas)
         self.image_obj = Image.new(self.image_mode, (self.width, self.height), 255)
         self.image_draw = ImageDraw.Draw(self.image_obj)
+        self.frame = self.image_obj
+        image_store.track("canvas", "image_obj", [self.image_obj])
+        self.widgets = WidgetTree(WIDGET_ORDER)
+        # chrome base layers by chrome_key(), and the crops of the current one widgets get cleared to
+        self.chrome_layers: Dict[tuple, Image.Image] = {}
+        self.chrome_crops: Dict[Rect, Image.Image] = {}
+        self.current_chrome: Optional[tuple] = None
+        # spotify widget -> (x, user_name) of the column whose name is in the chrome
+        self.chrome_names: Dict[str, Tuple[int, str]] = {}
+        # seconds spent dithering album art by quality tier, since Clock last took them
+        self.dither_seconds: Dict[str, float] = {}
+        self.load_glyph_atlases()
+        self.icons = IconAtlas(self.image_mode, self.ds.four_gray_scale)
 
     def load_resources(self):
         """
         Load local resources. 
 
-        This method loads fonts and icons from the /ePaperFonts and /Icons directories respectively.
-        It initializes several instance variables with these resources. The fonts are loaded with 
-        different sizes (16, 32, 64) and the icons are loaded as images.
+        This method loads fonts from the /ePaperFonts directory, at
+        different sizes (16, 32, 64). Icons from /Icons are preprocessed
+        into self.icons, an IconAtlas, once the image mode is known.
 
         Fonts:
         - DSfnt16, DSfnt32, DSfnt64: Fonts from the Nintendo-DS-BIOS.ttf file.
         - helveti16, helveti32, helveti64: Fonts from the Habbo.ttf file.
-
-        Icons:
-            - music_context:
-                - playlist_icon: Icon for playlist.
-                - artist_icon: Icon for artist.
-                - album_icon: Icon for album.
-                - dj_icon: Icon for DJ.
-                - collection_icon: Icon for collection.
-            - weather:
-                - 01n: Icon for clear sky at night.
-                - 02n: Icon for few clouds at night.
-                - 03n: Icon for scattered clouds at night.
-                - 04n: Icon for broken clouds at night.
-                - 09n: Icon for shower rain at night.
-                - 10n: Icon for rain at night.
-                - 11n: Icon for thunderstorm at night.
-                - 13n: Icon for snow at night.
-                - 50n: Icon for mist at night.
         """
         self.DSfnt16, self.DSfnt32, self.DSfnt64 = None, None, None
         self.helveti16, self.helveti32, self.helveti64 = None, None, None
-        self.playlist_icon, self.artist_icon, self.album_icon, self.dj_icon, self.collection_icon, self.failure_icon = None, None, None, None, None, None
-        self.weather_icon_dict = None
         font_sizes = [16, 32, 64]
         font_files = ['Nintendo-DS-BIOS.ttf', 'Habbo.ttf']
         for font_file in font_files:
@@ -87,103 +97,15 @@ class Draw:
                     logger.error("Failed to load font ePaperFonts/%s: %s", font_file, e)
                     raise
 
-        music_context_icons = ['playlist', 'artist', 'album', 'dj', 'collection', 'failure']
-        for icon in music_context_icons:
-            try:
-                setattr(self, f'{icon}_icon', Image.open(f'Icons/music_context/{icon}.png'))
-            except (FileNotFoundError, OSError) as e:
-                logger.error("Failed to load icon Icons/music_context/%s.png: %s", icon, e)
-                raise
-
-        weather_icons = ['01', '02', '03', '04', '09', '10', '11', '13', '50']
-        self.weather_icon_dict = {}
-        for icon in weather_icons:
-            try:
-                self.weather_icon_dict[icon] = Image.open(f'Icons/weather/{icon}.png')
-            except (FileNotFoundError, OSError) as e:
-                logger.error("Failed to load weather icon Icons/weather/%s.png: %s", icon, e)
-                raise
-
-    def set_dictionaries(self):
-        """
-        This method initializes three dictionaries: sf_dict, mf_dict, and lf_dict. Each dictionary represents a mapping
-        from characters to their corresponding pixel lengths in different font sizes. This method is used to get the 
-        pixel length of strings as they're built.
-        """
-        self.sf_dict = {' ': '2', '!': '2', '"': '4', '#': '8', '$': '6', '%': '8',
-        '&': '7', "'": '2', '(': '4', ')': '4', '*': '8', '+': '6', ',': '3',
-        '-': '6', '.': '2', '/': '4', '0': '6', '1': '3', '2': '6', '3': '6',
-        '4': '7', '5': '6', '6': '6', '7': '6', '8': '6', '9': '6', ':': '2',
-        ';': '3', '<': '4', '=': '6', '>': '4', '?': '5', '@': '8', 'A': '6',
-        'B': '6', 'C': '6', 'D': '6', 'E': '5', 'F': '5', 'G': '6', 'H': '6',
-        'I': '2', 'J': '5', 'K': '6', 'L': '5', 'M': '6', 'N': '6', 'O': '6',
-        'P': '6', 'Q': '6', 'R': '6', 'S': '5', 'T': '6', 'U': '6', 'V': '6',
-        'W': '6', 'X': '6', 'Y': '6', 'Z': '5', '[': '4', '\\': '4', ']': '4',
-        '^': '4', '_': '6', 'a': '6', 'b': '6', 'c': '6', 'd': '6', 'e': '6',
-        'f': '5', 'g': '6', 'h': '6', 'i': '2', 'j': '4', 'k': '5', 'l': '3',
-        'm': '8', 'n': '6', 'o': '6', 'p': '6', 'q': '6', 'r': '5', 's': '5',
-        't': '5', 'u': '6', 'v': '6', 'w': '6', 'x': '6', 'y': '6', 'z': '6',
-        '{': '5', '|': '2', '}': '5', '~': '6', '¡': '2', '¢': '7', '£': '6',
-        '©': '10', '®': '10', '±': '6', '¿': '5', 'À': '6', 'Á': '6', 'Â': '6',
-        'Ä': '6', 'Ç': '5', 'È': '5', 'É': '5', 'Ê': '5', 'Ë': '5', 'Ì': '3',
-        'Í': '3', 'Î': '4', 'Ï': '4', 'Ñ': '6', 'Ò': '6', 'Ó': '6', 'Ô': '6',
-        'Ö': '6', '×': '6', 'Ù': '6', 'Ú': '6', 'Û': '6', 'Ü': '6', 'ß': '6',
-        'à': '6', 'á': '6', 'â': '6', 'ä': '6', 'è': '6', 'é': '6', 'ê': '6',
-        'ë': '6', 'ì': '3', 'í': '3', 'î': '4', 'ï': '4', 'ñ': '6', 'ò': '6',
-        'ó': '6', 'ô': '6', 'ö': '6', '÷': '6', 'ù': '6', 'ú': '6', 'û': '6',
-        'ü': '6', '‘': '3', '’': '3', '“': '5', '”': '5', '…': '6', '€': '7',
-        '™': '10', '\x00': '9'}
-        self.mf_dict = {' ': '4', '!': '4', '"': '8', '#': '16', '$': '12', '%': '16',
-        '&': '14', "'": '4', '(': '8', ')': '8', '*': '16', '+': '12', ',': '6',
-        '-': '12', '.': '4', '/': '8', '0': '12', '1': '6', '2': '12', '3': '12',
-        '4': '14', '5': '12', '6': '12', '7': '12', '8': '12', '9': '12',
-        ':': '4', ';': '6', '<': '8', '=': '12', '>': '8', '?': '10', '@': '16',
-        'A': '12', 'B': '12', 'C': '12', 'D': '12', 'E': '10', 'F': '10',
-        'G': '12', 'H': '12', 'I': '4', 'J': '10', 'K': '12', 'L': '10',
-        'M': '12', 'N': '12', 'O': '12', 'P': '12', 'Q': '12', 'R': '12',
-        'S': '10', 'T': '12', 'U': '12', 'V': '12', 'W': '12', 'X': '12',
-        'Y': '12', 'Z': '10', '[': '8', '\\': '8', ']': '8', '^': '8', '_': '12',
-        'a': '12', 'b': '12', 'c': '12', 'd': '12', 'e': '12', 'f': '10',
-        'g': '12', 'h': '12', 'i': '4', 'j': '8', 'k': '10', 'l': '6', 'm': '16',
-        'n': '12', 'o': '12', 'p': '12', 'q': '12', 'r': '10', 's': '10',
-        't': '10', 'u': '12', 'v': '12', 'w': '12', 'x': '12', 'y': '12',
-        'z': '12', '{': '10', '|': '4', '}': '10', '~': '12', '¡': '4',
-        '¢': '14', '£': '12', '©': '20', '®': '20', '±': '12', '¿': '10',
-        'À': '12', 'Á': '12', 'Â': '12', 'Ä': '12', 'Ç': '10', 'È': '10',
-        'É': '10', 'Ê': '10', 'Ë': '10', 'Ì': '6', 'Í': '6', 'Î': '8', 'Ï': '8',
-        'Ñ': '12', 'Ò': '12', 'Ó': '12', 'Ô': '12', 'Ö': '12', '×': '12',
-        'Ù': '12', 'Ú': '12', 'Û': '12', 'Ü': '12', 'ß': '12', 'à': '12',
-        'á': '12', 'â': '12', 'ä': '12', 'è': '12', 'é': '12', 'ê': '12',
-        'ë': '12', 'ì': '6', 'í': '6', 'î': '8', 'ï': '8', 'ñ': '12', 'ò': '12',
-        'ó': '12', 'ô': '12', 'ö': '12', '÷': '12', 'ù': '12', 'ú': '12',
-        'û': '12', 'ü': '12', '‘': '6', '’': '6', '“': '10', '”': '10',
-        '…': '12', '€': '14', '™': '20', '\x00': '18'}
-        self.lf_dict = {' ': '9', '!': '9', '"': '17', '#': '33', '$': '25', '%': '33',
-        '&': '29', "'": '9', '(': '17', ')': '17', '*': '33', '+': '25',
-        ',': '13', '-': '25', '.': '9', '/': '17', '0': '25', '1': '13',
-        '2': '25', '3': '25', '4': '29', '5': '25', '6': '25', '7': '25',
-        '8': '25', '9': '25', ':': '9', ';': '13', '<': '17', '=': '25',
-        '>': '17', '?': '21', '@': '33', 'A': '25', 'B': '25', 'C': '25',
-        'D': '25', 'E': '21', 'F': '21', 'G': '25', 'H': '25', 'I': '9',
-        'J': '21', 'K': '25', 'L': '21', 'M': '25', 'N': '25', 'O': '25',
-        'P': '25', 'Q': '25', 'R': '25', 'S': '21', 'T': '25', 'U': '25',
-        'V': '25', 'W': '25', 'X': '25', 'Y': '25', 'Z': '21', '[': '17',
-        '\\': '17', ']': '17', '^': '17', '_': '25', 'a': '25', 'b': '25',
-        'c': '25', 'd': '25', 'e': '25', 'f': '21', 'g': '25', 'h': '25',
-        'i': '9', 'j': '17', 'k': '21', 'l': '13', 'm': '33', 'n': '25',
-        'o': '25', 'p': '25', 'q': '25', 'r': '21', 's': '21', 't': '21',
-        'u': '25', 'v': '25', 'w': '25', 'x': '25', 'y': '25', 'z': '25',
-        '{': '21', '|': '9', '}': '21', '~': '25', '¡': '9', '¢': '29', '£': '25',
-        '©': '41', '®': '41', '±': '25', '¿': '21', 'À': '25', 'Á': '25',
-        'Â': '25', 'Ä': '25', 'Ç': '21', 'È': '21', 'É': '21', 'Ê': '21',
-        'Ë': '21', 'Ì': '13', 'Í': '13', 'Î': '17', 'Ï': '17', 'Ñ': '25',
-        'Ò': '25', 'Ó': '25', 'Ô': '25', 'Ö': '25', '×': '25', 'Ù': '25',
-        'Ú': '25', 'Û': '25', 'Ü': '25', 'ß': '25', 'à': '25', 'á': '25',
-        'â': '25', 'ä': '25', 'è': '25', 'é': '25', 'ê': '25', 'ë': '25',
-        'ì': '13', 'í': '13', 'î': '17', 'ï': '17', 'ñ': '25', 'ò': '25',
-        'ó': '25', 'ô': '25', 'ö': '25', '÷': '25', 'ù': '25', 'ú': '25',
-        'û': '25', 'ü': '25', '‘': '13', '’': '13', '“': '21', '”': '21',
-        '…': '25', '€': '29', '™': '41', '\x00': '36'}
+    def load_glyph_atlases(self) -> None:
+        """
+        Build (or load from cache/glyph_atlas/) a GlyphAtlas for every font we draw with,
+        rasterized for the active image mode. draw_text() uses these instead of FreeType.
+        """
+        self.glyph_atlases = {
+            font: GlyphAtlas(font, self.image_mode)
+            for font in (self.DSfnt16, self.DSfnt32, self.DSfnt64, self.helveti32)
+        }
 
     def set_weather_mode(self, weather_mode: bool) -> None:
         """
@@ -196,10 +118,12 @@ class Draw:
 
     def clear_image(self) -> None:
         """
-        Clears the current image by creating a new blank image filled with the color white (255).
+        Clears the canvas in place to the background color (white, or black in dark mode).
+        Every widget is redrawn on the next render_frame().
         """
-        self.image_obj = Image.new(self.image_mode, (self.width, self.height), 255)
-        self.image_draw = ImageDraw.Draw(self.image_obj)
+        self.image_obj.paste(self.ink(255), (0, 0, self.width, self.height))
+        self.frame = self.image_obj
+        self.widgets.invalidate_all()
 
     def save_png(self, file_name: str) -> None:
         """
@@ -210,128 +134,188 @@ class Draw:
         """
         output_dir = "test_output"
         os.makedirs(output_dir, exist_ok=True)
-        self.image_obj.save(os.path.join(output_dir, f"{file_name}.png"))
+        self.frame.save(os.path.join(output_dir, f"{file_name}.png"))
 
-    # ---- Formatting Functions ----------------------------------------------------------------------------
-    def get_text_width(self, text: str, size: int) -> int:
+    # ---- Widgets ----------------------------------------------------------------------------
+    def update_widget(self, name: str, inputs, rects: List[Rect], render) -> bool:
         """
-        Return an int representing the size of a word.
-
-        Requires three dictionaries, defining the width of each char
-        for our given font, Nintendo-DS-BIOS.ttf
+        Register a widget's current inputs with the widget tree; it is only re-rendered
+        by render_frame() if they differ from the ones it was last drawn with.
 
         Args:
-            text (str): The text to measure.
-            size (int): The size of the text.
+            name (str): The widget's name, one of WIDGET_ORDER.
+            inputs: Anything comparable that fully determines what the widget draws.
+            rects (List[Rect]): The canvas areas the widget draws within.
+            render: Callable that draws the widget onto the canvas.
 
         Returns:
-            int: The width of the text.
+            bool: True if the widget needs re-rendering.
         """
-        size_dict = {
-            2: (self.lf_dict, 25),
-            1: (self.mf_dict, 12),
-            0: (self.sf_dict, 6)
-        }
+        return self.widgets.update(name, inputs, rects, render)
 
-        char_dict, default_value = size_dict.get(size)
-        if char_dict is None:
-            raise ValueError(f"Invalid size: {size}")
-        return sum(int(char_dict.get(c, default_value)) for c in text)
-
-    def format_x_word(self, text_size_list: List[int], text_list: List[str], size: int) -> List[str]:
+    def render_frame(self, dark_mode: bool) -> List[Rect]:
         """
-        Return a list of 'squished' words to fit exact width dimensions.
+        Re-render the dirty widgets into the retained canvas, restoring the areas they
+        (and anything they overlap) occupy from the chrome base layer first. The canvas is the frame for the EPD.
 
-        Parameters:
-            text_size_list: a list of ints representing the width of each word.
-            text_list: a list of strs to be combined as to print neater words.
-            size: {0, 1, 2} to denote DS font sizes {16, 32, 64}.
+        Args:
+            dark_mode (bool): Whether to draw in dark mode; switching redraws every widget.
 
         Returns:
-            new text_list: a list of strs, occasionally combined if possible.
-        """
-        temp_text_list = []
-        phrase_width, floor_index = 0, 0
-        max_width = 189  # Widest width we will allow as we build word by word
-        space_size = (1 + size // .6) * 2  # Correlation between size{0, 1, 2} and the pixel count of a ' ' char
-
-        for i, word_width in enumerate(text_size_list):
-            if i != len(text_size_list) - 1:  # Not our last word
-                if phrase_width + word_width + space_size < max_width:  # Can fit word in last row
-                    phrase_width += word_width + space_size
-                else:  # Cannot fit word in last row
-                    temp_text_list.append(" ".join(text_list[floor_index:i]))
-                    floor_index, phrase_width = i, word_width
-            else:  # Last word
-                if phrase_width + word_width + space_size < max_width:  # Can fit last word in last row
-                    temp_text_list.append(" ".join(text_list[floor_index:i + 1]))
-                else:  # Cannot fit last word in last row
-                    if len(text_list) != 1:  # If we have more than one word, separate prior to current
-                        temp_text_list.append(" ".join(text_list[floor_index:i]))
-                        temp_text_list.append(text_list[i])
-                    else:  # Only one word, return whole word to be hyphenated later
-                        temp_text_list.append(text_list[i])
-
-        temp_text_list = [word for word in temp_text_list if word != '']
-        return temp_text_list
-
-    def hyphenate_words(self, word: str, size: int) -> List[str]:
-        """
-        Return a list of 'spliced' word segments to fit exact width dimensions.
+            List[Rect]: The canvas areas that were repainted.
+        """
+        self.set_dark_mode(dark_mode)
+        chrome_key = self.chrome_key()
+        if chrome_key != self.current_chrome:
+            self.current_chrome = chrome_key
+            self.chrome_crops = {}
+            self.widgets.invalidate_all()
+
+        def clear(rect: Optional[Rect]) -> None:
+            chrome = self.chrome_layer(chrome_key)
+            if rect is None:
+                self.image_obj.paste(chrome)
+                return
+            crop = self.chrome_crops.get(rect)
+            if crop is None:
+                crop = self.chrome_crops[rect] = chrome.crop(rect)
+            self.image_obj.paste(crop, rect)
 
-        Parameters:
-            word: our string to hyphenate
-            size: {0, 1, 2} to denote DS font sizes {16, 32, 64}
+        damage = self.widgets.render(clear)
+        self.frame = self.image_obj
+        return damage
 
-        Returns:
-            new text_list: a list of split strs from our word
+    # ---- Chrome -----------------------------------------------------------------------------
+    def chrome_key(self) -> tuple:
+        """
+        Everything the chrome base layer depends on: the theme, whether the detailed weather
+        panel (and so its rule) is up, which side it's on, and the user names and where they go.
         """
-        temp_text_list = []
-        phrase_width, floor_index = 0, 0
-        max_width = 177  # Widest width we will allow as we build char by char
+        return (self.dark_mode, self.weather_mode, self.ds.album_art_right_side, tuple(sorted(self.chrome_names.values())))
 
-        size_dict = {
-            1: self.mf_dict,
-            0: self.sf_dict
-        }
+    def chrome_layer(self, chrome_key: tuple) -> Image.Image:
+        """
+        Return the base layer for chrome_key, drawing it the first time: the background
+        with everything static on top (border lines, the detailed weather rule, each
+        user's name and underline). Widgets are cleared to it instead of to a flat fill.
+        """
+        chrome = self.chrome_layers.get(chrome_key)
+        if chrome is not None:
+            return chrome
 
-        char_dict = size_dict.get(size)
-        if char_dict is None:
-            raise ValueError(f"Invalid size: {size}")
+        # draw it with the usual methods onto the canvas, which is about to be fully repainted anyway
+        self.clear_image()
+        self.draw_border_lines()
+        if self.weather_mode:
+            self.draw_detailed_weather_border()
+        for x, user_name in self.chrome_names.values():
+            self.draw_name(user_name, x + 3, 0)
+        chrome = self.chrome_layers[chrome_key] = self.image_obj.copy()
+        image_store.track("chrome", chrome_key, [chrome])
+        return chrome
 
-        default_value = 12 if size == 1 else 25
+    # ---- Theme ----------------------------------------------------------------------------
+    def set_dark_mode(self, dark_mode: bool) -> None:
+        """
+        Switch between light and dark mode. Everything on the canvas is in the old
+        colors, so every widget is redrawn on the next render_frame().
+        """
+        if dark_mode == self.dark_mode:
+            return
+        self.dark_mode = dark_mode
+        self.widgets.invalidate_all()
+
+    def ink(self, fill: int) -> int:
+        """
+        Map a light mode color (0 black - 255 white) to the current theme.
+        """
+        return 255 - fill if self.dark_mode else fill
 
-        # Iterate over every character in the word
-        for i, c in enumerate(word):
-            char_size = int(char_dict.get(c, default_value))
+    def icon(self, name: str) -> Image.Image:
+        """
+        Return the preprocessed icon called name from the IconAtlas, inverted in dark mode.
+        """
+        return self.icons.get(name, inverted=self.dark_mode)
 
-            # Our last character
-            if len(word) - 1 == i:
-                temp_text_list.append(word[floor_index:i + 1])
-            # We can add more characters to our split string
-            elif phrase_width + char_size < max_width:
-                phrase_width += char_size
-            # Attach hyphen and start building new split string
-            else:
-                temp_text_list.append(word[floor_index:i] + "-")
-                floor_index, phrase_width = i, char_size
+    def widget_timings(self) -> dict:
+        """
+        Per-widget render time in milliseconds for the last render_frame(), in z-order.
+        """
+        return {name: round(seconds * 1000, 2) for name, seconds in self.widgets.timings.items()}
 
-        return temp_text_list
+    def update_track_info(self, track: str, artist: str, ctx_type: str, ctx_title: str, x: int, y: int, user_name: str, time_since: str) -> None:
+        """
+        Register the Spotify column at x (spotify_left or spotify_right) with draw_track_info() as its renderer.
+        The user's name goes into the chrome base layer instead.
+        """
+        name, rect = ("spotify_left", LEFT_PANEL) if x < LEFT_PANEL[2] else ("spotify_right", RIGHT_PANEL)
+        self.chrome_names[name] = (x, user_name)
+        inputs = (track, artist, ctx_type, ctx_title, x, y, user_name, time_since)
+        self.update_widget(name, inputs, [rect], lambda: self.draw_track_info(*inputs))
 
-    def can_full_words_fit(self, text_size_list: List[int]) -> bool:
+    def update_bottom_bar(self, weather_info: Optional[Tuple[int, int, int]], time_str: str, reauth_days_left: Optional[int] = None) -> None:
         """
-        Check if all words can fit within the maximum width.
+        Register the time, weather, and date (or reauth banner) widgets of the bottom bar.
+        Each spans the full height of the bar, so e.g. a tick of the clock only repaints
+        the time's slot. draw_time(), draw_weather() and draw_date() do the drawing.
+        """
+        time_pos, time_width, weather_pos, center_x = self.layout_bottom_bar(weather_info, time_str)
+        date_str = dt.now().strftime("%a, %b %-d")
 
-        Parameters:
-            text_size_list: a list of ints representing the width of each word.
+        time_rect = self.bar_rect(time_pos[0] - 15, time_pos[0] + time_width + 20)
+        self.update_widget("time", (time_str, time_pos), [time_rect], lambda: self.draw_time(time_pos))
+
+        weather_rect = self.bar_rect(weather_pos[0] - 2, weather_pos[0] + self.weather_width(weather_info) + 2)
+        self.update_widget("weather", (weather_info, weather_pos), [weather_rect], lambda: self.draw_weather(weather_pos, weather_info))
+
+        date_width = self.get_text_width(date_str, 1)
+        if reauth_days_left is not None:
+            date_width = max(date_width, self.get_text_width(self.reauth_label(reauth_days_left), 1))
+        date_rect = self.bar_rect(center_x - date_width // 2 - 8, center_x + date_width // 2 + 8)
+        self.update_widget("date", (date_str, reauth_days_left, center_x), [date_rect], lambda: self.draw_date(center_x, reauth_days_left))
+
+    def bar_rect(self, left: float, right: float) -> Rect:
+        """
+        A rect spanning the full height of the bottom bar between left and right, clipped to the canvas.
+        """
+        return (max(int(left), 0), BOTTOM_BAR_TOP, min(int(right) + 1, self.width), self.height)
+
+    # ---- Formatting Functions ----------------------------------------------------------------------------
+    def get_text_width(self, text: str, size: int) -> int:
+        """
+        Return an int representing the size of a word.
+
+        Widths come from TextMetrics, which derives per-character advance tables
+        for our given font, Nintendo-DS-BIOS.ttf, at each DS font size.
+
+        Args:
+            text (str): The text to measure.
+            size (int): The size of the text.
 
         Returns:
-            bool: True if all words can fit, False otherwise.
+            int: The width of the text.
         """
-        max_width = 189  # Maximum width a word can have
-        return all(word_len < max_width for word_len in text_size_list)
+        return self.text_metrics.measure(text, size)
 
     # ---- DRAWING FUNCs ----------------------------------------------------------------------------
+    def draw_text(self, pos: tuple, text: str, font: ImageFont.FreeTypeFont, fill: int = 0) -> None:
+        """
+        Draws text by pasting pre-rasterized glyphs from the font's GlyphAtlas, snapped to whole pixels.
+        Fonts without an atlas (and glyphs missing from one) are drawn by FreeType as usual.
+
+        Parameters:
+            pos: The (x, y) pen position of the top-left of the text.
+            text: The text to draw.
+            font: The font to draw in.
+            fill: The light mode fill color, see ink().
+        """
+        fill = self.ink(fill)
+        atlas = self.glyph_atlases.get(font)
+        if atlas is None:
+            self.image_draw.text(pos, text, font=font, fill=fill)
+            return
+        atlas.draw(self.image_obj, self.image_draw, pos, text, fill)
+
     def draw_border_lines(self) -> None:
         """
         Draw vertical and horizontal lines of width 3 on the image.
@@ -341,8 +325,8 @@ class Draw:
         horizontal_line_x = 199
 
         for i in range(line_width):
-            self.image_draw.line([(0, vertical_line_y + i), (400, vertical_line_y + i)], fill=0)
-            self.image_draw.line([(horizontal_line_x + i, 0), (horizontal_line_x + i, 225)], fill=0)
+            self.image_draw.line([(0, vertical_line_y + i), (400, vertical_line_y + i)], fill=self.ink(0))
+            self.image_draw.line([(horizontal_line_x + i, 0), (horizontal_line_x + i, 225)], fill=self.ink(0))
 
     def draw_name(self, text: str, name_x: int, name_y: int) -> Tuple[int, float]:
         """
@@ -356,16 +340,20 @@ class Draw:
         Returns:
             A tuple containing the width and height of the text.
         """
-        name_width = self.image_draw.textlength(text, font=self.helveti32)
-        name_height = self.helveti32.size / 1.3
-        self.image_draw.text((name_x, name_y), text, font=self.helveti32)
-
+        name_width, name_height = self.name_size(text)
+        self.draw_text((name_x, name_y), text, font=self.helveti32)
         line_start = (name_x - 1, name_y + name_height + 3)
         line_end = (name_x + name_width - 1, name_y + name_height + 3)
-        self.image_draw.line([line_start, line_end], fill=0)
+        self.image_draw.line([line_start, line_end], fill=self.ink(0))
 
         return name_width, name_height
 
+    def name_size(self, text: str) -> Tuple[float, float]:
+        """
+        The width and height draw_name() reports for text.
+        """
+        return self.image_draw.textlength(text, font=self.helveti32), self.helveti32.size / 1.3
+
     def draw_user_time_ago(self, text: str, time_x: int, time_y: int) -> None:
         """
         Draw the given text at the specified position using the DSfnt16 font.
@@ -375,7 +363,7 @@ class Draw:
             time_x: The x-coordinate of the top-left corner of the text.
             time_y: The y-coordinate of the top-left corner of the text.
         """
-        self.image_draw.text((time_x, time_y), text, font=self.DSfnt16)
+        self.draw_text((time_x, time_y), text, font=self.DSfnt16)
 
     def draw_detailed_weather_border(self) -> None:
         """
@@ -388,7 +376,7 @@ class Draw:
         for i in range(line_width):
             line_start = (border_x, 46 + i)
             line_end = (border_x + 200, 46 + i)
-            self.image_draw.line([line_start, line_end], fill=border_fill)
+            self.image_draw.line([line_start, line_end], fill=self.ink(border_fill))
 
     def detailed_weather_album_name(self, album_name: str) -> None:
         """
@@ -400,12 +388,11 @@ class Draw:
         album_name_x = 253 if self.ds.album_art_right_side else 53
         album_name_y = 10
         max_album_width = 126
-        default_char_width = 23
         album_width, formatted_album_name = 0, ""
 
         # make sure we don't run past context width requirements
         for c in album_name:
-            char_width = int(self.mf_dict.get(c, default_char_width))
+            char_width = self.text_metrics.advance(c, 1)
             if album_width + char_width < max_album_width:
                 album_width += char_width
                 formatted_album_name += c
@@ -413,9 +400,9 @@ class Draw:
                 formatted_album_name += "..."
                 break
         else:
-            self.image_obj.paste(self.album_icon, (album_name_x + max_album_width - 4, album_name_y + 3))
+            self.image_obj.paste(self.icon('album'), (album_name_x + max_album_width - 4, album_name_y + 3))
 
-        self.image_draw.text((album_name_x, album_name_y), formatted_album_name, font=self.DSfnt32)
+        self.draw_text((album_name_x, album_name_y), formatted_album_name, font=self.DSfnt32)
 
     def draw_detailed_weather_information(self, weather_info: dict) -> None:
         """
@@ -444,24 +431,20 @@ class Draw:
             am_pm = hour_str[-2:] if "am" in hour_str or "pm" in hour_str else ""
             current_time = hour_str[:-2] if am_pm else hour_str
             time_pos = (box_x + 5, box_y + 5)
-            self.image_draw.text(time_pos, current_time, font=self.DSfnt32)
-
+            self.draw_text(time_pos, current_time, font=self.DSfnt32)
             if am_pm:
-                am_pm_x = time_pos[0] + self.image_draw.textlength(current_time, font=self.DSfnt32)
-                self.image_draw.text((am_pm_x + 1, time_pos[1] + 11), am_pm, font=self.DSfnt16)
-
+                am_pm_x = time_pos[0] + self.get_text_width(current_time, 1)
+                self.draw_text((am_pm_x + 1, time_pos[1] + 11), am_pm, font=self.DSfnt16)
             desc_icon_id = info.get('desc_icon_id', '')[:2]
-            if desc_icon_id in self.weather_icon_dict:
-                icon = self.weather_icon_dict[desc_icon_id]
-                resized_icon = icon.resize((44, 44))
-                self.image_obj.paste(resized_icon, (box_x + 98, box_y - 4))
+            if f'weather/{desc_icon_id}' in self.icons:
+                self.image_obj.paste(self.icon(f'weather/{desc_icon_id}'), (box_x + 98, box_y - 4))
 
             t_fill = 32 if self.ds.four_gray_scale else 0
             temp = info.get('temp', '')
             temp_width = self.get_text_width(str(temp), 1)
-            self.image_draw.text((box_x + box_width - temp_width - 12, box_y + 5), str(temp), font=self.DSfnt32, fill=t_fill)
+            self.draw_text((box_x + box_width - temp_width - 12, box_y + 5), str(temp), font=self.DSfnt32, fill=t_fill)
             unit = "C" if self.ds.metric_units else "F"
-            self.image_draw.text((box_x + box_width - 10, box_y + 7), unit, font=self.DSfnt16, fill=t_fill)
+            self.draw_text((box_x + box_width - 10, box_y + 7), unit, font=self.DSfnt16, fill=t_fill)
 
     def draw_spot_context(self, context_type: str, context_text: str, context_x: int, context_y: int) -> bool:
         """
@@ -481,11 +464,10 @@ class Draw:
 
         context_width, temp_context = 0, ""
         max_context_width = 168
-        default_char_width = 6
 
         # make sure we don't run past context width requirements
         for c in context_text:
-            char_width = int(self.sf_dict.get(c, default_char_width))
+            char_width = self.text_metrics.advance(c, 0)
             if context_width + char_width < max_context_width:
                 context_width += char_width
                 temp_context += c
@@ -493,66 +475,50 @@ class Draw:
                 temp_context += "..."
                 break
 
-        self.image_draw.text((context_x, context_y), temp_context, font=self.DSfnt16)
-
+        self.draw_text((context_x, context_y), temp_context, font=self.DSfnt16)
         # ATTACH ICONS
         icon_dict = {
-            'DJ': self.dj_icon,
-            'playlist': self.playlist_icon,
-            'album': self.album_icon,
-            'artist': self.artist_icon,
-            'collection': self.collection_icon
+            'DJ': 'dj',
+            'playlist': 'playlist',
+            'album': 'album',
+            'artist': 'artist',
+            'collection': 'collection'
         }
 
-        icon = icon_dict.get(context_type, self.failure_icon)
+        icon = self.icon(icon_dict.get(context_type, 'failure'))
         icon_x = context_x - 24
         icon_y = context_y - 4
         self.image_obj.paste(icon, (icon_x, icon_y))
 
         return True
 
-    def draw_album_image(self, dark_mode: bool, image_file_name: str="AlbumImage_resize.PNG", image_file_path: str="cache/album_art/", pos: tuple=(0, 0), convert_image: bool=True) -> None:
+    def draw_album_image(self, art_name: str = "NA", pos: tuple=(0, 0), tier: str = "full") -> None:
         """
         Draws the album image on the ePaper display.
 
+        Picks the 199px resize or, in weather mode, the 46px thumbnail of the cover from the
+        album art cache; in four gray mode that variant's dither at the given quality tier,
+        made here if it isn't cached yet.
+        Everything stays in memory; the cache persists variants to disk in the background.
+
         Parameters:
-        dark_mode (bool): Flag indicating whether to apply dark mode to the album image.
-        image_file_name (str, optional): The name of the album image file. Defaults to "AlbumImage_resize.PNG".
+        art_name (str, optional): The cover's key in the album art cache, or "NA" for the fallback art.
         pos (tuple, optional): The position (x, y) where the album image should be pasted on the display. Defaults to (0, 0).
-        convert_image (bool, optional): Flag indicating whether to convert the image to the specified image mode. Defaults to True.
-        """
-        image_file_name = "AlbumImage_resize.PNG" if image_file_name is None else image_file_name
-        if convert_image or self.album_image is None:
-            try:
-                self.album_image = Image.open(f"{image_file_path}{image_file_name}")
-            except (FileNotFoundError, OSError) as e:
-                logger.error("Failed to open album art %s%s: %s", image_file_path, image_file_name, e)
-                return
-            self.album_image = self.album_image.convert(self.image_mode)
-
-            if self.ds.four_gray_scale:
-                before_dither = time()
-                if "NA" in image_file_name:
-                    self.dither_album_art("NA")
-                else:
-                    self.dither_album_art()
-                after_dither = time()
-                logger.info("* Dithering took %.2f seconds *", after_dither - before_dither)
-
-        chosen_album_image = "cache/album_art/AlbumImage" if "NA" not in image_file_name else "cache/album_art/NA"
-        chosen_album_image += "_thumbnail" if self.weather_mode else "_resize"
-        chosen_album_image = chosen_album_image.replace("_resize", "_dither") if self.ds.four_gray_scale else chosen_album_image
-        chosen_album_image += "_dither" if self.ds.four_gray_scale and self.weather_mode else ""
-        try:
-            self.album_image = Image.open(f"{chosen_album_image}.PNG")
-        except (FileNotFoundError, OSError) as e:
-            logger.error("Failed to open album art %s.PNG: %s", chosen_album_image, e)
-            return
+        tier (str, optional): The quality tier of the dither in four gray mode, see lib/render_quality.py. Defaults to "full".
+        """
+        variant = "thumbnail" if self.weather_mode else "resize"
+        if self.ds.four_gray_scale:
+            variant = tier_variant("thumbnail_dither" if self.weather_mode else "dither", tier)
+            if not album_art_cache.has(art_name, variant):
+                self.dither_album_art(art_name, tier)
 
-        if dark_mode:
-            self.album_image = ImageMath.eval('255-(a)', a=self.album_image.convert('L'))
+        album_image = album_art_cache.get(art_name, variant)
+        if album_image is None:
+            logger.error("Album art %s has no %s variant", art_name, variant)
+            return
 
-        self.image_obj.paste(self.album_image, pos)
+        # album art is pasted as is in both themes
+        self.image_obj.paste(album_image, pos)
 
     def draw_weather(self, pos: tuple, weather_info: tuple) -> None:
         """
@@ -563,36 +529,53 @@ class Draw:
         weather_info (tuple): A tuple containing the current temperature, high forecasted temperature, 
                             low forecasted temperature, and another temperature value.
         """
-        if not weather_info:
-            temp = temp_high = temp_low = "NA"
-            temp_degrees = ""
-        else:
-            temp, temp_high, temp_low = weather_info
-            temp_degrees = "C" if self.ds.metric_units else "F"
+        temp, temp_high, temp_low, temp_degrees = self.weather_strings(weather_info)
 
         # main temp pos calculations
         temp_start_x = pos[0]
-        temp_width = self.image_draw.textlength(str(temp), font=self.DSfnt64)
+        temp_width = self.get_text_width(str(temp), 2)
 
         # forecast temp pos calculations
         temp_high_width = self.get_text_width(str(temp_high), 1)
         temp_low_width = self.get_text_width(str(temp_low), 1)
-        forecast_temp_x = temp_start_x + temp_width + 18 + max(temp_low_width, temp_high_width)
-
-        # fixes negative temperature formatting issue
-        if (isinstance(temp_high, int) and isinstance(temp_low, int)) and (temp_high < 0 or temp_low < 0):
-            forecast_temp_x -= 5
+        forecast_temp_x = temp_start_x + self.forecast_temp_offset(weather_info)
 
         # draw main temp
-        self.image_draw.text(pos, str(temp), font=self.DSfnt64)
-        self.image_draw.text((temp_start_x + temp_width, 245), temp_degrees, font=self.DSfnt32)
-
+        self.draw_text(pos, str(temp), font=self.DSfnt64)
+        self.draw_text((temp_start_x + temp_width, 245), temp_degrees, font=self.DSfnt32)
         # draw forecast temp
         f_fill = 32 if self.ds.four_gray_scale else 0
-        self.image_draw.text((forecast_temp_x - temp_high_width, 242), str(temp_high), font=self.DSfnt32, fill=f_fill)
-        self.image_draw.text((forecast_temp_x + 2, 244), temp_degrees, font=self.DSfnt16, fill=f_fill)
-        self.image_draw.text((forecast_temp_x - temp_low_width, 266), str(temp_low), font=self.DSfnt32, fill=f_fill)
-        self.image_draw.text((forecast_temp_x + 2, 268), temp_degrees, font=self.DSfnt16, fill=f_fill)
+        self.draw_text((forecast_temp_x - temp_high_width, 242), str(temp_high), font=self.DSfnt32, fill=f_fill)
+        self.draw_text((forecast_temp_x + 2, 244), temp_degrees, font=self.DSfnt16, fill=f_fill)
+        self.draw_text((forecast_temp_x - temp_low_width, 266), str(temp_low), font=self.DSfnt32, fill=f_fill)
+        self.draw_text((forecast_temp_x + 2, 268), temp_degrees, font=self.DSfnt16, fill=f_fill)
+
+    def weather_strings(self, weather_info: Optional[Tuple[int, int, int]]) -> tuple:
+        """
+        The current, high, and low temperatures and unit letter draw_weather() shows ("NA" and no unit without weather).
+        """
+        if not weather_info:
+            return "NA", "NA", "NA", ""
+        temp, temp_high, temp_low = weather_info
+        return temp, temp_high, temp_low, "C" if self.ds.metric_units else "F"
+
+    def forecast_temp_offset(self, weather_info: Optional[Tuple[int, int, int]]) -> int:
+        """
+        How far right of the main temperature draw_weather() right-aligns the forecast temperatures.
+        """
+        temp, temp_high, temp_low, _ = self.weather_strings(weather_info)
+        offset = self.get_text_width(str(temp), 2) + 18 + max(self.get_text_width(str(temp_low), 1), self.get_text_width(str(temp_high), 1))
+        # fixes negative temperature formatting issue
+        if (isinstance(temp_high, int) and isinstance(temp_low, int)) and (temp_high < 0 or temp_low < 0):
+            offset -= 5
+        return offset
+
+    def weather_width(self, weather_info: Optional[Tuple[int, int, int]]) -> int:
+        """
+        The full width draw_weather() draws, through the forecast temperatures' unit letters.
+        """
+        temp_degrees = self.weather_strings(weather_info)[3]
+        return self.forecast_temp_offset(weather_info) + 2 + self.get_text_width(temp_degrees, 0)
 
     def draw_time(self, pos: tuple) -> None:
         """
@@ -610,28 +593,25 @@ class Draw:
         am_pm = self.time_str[-2:] if "am" in self.time_str or "pm" in self.time_str else ""
         current_time = self.time_str[:-2] if am_pm else self.time_str
 
-        text_width, text_height = self.image_draw.textlength(current_time, font=self.DSfnt64), self.DSfnt64.size/1.3
+        text_width, text_height = self.get_text_width(current_time, 2), self.DSfnt64.size/1.3
         if am_pm:
-            text_width += self.image_draw.textlength(am_pm, font=self.DSfnt32)
+            text_width += self.get_text_width(am_pm, 1)
 
         # Draw a white rectangle over the old date
         rectangle_pos = [pos[0]-15, pos[1]-10, pos[0]+text_width+20, pos[1]+text_height]
-        self.image_draw.rectangle(rectangle_pos, fill="white", outline="white")
-
-        self.image_draw.text(pos, current_time, font=self.DSfnt64)
+        self.image_draw.rectangle(rectangle_pos, fill=self.ink(255), outline=self.ink(255))
 
+        self.draw_text(pos, current_time, font=self.DSfnt64)
         if am_pm:
-            am_pm_x = pos[0] + self.image_draw.textlength(current_time, font=self.DSfnt64)
-            self.image_draw.text((am_pm_x, pos[1] + 22), am_pm, font=self.DSfnt32)
+            am_pm_x = pos[0] + self.get_text_width(current_time, 2)
+            self.draw_text((am_pm_x, pos[1] + 22), am_pm, font=self.DSfnt32)
 
-    def draw_date_time_temp(self, weather_info: Optional[Tuple[int, int, int]], time_str: str, reauth_days_left: Optional[int] = None) -> None:
+    def layout_bottom_bar(self, weather_info: Optional[Tuple[int, int, int]], time_str: str) -> tuple:
         """
-        This function draws the date, time, and temperature on the display.
+        Positions the time and weather at either end of the bottom bar, per ds.time_on_right.
 
-        When reauth_days_left is not None (the Spotify refresh token is within
-        its ~14-day warning window, or already expired at 0), a black pill
-        with white text temporarily replaces the date in the same slot,
-        rather than adding new screen real estate.
+        Returns:
+        tuple: The time position, time width, weather position, and the x the date is centered on.
         """
         temp, temp_high, temp_low = weather_info if weather_info else (0, 0, 0)
         left_elem_x = 10
@@ -639,37 +619,46 @@ class Draw:
         self.time_str = time_str
 
         # Calculate common elements
-        temp_width, temp_height = self.image_draw.textlength(str(temp), font=self.DSfnt64), self.DSfnt64.size/1.3
+        temp_width, temp_height = self.get_text_width(str(temp), 2), self.DSfnt64.size/1.3
         time_width, time_height = self.calculate_time_dimensions()
 
         if self.ds.time_on_right:
-            left_elem_y = self.height - (bar_height // 2) - (temp_height // 2)
-            self.draw_weather((left_elem_x, left_elem_y), weather_info)
-
+            weather_pos = (left_elem_x, self.height - (bar_height // 2) - (temp_height // 2))
             right_elem_x = self.width - time_width - 5
-            right_elem_y = self.height - (bar_height // 2) - (time_height // 2)
-            self.draw_time((right_elem_x, right_elem_y))
+            time_pos = (right_elem_x, self.height - (bar_height // 2) - (time_height // 2))
         else:
-            left_elem_y = self.height - (bar_height // 2) - (time_height // 2)
-            self.draw_time((left_elem_x, left_elem_y))
-
+            time_pos = (left_elem_x, self.height - (bar_height // 2) - (time_height // 2))
             forecast_temp_x = temp_width + 20
             temp_high_width, temp_low_width = self.get_text_width(str(temp_high), 1), self.get_text_width(str(temp_low), 1)
             right_elem_x = self.width - (forecast_temp_x + max(temp_high_width, temp_low_width) + 12)
-            right_elem_y = self.height - (bar_height // 2) - (temp_height // 2)
-            self.draw_weather((right_elem_x, right_elem_y), weather_info)
+            weather_pos = (right_elem_x, self.height - (bar_height // 2) - (temp_height // 2))
+
+        center_x = left_elem_x + time_width + (right_elem_x - left_elem_x - time_width) // 2
+        return time_pos, time_width, weather_pos, center_x
+
+    def draw_date(self, center_x: int, reauth_days_left: Optional[int] = None) -> None:
+        """
+        Draws the date (or reauth warning) centered on center_x in the bottom bar.
 
-        # Draw the date (or reauth warning) in the center of the bottom bar
+        When reauth_days_left is not None (the Spotify refresh token is within
+        its ~14-day warning window, or already expired at 0), a black pill
+        with white text temporarily replaces the date in the same slot,
+        rather than adding new screen real estate.
+        """
         self.dt = dt.now()
         if reauth_days_left is None:
-            date_width, date_height = self.image_draw.textlength(self.dt.strftime("%a, %b %-d"), font=self.DSfnt32), self.DSfnt32.size/1.3
-            date_x =  left_elem_x + time_width + (right_elem_x - left_elem_x - time_width) // 2 - date_width // 2
+            date_width, date_height = self.get_text_width(self.dt.strftime("%a, %b %-d"), 1), self.DSfnt32.size/1.3
+            date_x = center_x - date_width // 2
             date_y = 239 + date_height
-            self.image_draw.text((date_x, date_y), self.dt.strftime("%a, %b %-d"), font=self.DSfnt32)
+            self.draw_text((date_x, date_y), self.dt.strftime("%a, %b %-d"), font=self.DSfnt32)
         else:
-            self.draw_reauth_banner(reauth_days_left, left_elem_x, time_width, right_elem_x)
+            self.draw_reauth_banner(reauth_days_left, center_x)
+
+    @staticmethod
+    def reauth_label(days_left: int) -> str:
+        return f"! REAUTH {days_left}D" if days_left > 0 else "! REAUTH NEEDED"
 
-    def draw_reauth_banner(self, days_left: int, left_elem_x: int, time_width: int, right_elem_x: int) -> None:
+    def draw_reauth_banner(self, days_left: int, center_x: int) -> None:
         """
         Draws a black pill with inverted white text in the date's slot,
         centered between the time and weather like the date normally is, with
@@ -679,28 +668,25 @@ class Draw:
         Parameters:
         days_left: Days remaining on the refresh token, per
             SpotifyUser.days_until_reauth_required(); 0 means it's already expired.
-        left_elem_x, time_width, right_elem_x: same layout inputs draw_date_time_temp
-            uses to center the date, reused here so the banner lines up identically.
+        center_x: the x the date would be centered on, from layout_bottom_bar,
+            so the banner lines up identically.
         """
-        center_x = left_elem_x + time_width + (right_elem_x - left_elem_x - time_width) // 2
-
-        label = f"! REAUTH {days_left}D" if days_left > 0 else "! REAUTH NEEDED"
-        label_width, label_height = self.image_draw.textlength(label, font=self.DSfnt32), self.DSfnt32.size/1.3
+        label = self.reauth_label(days_left)
+        label_width, label_height = self.get_text_width(label, 1), self.DSfnt32.size/1.3
         label_x = center_x - label_width // 2
         label_y = 239 + label_height
 
         pad_x, pad_y = 5, 3
         self.image_draw.rectangle(
             [label_x - pad_x, label_y - pad_y, label_x + label_width + pad_x, label_y + label_height + pad_y],
-            fill=0,
+            fill=self.ink(0),
         )
-        self.image_draw.text((label_x, label_y), label, font=self.DSfnt32, fill=255)
-
+        self.draw_text((label_x, label_y), label, font=self.DSfnt32, fill=255)
         date_str = self.dt.strftime("%a, %b %-d")
-        date_width, date_height = self.image_draw.textlength(date_str, font=self.DSfnt32), self.DSfnt32.size/1.3
+        date_width, date_height = self.get_text_width(date_str, 1), self.DSfnt32.size/1.3
         date_x = center_x - date_width // 2
         date_y = label_y - pad_y - 4 - date_height
-        self.image_draw.text((date_x, date_y), date_str, font=self.DSfnt32)
+        self.draw_text((date_x, date_y), date_str, font=self.DSfnt32)
 
     def calculate_time_dimensions(self) -> tuple:
         """
@@ -714,19 +700,44 @@ class Draw:
         am_pm = self.time_str[-2:] if "am" in self.time_str or "pm" in self.time_str else ""
         current_time = self.time_str[:-2] if am_pm else self.time_str
 
-        time_width = self.image_draw.textlength(current_time, font=self.DSfnt64)
+        time_width = self.get_text_width(current_time, 2)
         time_height = self.DSfnt64.size / 1.3
 
         if am_pm:
-            time_width += self.image_draw.textlength(am_pm, font=self.DSfnt32)
+            time_width += self.get_text_width(am_pm, 1)
 
         return time_width, time_height
 
+    def draw_track_info(self, track: str, artist: str, ctx_type: str, ctx_title: str, x: int, y: int, user_name: str, time_since: str) -> None:
+        """
+        Draws the track information for one Spotify user's column.
+
+        Parameters:
+        - track (str): The name of the track.
+        - artist (str): The name of the artist.
+        - ctx_type (str): The context type of the track (e.g., album, playlist).
+        - ctx_title (str): The title of the context.
+        - x (int): The x-coordinate of the starting position.
+        - y (int): The y-coordinate of the starting position.
+        - user_name (str): The Spotify user's display name, already drawn with its underline by the chrome base layer.
+        - time_since (str): The time since the track was played.
+        """
+        ctx_type_is_album = ctx_type == "album"
+        track_line_count, track_text_size = self.draw_track_text(track, x, y)
+        y = 210 if ctx_type_is_album else 190
+        self.draw_artist_text(artist, track_line_count, track_text_size, x, y)
+        if not ctx_type_is_album:
+            self.draw_spot_context(ctx_type, ctx_title, x + 20, 204)
+
+        name_width, name_height = self.name_size(user_name)
+        self.draw_user_time_ago(time_since, x + 13 + name_width, name_height // 2)
+
     def draw_track_text(self, track_name: str, track_x: int, track_y: int) -> tuple:
         """
         Draws the track name at the specified position on the image.
 
         The track name is split into lines and drawn in a large, medium, or small format depending on its length.
+        Layouts are memoized in self.layout_cache, so redrawing an unchanged track only issues the text() calls.
 
         Parameters:
         track_name (str): The name of the track to be drawn.
@@ -736,51 +747,35 @@ class Draw:
         Returns:
         tuple: A tuple containing the number of lines the track name was split into and the height of the text.
         """
-        track_name_split = track_name.split(" ")
-        track_name_size = list(map(self.get_text_width, track_name_split, [2] * len(track_name_split)))
-        track_lines = self.format_x_word(track_name_size, track_name_split, 2)
-        track_size = list(map(self.get_text_width, track_lines, [2] * len(track_name_split)))
-
-        # Large Text Format Check
-        if sum(track_size) <= 378 and self.can_full_words_fit(track_size) and len(track_size) <= 2:
-            for line in track_lines:
-                self.image_draw.text((track_x, track_y), line, font=self.DSfnt64)
-                track_y += 43
-            return len(track_lines), 55
-
-        # Medium Text Format Check
-        track_name_split = track_name.split(" ") if len(track_name.split(" ")) > 1 else [track_name]
-        track_name_size = list(map(self.get_text_width, track_name_split, [1] * len(track_name_split)))
-        track_lines = self.format_x_word(track_name_size, track_name_split, 1)
-        track_size = list(map(self.get_text_width, track_lines, [1] * len(track_lines)))
-
-        if sum(track_size) <= 945:
-            if not self.can_full_words_fit(track_size):
-                track_lines = self.hyphenate_words(str(track_name_split)[2:-2], 1)
-            for line in track_lines:
-                self.image_draw.text((track_x, track_y), line, font=self.DSfnt32)
-                track_y += 26
-            return len(track_lines), 26
-
-        # Small Text Format Check
-        track_name_split = track_name.split(" ") if len(track_name.split(" ")) > 1 else [track_name]
-        track_name_size = list(map(self.get_text_width, track_name_split, [0] * len(track_name_split)))
-        track_lines = self.format_x_word(track_name_size, track_name_split, 0)
-        track_size = list(map(self.get_text_width, track_lines, [1] * len(track_name_split)))
-        track_y += 5
-
-        if not self.can_full_words_fit(track_name_size):
-            track_lines = self.hyphenate_words(str(track_name_split)[2:-2], 1)
-        for line in track_lines:
-            self.image_draw.text((track_x, track_y), line, font=self.DSfnt16)
-            track_y += 12
-        return len(track_lines), 13
+        key = (track_name, None, None, track_x, track_y)
+        layout = self.layout_cache.get_or_build(key, lambda: self.layout_track_text(track_name, track_x, track_y))
+        self.draw_text_layout(layout)
+        return layout.line_count, layout.text_height
+
+    def layout_track_text(self, track_name: str, track_x: int, track_y: int) -> TextLayout:
+        """
+        Lays out the track name in a large, medium, or small format depending on its length, without drawing it.
+        LineBreaker picks the largest tier the name fits in.
+
+        Parameters:
+        track_name (str): The name of the track to be laid out.
+        track_x (int): The x-coordinate where the track name should be drawn.
+        track_y (int): The y-coordinate where the track name should be drawn.
+
+        Returns:
+        TextLayout: The positioned lines, font tier, and text height.
+        """
+        size, track_lines = self.line_breaker.layout_track(track_name)
+        if size == 0:
+            track_y += SMALL_TRACK_DROP
+        return TextLayout(self.stack_lines(track_lines, track_x, track_y, LINE_HEIGHTS[size]), size, TEXT_HEIGHTS[size])
 
     def draw_artist_text(self, artist_name: str, track_line_count: int, track_height: int, artist_x:int, artist_y: int) -> None:
         """
         Draws the artist name at the specified position on the image.
 
         The artist name is split into lines and drawn in a large, medium, or small format depending on its length.
+        Layouts are memoized in self.layout_cache, keyed on the track layout they have to share the column with.
 
         Parameters:
         artist_name (str): The name of the artist to be drawn.
@@ -789,101 +784,75 @@ class Draw:
         artist_x (int): The x-coordinate where the artist name should be drawn.
         artist_y (int): The y-coordinate where the artist name should be drawn.
         """
-        # Large Text Format Check
-        l_artist_split = artist_name.split(" ")
-        l_artist_size = list(map(self.get_text_width, l_artist_split, [2] * len(l_artist_split)))
-        if sum(l_artist_size) <= 366 and self.can_full_words_fit(l_artist_size) and len(l_artist_size) <= 2:
-            if track_height == 55 and track_line_count + len(l_artist_size) <= 3 or track_height < 55 and track_line_count < 4:
-                artist_lines = self.format_x_word(l_artist_size, l_artist_split, 2)
-                artist_y -= (42 * len(artist_lines))  # y nudge to fit bottom constraint
-                for line in artist_lines:
-                    self.image_draw.text((artist_x, artist_y), line, font=self.DSfnt64)
-                    artist_y += 43
-                return
+        key = (artist_name, track_line_count, track_height, artist_x, artist_y)
+        layout = self.layout_cache.get_or_build(key, lambda: self.layout_artist_text(artist_name, track_line_count, track_height, artist_x, artist_y))
+        self.draw_text_layout(layout)
 
-        # Medium Text Format Check
-        m_artist_split = artist_name.split(" ") if len(artist_name.split(" ")) > 1 else [artist_name]
-        m_title_size = list(map(self.get_text_width, m_artist_split, [1] * len(m_artist_split)))
-        artist_lines = self.format_x_word(m_title_size, m_artist_split, 1)
-        artist_size = list(map(self.get_text_width, artist_lines, [1] * len(m_artist_split))) 
-        if sum(artist_size) <= 760 and track_line_count + len(artist_lines) <= 6:
-            artist_y -= (25 * len(artist_lines))  # y nudge to fit bottom constraint
-            if not self.can_full_words_fit(m_title_size):
-                artist_lines = self.hyphenate_words(str(m_artist_split)[2:-2], 1)
-            for line in artist_lines:
-                self.image_draw.text((artist_x, artist_y), line, font=self.DSfnt32)
-                artist_y += 26
-            return
+    def layout_artist_text(self, artist_name: str, track_line_count: int, track_height: int, artist_x:int, artist_y: int) -> TextLayout:
+        """
+        Lays out the artist name in a large, medium, or small format depending on its length, without drawing it.
+        LineBreaker picks the largest tier that fits alongside the track's lines; the block is then nudged up
+        so its last line sits on artist_y.
 
-        # Small Text Format Check
-        s_artist_split = artist_name.split(" ") if len(artist_name.split(" ")) > 1 else [artist_name]
-        s_artist_size = list(map(self.get_text_width, s_artist_split, [0] * len(s_artist_split)))
-        artist_lines = self.format_x_word(s_artist_size, s_artist_split, 0)
-        artist_size = list(map(self.get_text_width, artist_lines, [0] * len(s_artist_split)))
-        artist_y -= (12 * len(artist_lines))  # y nudge to fit bottom constraint
-        if not self.can_full_words_fit(s_artist_size):
-            artist_lines = self.hyphenate_words(str(s_artist_split)[2:-2], 1)
-        for line in artist_lines:
-            self.image_draw.text((artist_x, artist_y), line, font=self.DSfnt16)
-            artist_y += 12
+        Parameters:
+        artist_name (str): The name of the artist to be laid out.
+        track_line_count (int): The number of lines the track name was split into.
+        track_height (int): The height of the track name text.
+        artist_x (int): The x-coordinate where the artist name should be drawn.
+        artist_y (int): The y-coordinate where the artist name should be drawn.
 
-    # ---- DRAW MISC FUNCs ----------------------------------------------------------------------------
+        Returns:
+        TextLayout: The positioned lines, font tier, and text height.
+        """
+        track_size = TEXT_HEIGHTS.index(track_height) if track_height in TEXT_HEIGHTS else 0
+        size, artist_lines = self.line_breaker.layout_artist(artist_name, track_line_count, track_size)
+        artist_y -= ARTIST_Y_NUDGES[size] * len(artist_lines)  # y nudge to fit bottom constraint
+        return TextLayout(self.stack_lines(artist_lines, artist_x, artist_y, LINE_HEIGHTS[size]), size, TEXT_HEIGHTS[size])
 
     @staticmethod
-    def _make_four_gray_palette() -> Image.Image:
-        palette_img = Image.new('P', (1, 1))
-        palette_img.putpalette(
-            [255, 255, 255,   # white
-             192, 192, 192,   # light gray
-             128, 128, 128,   # dark gray
-               0,   0,   0]  # black
-            + [0] * (768 - 12)
-        )
-        return palette_img
-
-    def dither_album_art(self, main_image_name: str = "AlbumImage") -> bool:
+    def stack_lines(lines: List[str], x: int, y: int, line_height: int) -> List[Tuple[Tuple[int, int], str]]:
         """
-        Dithers the album art image using the Floyd-Steinberg algorithm.
-
-        The image is resized and the colors are remapped using a palette. The dithered image is then saved to a file.
-
-        Returns:
-        bool: True if the dithering was successful, False otherwise.
+        Position lines top to bottom starting at (x, y), line_height pixels apart.
         """
-        resize_paths = [os.path.join(self.dir_path, f'{main_image_name}_thumbnail.PNG')]
-        dither_paths = [os.path.join(self.dir_path, f'{main_image_name}_thumbnail_dither.PNG')]
+        return [((x, y + i * line_height), line) for i, line in enumerate(lines)]
 
-        if not self.weather_mode:
-            resize_paths.append(os.path.join(self.dir_path, f'{main_image_name}_resize.PNG'))
-            dither_paths.append(os.path.join(self.dir_path, f'{main_image_name}_dither.PNG'))
+    def draw_text_layout(self, layout: TextLayout) -> None:
+        """
+        Draws every line of a TextLayout in its DS font tier.
+        """
+        font = (self.DSfnt16, self.DSfnt32, self.DSfnt64)[layout.size]
+        for pos, line in layout.lines:
+            self.draw_text(pos, line, font=font)
 
-        for resize_path, dither_path in zip(resize_paths, dither_paths):
-            if not os.path.exists(resize_path):
-                logger.error("Error: File %s not found.", resize_path)
-                return False
+    # ---- DRAW MISC FUNCs ----------------------------------------------------------------------------
 
-            start_time = time()
-            dithered = Image.open(resize_path).convert('RGB').quantize(
-                palette=self._four_gray_palette,
-                dither=Image.Dither.FLOYDSTEINBERG,
-            )
-            dithered.save(dither_path)
-            end_time = time()
-            logger.info("* Dithering %s took %.2f seconds *", os.path.basename(dither_path), end_time - start_time)
+    def dither_album_art(self, main_image_name: str = "NA", tier: str = "full") -> bool:
+        """
+        Dithers the album art image to the four gray levels with the dither_algorithm from display settings,
+        or the cheaper algorithm of a lower quality tier.
 
-            self.album_image = Image.open(dither_path)
+        The dithered image is stored in the album art cache. Variants already in the cache are left alone.
+        Clock's AlbumArtWorker normally dithers new covers in the background; this covers whatever it didn't.
+        The time taken is added to dither_seconds.
 
-        return True
+        Returns:
+        bool: True if the dithering was successful, False otherwise.
+        """
+        variants = ["thumbnail_dither"] if self.weather_mode else ["thumbnail_dither", "dither"]
+        start = time()
+        done = all(dither_variant(main_image_name, variant, tier_algorithm(tier, self.ds.dither_algorithm), tier) for variant in variants)
+        self.dither_seconds[tier] = self.dither_seconds.get(tier, 0.0) + time() - start
+        return done
 
     def dark_mode_flip(self) -> None:
         """
-        Used in clock.py to invert the entire image for sunset dark mode
+        Fallback that inverts a canvas drawn in light mode into the frame, with a single point() LUT pass.
+        Clock draws dark mode natively through render_frame() instead.
         """
-        self.image_obj.paste(ImageMath.eval('255-(a)', a=self.image_obj), (0, 0))
-
+        self.frame = self.image_obj.point(INVERT_LUT)
 
     def get_image_obj(self) -> Image:
         """
         Used in clock.py to be passed into EPD's getBuffer()
         """
-        return self.image_obj
+        return self.frame
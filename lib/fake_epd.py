@@ -0,0 +1,160 @@
+"""
+Stand-in for Waveshare's epd4in2/epd4in2_V2 EPD classes, so the full tick_tock
+display path (init, buffer packing, refresh, sleep) can run on a dev box with no
+panel attached. Enabled with `python3 main.py --fake_epd`.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from PIL import Image
+
+from lib.clock_logging import logger
+from lib.epd_buffer import EPD_HEIGHT, EPD_WIDTH, pack_1bpp, pack_4gray
+from lib.refresh_timer import DEFAULT_REFRESH_SECONDS as REFRESH_SECONDS
+
+
+class _FakeEpdConfig:
+    """
+    Mirrors waveshare_epd.epdconfig's cleanup hook, which Clock calls after a failed init.
+    """
+    @staticmethod
+    def module_exit() -> None:
+        logger.info("[fake_epd] module_exit()")
+
+
+class FakeEPD:
+    """
+    Records every buffer pushed to it and sleeps for roughly as long as the real panel
+    would take to refresh (scaled by time_scale, 0 to not sleep at all).
+    Exposes the subset of the vendor API Clock uses, for both library versions.
+
+    Like the real controller, it remembers the RAM window and address counters
+    lib/partial_refresh.py sets, and refuses a full, fast or 4 Gray push while
+    they're still narrowed to a window (the real panel would show it garbled).
+    """
+    GRAY1, GRAY2, GRAY3, GRAY4 = 0xFF, 0xC0, 0x80, 0x00
+    Seconds_1_5S, Seconds_1S = 0, 1
+
+    def __init__(self, v2: bool = True, time_scale: float = 1.0, history: int = 16):
+        self.width, self.height = EPD_WIDTH, EPD_HEIGHT
+        self.v2 = v2
+        self.time_scale = time_scale
+        self.epdconfig = _FakeEpdConfig()
+        self.initialized: str = ""
+        self.asleep = True
+        self.pushes: Deque[Tuple[float, str, bytes]] = deque(maxlen=history)
+        self.refresh_counts: Dict[str, int] = {mode: 0 for mode in REFRESH_SECONDS}
+        self.simulated_seconds = 0.0
+        self._command = None
+        self._command_data: Dict[int, List[int]] = {}
+
+    # ---- init / sleep ----
+    def _init(self, mode: str) -> int:
+        self.initialized = mode
+        self.asleep = False
+        # the vendor inits set the window to the whole panel
+        self._command_data = self._full_window()
+        logger.info("[fake_epd] init (%s)", mode)
+        return 0
+
+    def init(self) -> int:
+        return self._init("full")
+
+    def init_fast(self, mode: int = Seconds_1_5S) -> int:
+        return self._init("fast")
+
+    def Init_4Gray(self) -> int:
+        return self._init("4gray")
+
+    def sleep(self) -> None:
+        self.asleep = True
+        self.initialized = ""
+        logger.info("[fake_epd] sleep")
+
+    # ---- RAM window ----
+    def _full_window(self) -> Dict[int, List[int]]:
+        last_row = self.height - 1
+        return {
+            0x44: [0, self.width // 8 - 1],
+            0x45: [0, 0, last_row & 0xFF, last_row >> 8],
+            0x4E: [0],
+            0x4F: [0, 0],
+        }
+
+    def ram_window(self) -> Dict[int, List[int]]:
+        """
+        The RAM window ranges and address counters as last set, by command.
+        """
+        return {command: self._command_data.get(command, data) for command, data in self._full_window().items()}
+
+    def _check_full_window(self, mode: str) -> None:
+        if self.ram_window() != self._full_window():
+            raise RuntimeError(f"[fake_epd] {mode} refresh with the RAM window still narrowed to {self.ram_window()}")
+
+    # ---- buffers ----
+    def getbuffer(self, image: Image.Image) -> bytearray:
+        return pack_1bpp(image, self.width, self.height)
+
+    def getbuffer_4Gray(self, image: Image.Image) -> bytearray:
+        return pack_4gray(image, self.width, self.height)
+
+    # ---- refreshes ----
+    def _refresh(self, mode: str, buf, expected_len: int) -> None:
+        if self.asleep:
+            raise RuntimeError(f"[fake_epd] {mode} refresh while asleep — init() first")
+        if len(buf) != expected_len:
+            raise ValueError(f"[fake_epd] {mode} buffer is {len(buf)} bytes, expected {expected_len}")
+        seconds = REFRESH_SECONDS[mode] * self.time_scale
+        if seconds:
+            time.sleep(seconds)
+        self.pushes.append((time.time(), mode, bytes(buf)))
+        self.refresh_counts[mode] += 1
+        self.simulated_seconds += REFRESH_SECONDS[mode]
+        logger.info("[fake_epd] %s refresh, %d bytes (%d refreshes, %.1fs simulated)", mode, len(buf), sum(self.refresh_counts.values()), self.simulated_seconds)
+
+    def display(self, image) -> None:
+        self._check_full_window("full")
+        self._refresh("full", image, self.width // 8 * self.height)
+
+    def display_4Gray(self, image) -> None:
+        self._check_full_window("4gray")
+        self._refresh("4gray", image, self.width // 4 * self.height)
+
+    def display_Fast(self, image) -> None:
+        self._check_full_window("fast")
+        self._refresh("fast", image, self.width // 8 * self.height)
+
+    def display_Partial(self, image) -> None:
+        # the vendor display_Partial() sets the whole panel as its window first
+        self._command_data.update(self._full_window())
+        self._refresh("partial", image, self.width // 8 * self.height)
+
+    # ---- raw controller access, as used by lib/partial_refresh.py ----
+    def send_command(self, command: int) -> None:
+        self._command = command
+        self._command_data[command] = []
+
+    def send_data(self, data: int) -> None:
+        self._command_data[self._command].append(data)
+
+    def send_data2(self, data) -> None:
+        self._command_data[self._command].extend(data)
+
+    def TurnOnDisplay_Partial(self) -> None:
+        x_start, x_end = self._command_data[0x44]
+        y_start_lo, y_start_hi, y_end_lo, y_end_hi = self._command_data[0x45]
+        rows = (y_end_lo | y_end_hi << 8) - (y_start_lo | y_start_hi << 8) + 1
+        self._refresh("window", self._command_data[0x24], (x_end - x_start + 1) * rows)
+
+    def Clear(self) -> None:
+        self.display(bytearray(b'\xff' * (self.width // 8 * self.height)))
+
+    def last_frames(self) -> List[Image.Image]:
+        """
+        Decode the recorded full-frame 1bpp pushes back into images, oldest first (handy from a debugger).
+        """
+        return [
+            Image.frombytes('1', (self.width, self.height), buf)
+            for _, mode, buf in self.pushes if mode not in ("4gray", "window")
+        ]
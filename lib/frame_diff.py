@@ -0,0 +1,49 @@
+from typing import Optional
+
+from PIL import Image, ImageChops
+
+
+class FrameGate:
+    """
+    Remembers the last frame pushed to the EPD so Clock can skip refreshes that
+    wouldn't change a single pixel (common overnight, where the 5 minute cadence
+    often redraws the same state). Frames are compared byte-for-byte, which is a
+    memcmp over ~120KB and cheaper than hashing both frames.
+    """
+    def __init__(self):
+        self.last_frame: Optional[bytes] = None
+        self.last_size: Optional[tuple] = None
+        self.last_mode: Optional[str] = None
+        self.pushed = 0
+        self.skipped = 0
+
+    def is_unchanged(self, image: Image.Image) -> bool:
+        """
+        Return True if image is pixel-identical to the last frame recorded by record_push().
+        """
+        if self.last_frame is None or image.size != self.last_size or image.mode != self.last_mode:
+            return False
+        return image.tobytes() == self.last_frame
+
+    def changed_bbox(self, image: Image.Image) -> Optional[tuple]:
+        """
+        Return the (left, top, right, bottom) box of pixels that differ from the last
+        pushed frame, the whole image if there's nothing to compare against, or None if
+        nothing changed.
+        """
+        if self.last_frame is None or image.size != self.last_size or image.mode != self.last_mode:
+            return (0, 0) + image.size
+        last_image = Image.frombytes(self.last_mode, self.last_size, self.last_frame)
+        return ImageChops.difference(last_image, image).getbbox()
+
+    def record_push(self, image: Image.Image) -> None:
+        """
+        Remember image as what's now on the panel.
+        """
+        self.last_frame = image.tobytes()
+        self.last_size = image.size
+        self.last_mode = image.mode
+        self.pushed += 1
+
+    def record_skip(self) -> None:
+        self.skipped += 1
@@ -0,0 +1,172 @@
+"""
+The last few frames pushed to the display, kept in a fixed size ring file
+(cache/frame_ring.bin) so there's something to look at when the panel showed
+something wrong. Each push costs a copy of its packed buffer into a memory mapped
+slot: no PNG encoding, no file growth, no flush.
+
+File layout (integers little-endian):
+
+    header   "EPDR", version u16, slot count u16, slot size u32, frames written u64
+    slots    slot count times: frame number u64 (0 while empty or being written),
+             unix time f64, state hash u64, refresh mode 8 bytes, render ms f32,
+             bits per pixel u8, 3 reserved bytes, buffer length u32, then the buffer
+             packed as pack_1bpp()/pack_4gray() do, padded to the slot size
+
+Frame n is in slot (n - 1) % slot count. Run `python -m lib.frame_ring` to list the
+frames in the ring, and `python -m lib.frame_ring -1 41` to save the newest frame and
+frame 41 as PNGs in test_output/frame_ring/.
+"""
+import argparse
+import mmap
+import os
+import struct
+from datetime import datetime as dt
+from typing import List, NamedTuple, Optional
+
+from lib.clock_logging import logger
+from lib.epd_buffer import EPD_WIDTH, EPD_HEIGHT, unpack_buffer
+
+RING_PATH = "cache/frame_ring.bin"
+MAGIC = b"EPDR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+SLOT_HEADER = struct.Struct("<QdQ8sfB3xI")
+# Room for the biggest buffer, a 4 Gray Scale frame
+MAX_BUFFER = EPD_WIDTH // 4 * EPD_HEIGHT
+SLOT_SIZE = SLOT_HEADER.size + MAX_BUFFER
+
+
+class RingFrame(NamedTuple):
+    """
+    One frame read back from the ring.
+    """
+    seq: int
+    timestamp: float
+    state_hash: int
+    mode: str
+    render_ms: float
+    bits: int
+    buffer: bytes
+
+    def describe(self) -> str:
+        return f"frame {self.seq}: {dt.fromtimestamp(self.timestamp):%Y-%m-%d %H:%M:%S} {self.mode} refresh, {self.bits}bpp, rendered in {self.render_ms:.0f}ms, state {self.state_hash:016x}"
+
+
+class FrameRing:
+    """
+    A ring file of the last slots pushed frames. The file is (re)created at the right
+    size when it's missing or was written with a different slot count or layout, and
+    otherwise picks up where the last run left off.
+    """
+    def __init__(self, slots: int, path: str = RING_PATH):
+        self.slots = slots
+        self.path = path
+        size = HEADER.size + slots * SLOT_SIZE
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            header = os.pread(fd, HEADER.size, 0)
+            if len(header) < HEADER.size or HEADER.unpack(header)[:4] != (MAGIC, VERSION, slots, SLOT_SIZE) or os.fstat(fd).st_size != size:
+                logger.info("Starting a new %d frame ring at %s", slots, path)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, HEADER.pack(MAGIC, VERSION, slots, SLOT_SIZE, 0), 0)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            # the mapping keeps the file open
+            os.close(fd)
+        self.written = HEADER.unpack_from(self.map)[4]
+
+    def record(self, buffer: bytes, bits: int, mode: str, state_hash: int, render_ms: float, timestamp: float) -> int:
+        """
+        Copy a packed frame into the oldest slot, overwriting whatever was there.
+
+        Args:
+            buffer (bytes): The frame as packed by pack_frame().
+            bits (int): Its bits per pixel.
+            mode (str): How it was pushed, e.g. "full", "window" or "local".
+            state_hash (int): ClockState.digest() of the state it was rendered from.
+            render_ms (float): How long rendering it took.
+            timestamp (float): When it was pushed, in unix time.
+
+        Returns:
+            int: The frame's number.
+        """
+        seq = self.written + 1
+        offset = HEADER.size + (seq - 1) % self.slots * SLOT_SIZE
+        # mark the slot empty while it's half written, so a crash part way through can't leave a torn frame
+        self.map[offset:offset + 8] = bytes(8)
+        start = offset + SLOT_HEADER.size
+        self.map[start:start + len(buffer)] = buffer
+        self.map[offset:start] = SLOT_HEADER.pack(seq, timestamp, state_hash, mode.encode()[:8], render_ms, bits, len(buffer))
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, self.slots, SLOT_SIZE, seq)
+        self.written = seq
+        return seq
+
+    def close(self) -> None:
+        self.map.close()
+
+
+def read_ring(path: str = RING_PATH) -> List[RingFrame]:
+    """
+    Every complete frame in the ring file at path, oldest first.
+
+    Raises:
+        OSError: If there's no ring file at path.
+        ValueError: If the file isn't a frame ring this version can read.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, slots, slot_size, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} frame ring")
+    frames = []
+    for slot in range(slots):
+        offset = HEADER.size + slot * slot_size
+        seq, timestamp, state_hash, mode, render_ms, bits, length = SLOT_HEADER.unpack_from(data, offset)
+        if seq:
+            start = offset + SLOT_HEADER.size
+            frames.append(RingFrame(seq, timestamp, state_hash, mode.rstrip(b"\0").decode(), render_ms, bits, data[start:start + length]))
+    return sorted(frames)
+
+
+def export_frame(frame: RingFrame, out_dir: str) -> str:
+    """
+    Save frame as a PNG in out_dir, named for its number, time and refresh mode.
+
+    Returns:
+        str: The PNG's path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"frame_{frame.seq}_{dt.fromtimestamp(frame.timestamp):%Y%m%d-%H%M%S}_{frame.mode}.png")
+    unpack_buffer(frame.buffer, frame.bits).save(path)
+    return path
+
+
+def pick(frames: List[RingFrame], wanted: int) -> Optional[RingFrame]:
+    """
+    The frame numbered wanted, or counting back from the newest if wanted is negative (-1 is the newest).
+    """
+    if wanted < 0:
+        return frames[wanted] if -wanted <= len(frames) else None
+    return next((frame for frame in frames if frame.seq == wanted), None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the frames kept in the frame ring, or save some of them as PNGs.")
+    parser.add_argument('frames', nargs='*', type=int, help="Frame numbers to save; negative counts back from the newest (-1)")
+    parser.add_argument('--all', action='store_true', help="Save every frame in the ring")
+    parser.add_argument('--ring', default=RING_PATH, help="The ring file to read")
+    parser.add_argument('--out', default="test_output/frame_ring", help="Where to save PNGs")
+    parsed_args = parser.parse_args()
+
+    ring_frames = read_ring(parsed_args.ring)
+    if not (parsed_args.frames or parsed_args.all):
+        for ring_frame in ring_frames:
+            print(ring_frame.describe())
+        print(f"{len(ring_frames)} frames in {parsed_args.ring}")
+    for ring_frame in ring_frames if parsed_args.all else [pick(ring_frames, wanted) for wanted in parsed_args.frames]:
+        if ring_frame is None:
+            print("No such frame in the ring")
+            continue
+        print(f"{ring_frame.describe()} -> {export_frame(ring_frame, parsed_args.out)}")
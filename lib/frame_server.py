@@ -0,0 +1,273 @@
+"""
+Serves each frame over HTTP as the panel's packed buffer (1 bit per pixel, or 2 in four
+gray), so a microcontroller driving its own panel can show what this clock renders.
+
+Frames are numbered from 1 as they change. A client asks for GET /frame?since=N, N being the
+last frame it applied (0 for none), and gets the newest frame as the bytes that differ from
+frame N, XORed and run-length encoded. Frame 0 is a blank (all 0xFF, white) buffer, so
+a client starting from scratch gets the whole frame the same way. A minute tick is then a
+few hundred bytes instead of the 15KB/30KB full buffer. If frame N is too old to
+still be in the history, the delta is against frame 0.
+
+Response body (all integers little-endian):
+
+    header   28 bytes: "EPDF", version (1), bits per pixel (1 or 2), 2 reserved bytes,
+             width u16, height u16, frame u32, base frame u32, due u32, payload length u32
+    payload  runs of: skip u16, count u16, then count bytes to XOR into the buffer at
+             the position after skipping skip unchanged bytes; bytes after the last run are unchanged
+
+due is the unix time the frame is for (the minute it shows), which can be a few seconds after
+it's published so a client can start its refresh early. Other responses:
+
+    GET /frame?since=N&wait=S   if N is already the newest, wait up to S seconds for a new
+                                one before answering 304 Not Modified
+    GET /status                 JSON: newest frame number, size, bits per pixel, due
+
+Run `python -m lib.frame_server http://host:port` for a reference client that follows
+a server and saves every frame it receives to test_output/served_frame.png.
+"""
+import argparse
+import json
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from lib.clock_logging import logger
+from lib.epd_buffer import EPD_WIDTH, EPD_HEIGHT, unpack_buffer
+
+MAGIC = b"EPDF"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxHHIIII")
+RUN = struct.Struct("<HH")
+# Unchanged stretches shorter than this are sent as part of the runs around them, since
+# starting a new run costs RUN.size bytes anyway
+MERGE_GAP = RUN.size
+MAX_RUN = 0xFFFF
+# Frames kept to delta against, newest last
+HISTORY_SIZE = 8
+# Longest a client may hold a /frame request open waiting for a new frame, in seconds
+MAX_WAIT_SECONDS = 120
+
+
+def encode_delta(buffer: bytes, base: bytes) -> bytes:
+    """
+    The runs that turn base into buffer (both the same length) when XORed in.
+    """
+    diff = np.bitwise_xor(np.frombuffer(buffer, dtype=np.uint8), np.frombuffer(base, dtype=np.uint8))
+    changed = np.flatnonzero(diff)
+    if changed.size == 0:
+        return b""
+    # split into runs wherever MERGE_GAP or more unchanged bytes separate two changed ones
+    breaks = np.flatnonzero(np.diff(changed) > MERGE_GAP)
+    starts = np.concatenate(([changed[0]], changed[breaks + 1]))
+    ends = np.concatenate((changed[breaks], [changed[-1]])) + 1
+
+    payload = bytearray()
+    position = 0
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        skip = start - position
+        while skip > MAX_RUN:
+            payload += RUN.pack(MAX_RUN, 0)
+            skip -= MAX_RUN
+        while start < end:
+            count = min(end - start, MAX_RUN)
+            payload += RUN.pack(skip, count) + diff[start:start + count].tobytes()
+            start += count
+            skip = 0
+        position = end
+    return bytes(payload)
+
+
+def apply_delta(buffer: bytearray, payload: bytes) -> bytearray:
+    """
+    XOR payload's runs into buffer in place, what a client does with every frame it receives.
+    """
+    position, offset = 0, 0
+    while offset < len(payload):
+        skip, count = RUN.unpack_from(payload, offset)
+        offset += RUN.size
+        position += skip
+        for i in range(count):
+            buffer[position + i] ^= payload[offset + i]
+        offset += count
+        position += count
+    return buffer
+
+
+def blank_buffer(width: int, height: int, bits: int) -> bytearray:
+    """
+    Frame 0: an all white buffer.
+    """
+    return bytearray(b"\xff" * (width * bits // 8 * height))
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    "[host:]port" to (host, port), loopback unless a host is given; use 0.0.0.0 to serve the LAN.
+    """
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class FrameServer:
+    """
+    Keeps the last HISTORY_SIZE distinct frames, packed, and serves them to clients as deltas
+    (see the module docstring) from a background HTTP server thread. Clock calls publish()
+    with every frame it renders.
+    """
+    def __init__(self, host: str, port: int):
+        self.condition = threading.Condition()
+        self.frames: "OrderedDict[int, bytes]" = OrderedDict()
+        self.seq = 0
+        self.size: Tuple[int, int] = (EPD_WIDTH, EPD_HEIGHT)
+        self.bits = 1
+        self.due = 0
+        # (base frame, frame) -> payload, for the newest frame
+        self.deltas: Dict[Tuple[int, int], bytes] = {}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="frame-server", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+        host, port = self.httpd.server_address[:2]
+        logger.info("Serving frames on http://%s:%d/frame", host, port)
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def publish(self, buffer: bytes, bits: int, due: float) -> bool:
+        """
+        Make a frame packed by pack_frame() the newest frame, for the minute starting at unix time due.
+
+        Returns:
+            bool: False if it's identical to the newest frame, which stays as it was.
+        """
+        buffer = bytes(buffer)
+        with self.condition:
+            if self.frames and bits == self.bits and buffer == self.frames[self.seq]:
+                return False
+            if self.bits != bits:
+                self.frames.clear()
+            self.seq += 1
+            self.frames[self.seq] = buffer
+            while len(self.frames) > HISTORY_SIZE:
+                self.frames.popitem(last=False)
+            self.bits, self.due = bits, int(due)
+            self.deltas = {}
+            self.condition.notify_all()
+        logger.info("Published frame %d (%d bytes packed, %d as a delta from frame %d)", self.seq, len(buffer), len(self.encode(self.seq - 1)), self.seq - 1)
+        return True
+
+    def encode(self, since: int) -> bytes:
+        """
+        The response body bringing a client from frame since to the newest frame.
+        """
+        with self.condition:
+            seq, bits, due = self.seq, self.bits, self.due
+            width, height = self.size
+            if since not in self.frames:
+                since = 0
+            payload = self.deltas.get((since, seq))
+            if payload is None:
+                base = self.frames[since] if since else bytes(blank_buffer(width, height, bits))
+                payload = self.deltas[(since, seq)] = encode_delta(self.frames[seq], base)
+        return HEADER.pack(MAGIC, VERSION, bits, width, height, seq, since, due, len(payload)) + payload
+
+    def wait_for_frame(self, since: int, timeout: float) -> bool:
+        """
+        Block until there's a frame newer than since or timeout seconds pass.
+
+        Returns:
+            bool: True if there is one.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.seq and self.seq != since, timeout)
+
+    def status(self) -> dict:
+        with self.condition:
+            return {"frame": self.seq, "size": self.size, "bits": self.bits, "due": self.due, "history": list(self.frames)}
+
+    def _handler(self):
+        server = self
+
+        class FrameHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                try:
+                    since = int(query.get("since", ["0"])[0])
+                    wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT_SECONDS)
+                except ValueError:
+                    self.send_error(HTTPStatus.BAD_REQUEST, "since and wait must be numbers")
+                    return
+                if url.path == "/status":
+                    self.reply(HTTPStatus.OK, "application/json", json.dumps(server.status()).encode())
+                elif url.path != "/frame":
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                elif not server.wait_for_frame(since, wait):
+                    self.reply(HTTPStatus.NOT_MODIFIED if server.seq else HTTPStatus.SERVICE_UNAVAILABLE, None, b"")
+                else:
+                    self.reply(HTTPStatus.OK, "application/octet-stream", server.encode(since))
+
+            def reply(self, status: HTTPStatus, content_type: Optional[str], body: bytes) -> None:
+                self.send_response(status)
+                if content_type:
+                    self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.requests += 1
+                server.bytes_sent += len(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug("frame server: %s - %s", self.address_string(), format % args)
+
+        return FrameHandler
+
+
+def follow(url: str, out_path: str, wait: float) -> None:
+    """
+    Reference client: keep fetching deltas from the server at url, apply them to a local
+    buffer like a microcontroller would, and save each new frame to out_path.
+    """
+    buffer, seq, shape = None, 0, None
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/frame?since={seq}&wait={wait}", timeout=wait + 10) as response:
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code not in (HTTPStatus.NOT_MODIFIED, HTTPStatus.SERVICE_UNAVAILABLE):
+                raise
+            time.sleep(1 if e.code == HTTPStatus.SERVICE_UNAVAILABLE else 0)
+            continue
+        magic, version, bits, width, height, frame, base, due, length = HEADER.unpack_from(body)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} frame: {body[:8]!r}")
+        if base == 0 or buffer is None or shape != (width, height, bits):
+            buffer, shape = blank_buffer(width, height, bits), (width, height, bits)
+        apply_delta(buffer, body[HEADER.size:HEADER.size + length])
+        seq = frame
+        unpack_buffer(buffer, bits, width, height).save(out_path)
+        print(f"frame {frame}: {len(body)} bytes (delta from {base}), due {time.strftime('%H:%M:%S', time.localtime(due))}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Follow a clock's frame server and save each frame it serves.")
+    parser.add_argument('url', help="The server, e.g. http://raspberrypi.local:8080")
+    parser.add_argument('--out', default="test_output/served_frame.png", help="Where to save the latest frame")
+    parser.add_argument('--wait', type=float, default=60, help="Seconds to hold each request open waiting for a new frame")
+    parsed_args = parser.parse_args()
+    follow(parsed_args.url.rstrip("/"), parsed_args.out, parsed_args.wait)
@@ -0,0 +1,130 @@
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from lib.clock_logging import logger
+from lib.image_store import image_store, load_image
+from lib.text_metrics import font_fingerprint
+
+# Printable ASCII covers every glyph the bottom bar draws: clock digits, ':',
+# 'am'/'pm', temperatures (including '-' and 'NA'), units and the date.
+DEFAULT_CHARSET = "".join(chr(cp) for cp in range(0x20, 0x7F))
+
+
+class Glyph:
+    """
+    A pre-rasterized glyph: its coverage mask, the offset of the mask from the pen
+    position, and the pen advance.
+    """
+    __slots__ = ("mask", "offset", "advance")
+
+    def __init__(self, mask: Optional[Image.Image], offset: Tuple[int, int], advance: int):
+        self.mask = mask
+        self.offset = offset
+        self.advance = advance
+
+
+class GlyphAtlas:
+    """
+    Glyph masks for one (font, size, image mode), rasterized by FreeType once and then
+    drawn by pasting the fill color through each glyph's mask.
+
+    Masks are rendered with the same fontmode ImageDraw uses for the target image mode
+    (aliased for '1', antialiased for 'L'), so pasted text is pixel-identical to
+    ImageDraw.text() at whole-pixel positions. Because the fill is applied at paste
+    time, one atlas serves every fill color. The atlas is stored as a single glyph
+    sheet plus a JSON index under cache/glyph_atlas/, keyed by a fingerprint of the
+    font file, so later starts skip rasterizing entirely.
+    """
+    def __init__(self, font: ImageFont.FreeTypeFont, image_mode: str, charset: str = DEFAULT_CHARSET, cache_dir: str = "cache/glyph_atlas"):
+        self.font = font
+        self.image_mode = image_mode
+        self.charset = charset
+        self.fontmode = "1" if image_mode == "1" else "L"
+        stem = os.path.splitext(os.path.basename(font.path))[0]
+        self.cache_base = os.path.join(cache_dir, f"{stem}_{font.size}_{self.fontmode}_{font_fingerprint(font.path)}")
+        self.glyphs: Dict[str, Glyph] = self._load() or self._build()
+        image_store.track("glyphs", self.cache_base, [glyph.mask for glyph in self.glyphs.values()])
+
+    def _rasterize(self, c: str) -> Glyph:
+        left, top, right, bottom = self.font.getbbox(c)
+        advance = round(self.font.getlength(c))
+        if right <= left or bottom <= top:
+            return Glyph(None, (left, top), advance)
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.fontmode = self.fontmode
+        mask_draw.text((-left, -top), c, font=self.font, fill=255)
+        return Glyph(mask, (left, top), advance)
+
+    def _build(self) -> Dict[str, Glyph]:
+        """
+        Rasterize every glyph in the charset, then write the sheet and index to disk.
+        """
+        glyphs = {c: self._rasterize(c) for c in self.charset}
+
+        sheet_width = sum(g.mask.width for g in glyphs.values() if g.mask)
+        sheet_height = max((g.mask.height for g in glyphs.values() if g.mask), default=0)
+        sheet = Image.new("L", (max(sheet_width, 1), max(sheet_height, 1)), 0)
+        index, x = {}, 0
+        for c, g in glyphs.items():
+            if g.mask:
+                sheet.paste(g.mask, (x, 0))
+                index[c] = [x, g.mask.width, g.mask.height, g.offset[0], g.offset[1], g.advance]
+                x += g.mask.width
+            else:
+                index[c] = [0, 0, 0, g.offset[0], g.offset[1], g.advance]
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_base), exist_ok=True)
+            sheet.save(self.cache_base + ".png")
+            with open(self.cache_base + ".json", "w", encoding="utf-8") as f:
+                json.dump(index, f)
+        except OSError as e:
+            logger.error("Failed to write glyph atlas %s: %s", self.cache_base, e)
+        return glyphs
+
+    def _load(self) -> Optional[Dict[str, Glyph]]:
+        """
+        Read a previously built sheet and index back from disk, if present and covering the charset.
+        """
+        try:
+            with open(self.cache_base + ".json", "r", encoding="utf-8") as f:
+                index = json.load(f)
+            sheet = load_image(self.cache_base + ".png", "L")
+        except (OSError, json.JSONDecodeError):
+            return None
+        if any(c not in index for c in self.charset):
+            return None
+
+        glyphs = {}
+        for c, (x, width, height, off_x, off_y, advance) in index.items():
+            mask = sheet.crop((x, 0, x + width, height)) if width and height else None
+            glyphs[c] = Glyph(mask, (off_x, off_y), advance)
+        return glyphs
+
+    def draw(self, image: Image.Image, image_draw: ImageDraw.ImageDraw, xy: Tuple[float, float], text: str, fill: int = 0) -> None:
+        """
+        Draw text with its top-left pen position at xy, snapped to the nearest whole pixel.
+        Characters missing from the atlas fall back to FreeType via image_draw.
+
+        Args:
+            image (Image.Image): The image to draw on.
+            image_draw (ImageDraw.ImageDraw): A draw object for the same image, used for fallback glyphs.
+            xy (Tuple[float, float]): The pen position.
+            text (str): The text to draw.
+            fill (int): The fill color.
+        """
+        x, y = round(xy[0]), round(xy[1])
+        for c in text:
+            glyph = self.glyphs.get(c)
+            if glyph is None:
+                image_draw.text((x, y), c, font=self.font, fill=fill)
+                x += round(self.font.getlength(c))
+                continue
+            if glyph.mask is not None:
+                gx, gy = x + glyph.offset[0], y + glyph.offset[1]
+                image.paste(fill, (gx, gy, gx + glyph.mask.width, gy + glyph.mask.height), glyph.mask)
+            x += glyph.advance
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from lib.clock_logging import logger
+from lib.epd_buffer import FOUR_GRAY_LEVELS, four_gray_palette
+from lib.image_store import image_store, load_image
+
+# name -> (file, size to draw it at, None for its native size)
+ICON_SPECS: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {
+    **{name: (f"Icons/music_context/{name}.png", None) for name in ('playlist', 'artist', 'album', 'dj', 'collection', 'failure')},
+    **{f"weather/{icon_id}": (f"Icons/weather/{icon_id}.png", (44, 44)) for icon_id in ('01', '02', '03', '04', '09', '10', '11', '13', '50')},
+}
+
+# The panel's four gray levels swapped end for end, so an inverted icon keeps its
+# light/dark gray distinction
+FOUR_GRAY_INVERT_LUT = [FOUR_GRAY_LEVELS[3 - FOUR_GRAY_LEVELS.index(i)] if i in FOUR_GRAY_LEVELS else 255 - i for i in range(256)]
+INVERT_LUT = [255 - i for i in range(256)]
+
+
+def icons_fingerprint(specs: Dict[str, Tuple[str, Optional[Tuple[int, int]]]]) -> str:
+    """
+    Short content hash over every icon file and the size it's drawn at.
+    """
+    digest = hashlib.sha1()
+    for name, (path, size) in sorted(specs.items()):
+        digest.update(f"{name}:{size}".encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class IconAtlas:
+    """
+    Every context and weather icon, preprocessed once for the active display: resized to
+    the size it's drawn at, converted to the image mode, dithered to the panel's four gray
+    levels in four-gray mode, plus an inverted copy of each for dark mode. Pasting one is
+    then a straight blit.
+
+    The icons are stored as a two-row sheet (normal over inverted) plus a JSON index
+    under cache/icon_atlas/, keyed by a fingerprint of the icon files, so later starts
+    only decode one PNG.
+    """
+    def __init__(self, image_mode: str, four_gray_scale: bool, specs: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = ICON_SPECS, cache_dir: str = "cache/icon_atlas"):
+        self.image_mode = image_mode
+        self.four_gray_scale = four_gray_scale
+        self.specs = specs
+        variant = "4gray" if four_gray_scale else image_mode
+        self.cache_base = os.path.join(cache_dir, f"icons_{variant}_{icons_fingerprint(specs)}")
+        self.icons: Dict[str, Tuple[Image.Image, Image.Image]] = self._load() or self._build()
+        image_store.track("icons", self.cache_base, [image for pair in self.icons.values() for image in pair])
+
+    def _prepare(self, path: str, size: Optional[Tuple[int, int]]) -> Tuple[Image.Image, Image.Image]:
+        """
+        Load one icon and return its (normal, inverted) variants in the image mode.
+        """
+        try:
+            icon = load_image(path)
+        except (FileNotFoundError, OSError) as e:
+            logger.error("Failed to load icon %s: %s", path, e)
+            raise
+        if size:
+            icon = icon.resize(size)
+
+        if self.four_gray_scale:
+            icon = icon.convert('RGB').quantize(palette=four_gray_palette(), dither=Image.Dither.FLOYDSTEINBERG).convert('L')
+            return icon, icon.point(FOUR_GRAY_INVERT_LUT)
+        icon = icon.convert(self.image_mode)
+        return icon, icon.point(INVERT_LUT)
+
+    def _build(self) -> Dict[str, Tuple[Image.Image, Image.Image]]:
+        """
+        Preprocess every icon, then write the sheet and index to disk.
+        """
+        icons = {name: self._prepare(path, size) for name, (path, size) in self.specs.items()}
+
+        sheet_width = sum(normal.width for normal, _ in icons.values())
+        row_height = max(normal.height for normal, _ in icons.values())
+        sheet = Image.new(self.image_mode, (sheet_width, row_height * 2), 255)
+        index, x = {}, 0
+        for name, (normal, inverted) in icons.items():
+            sheet.paste(normal, (x, 0))
+            sheet.paste(inverted, (x, row_height))
+            index[name] = [x, normal.width, normal.height]
+            x += normal.width
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_base), exist_ok=True)
+            sheet.save(self.cache_base + ".png")
+            with open(self.cache_base + ".json", "w", encoding="utf-8") as f:
+                json.dump({"row_height": row_height, "icons": index}, f)
+        except OSError as e:
+            logger.error("Failed to write icon atlas %s: %s", self.cache_base, e)
+        return icons
+
+    def _load(self) -> Optional[Dict[str, Tuple[Image.Image, Image.Image]]]:
+        """
+        Read a previously built sheet and index back from disk, if present and covering every icon.
+        """
+        try:
+            with open(self.cache_base + ".json", "r", encoding="utf-8") as f:
+                index = json.load(f)
+            sheet = load_image(self.cache_base + ".png", self.image_mode)
+            row_height: int = index["row_height"]
+            boxes: Dict[str, List[int]] = index["icons"]
+        except (OSError, KeyError, json.JSONDecodeError):
+            return None
+        if any(name not in boxes for name in self.specs):
+            return None
+
+        return {
+            name: (sheet.crop((x, 0, x + width, height)), sheet.crop((x, row_height, x + width, row_height + height)))
+            for name, (x, width, height) in boxes.items()
+        }
+
+    def get(self, name: str, inverted: bool = False) -> Image.Image:
+        """
+        Return the icon called name (e.g. 'playlist' or 'weather/01'), inverted for dark mode if asked.
+        Raises KeyError for unknown names.
+        """
+        normal, inverted_icon = self.icons[name]
+        return inverted_icon if inverted else normal
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.icons
@@ -0,0 +1,97 @@
+"""
+Bookkeeping for the decoded images the clock keeps around between frames, and the file
+descriptors it has open, so a slow leak of either shows up in the log instead of as an
+eventual crash.
+"""
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Optional
+
+from PIL import Image
+
+# Bytes per pixel of Pillow's in-memory storage by mode ('1' is stored a byte per pixel,
+# 'RGB' padded to four); anything else is counted as four
+PIXEL_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "LA": 4, "RGB": 4, "RGBA": 4, "I": 4, "F": 4}
+
+
+def image_bytes(image: Image.Image) -> int:
+    """
+    Roughly how much memory image's pixels take.
+    """
+    return image.width * image.height * PIXEL_BYTES.get(image.mode, 4)
+
+
+def load_image(path: str, mode: Optional[str] = None) -> Image.Image:
+    """
+    Decode the image file at path fully into memory, converted to mode if given, and close the file,
+    so nothing lazily loaded keeps it open.
+
+    Raises:
+        OSError: If the file is missing or can't be decoded.
+    """
+    with Image.open(path) as image_file:
+        image_file.load()
+        return image_file.convert(mode) if mode else image_file.copy()
+
+
+def open_fd_count() -> Optional[int]:
+    """
+    How many file descriptors this process has open, or None where /proc isn't available.
+    """
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+class ImageStore:
+    """
+    Byte sizes of every long-lived image, grouped by owner ("icons", "glyphs", "album_art",
+    "chrome", "canvas") and keyed however the owner likes. Owners track() images when they
+    keep them and release() them when they let them go. Releasing only stops the counting:
+    an owner's images may have been handed out, so they're freed whenever their last holder
+    lets go of them.
+
+    Safe to use from the album art worker's threads as well as the main one.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # owner -> key -> bytes
+        self.sizes: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+
+    def track(self, owner: str, key: Hashable, images: Iterable[Image.Image]) -> None:
+        """
+        Record the images owner keeps under key, replacing whatever it had recorded there.
+        """
+        size = sum(image_bytes(image) for image in images if image is not None)
+        with self.lock:
+            self.sizes[owner][key] = size
+
+    def release(self, owner: str, key: Hashable) -> None:
+        """
+        Forget the images owner kept under key.
+        """
+        with self.lock:
+            self.sizes[owner].pop(key, None)
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Bytes tracked per owner.
+        """
+        with self.lock:
+            return {owner: sum(sizes.values()) for owner, sizes in self.sizes.items() if sizes}
+
+    def report(self) -> dict:
+        """
+        Open file descriptors and image memory in KiB, per owner and in total, for the log.
+        """
+        totals = self.totals()
+        return {
+            "open_fds": open_fd_count(),
+            "image_kib": {owner: round(size / 1024) for owner, size in totals.items()},
+            "total_image_kib": round(sum(totals.values()) / 1024),
+        }
+
+
+image_store = ImageStore()
@@ -0,0 +1,282 @@
+"""
+Microbenchmark and fuzz run of the Spotify column text layout: Draw.layout_track_text() and
+Draw.layout_artist_text() (LineBreaker's measuring, hyphenating and line packing underneath),
+over a generated corpus of track and artist names shaped like the awkward ones Spotify
+really returns: 200 character classical titles, CJK, emoji, single giant words, accents and
+combining marks, odd whitespace.
+
+Layout caching is bypassed, so every name is laid out from scratch. For each run it reports
+layouts (a track plus its artist) per second, latency percentiles with the slowest input,
+and two kinds of overflow:
+
+    wide     a line wider than the 189px column, as FreeType renders it in the DS font
+             (and whether TextMetrics, which the breaker trusts, agreed it was too wide)
+    overlap  the track's last line running into the artist's first
+
+    python -m lib.layout_bench [--count N] [--seed S] [--corpus FILE] [--save-corpus FILE]
+                               [--save-baseline] [--tolerance 0.25] [--show N]
+
+Results are compared against cache/layout_bench_baseline.json (saved on this machine with
+--save-baseline): a throughput or worst case latency worse by more than the tolerance, or
+any overflow the baseline didn't have, is a regression and the exit status is 1.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Dict, List, NamedTuple, Tuple
+
+from lib.clock_logging import logger
+from lib.draw import Draw, TEXT_HEIGHTS
+from lib.line_breaker import COLUMN_WIDTH
+
+BASELINE_PATH = "cache/layout_bench_baseline.json"
+# Where draw_track_info() puts a left column's track and (non album context) artist
+TRACK_POS = (5, 26)
+ARTIST_Y = 190
+
+WORDS = (
+    "love", "night", "you", "me", "dream", "fire", "heart", "the", "of", "in", "a", "summer",
+    "light", "away", "again", "never", "forever", "blue", "gold", "rain", "city", "home", "wild",
+    "dance", "ocean", "ghost", "electric", "paradise", "tonight", "remember", "midnight", "run",
+)
+CLASSICAL = (
+    "Symphony No. {n} in {key}, Op. {op}", "Piano Concerto No. {n} in {key}, K. {op}",
+    "String Quartet No. {n} in {key}, BWV {op}", "Mass in {key}, Hob. XXII:{n}",
+)
+MOVEMENTS = (
+    "I. Allegro con brio", "II. Andante cantabile con moto", "III. Menuetto: Allegro molto e vivace",
+    "IV. Finale: Presto — Allegro assai", "Scherzo. Molto vivace – Presto", "Adagio ma non troppo e molto cantabile",
+)
+KEYS = ("C major", "D minor", "E-flat major", "F-sharp minor", "B-flat major", "G minor")
+PERFORMERS = (
+    "Wiener Philharmoniker", "Berliner Philharmoniker", "Herbert von Karajan", "Martha Argerich",
+    "Academy of St Martin in the Fields", "Orchestre Révolutionnaire et Romantique", "Sir John Eliot Gardiner",
+)
+DECORATIONS = (
+    "(feat. {w})", "[{w} Remix]", "- Remastered 2011", "(Live at Wembley Stadium, 1986)", "/ {w}",
+    "(Radio Edit)", "- 2019 Mix", "(Taylor's Version)", '"{w}"', "…", "!!!",
+)
+ACCENTED = "àáâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿĀăĆčĐěĞĥĮıĲĶŁńŐœŘśŞšŢťŪůŰŷŹžǅǈǋǲ"
+COMBINING = "̧̰́̈͒"
+# (first, last) code points to pick "words" from for each script
+SCRIPTS = {
+    "cjk": (0x4E00, 0x9FFF),
+    "hiragana": (0x3041, 0x3096),
+    "hangul": (0xAC00, 0xD7A3),
+    "cyrillic": (0x0410, 0x044F),
+    "greek": (0x0391, 0x03C9),
+    "arabic": (0x0627, 0x064A),
+    "hebrew": (0x05D0, 0x05EA),
+    "fullwidth": (0xFF21, 0xFF5A),
+}
+EMOJI = ("🎸", "🎧", "✨", "🔥", "💔", "🌙", "🎹", "👩‍🎤", "🏳️‍🌈", "❤️", "🇯🇵", "👍🏽")
+SPACES = (" ", "  ", "  ", "　", "\t")
+# Kind of name -> how often the corpus has one, out of the total
+KINDS = {
+    "plain": 30, "decorated": 15, "classical": 10, "script": 12, "emoji": 8,
+    "giant_word": 8, "accented": 7, "whitespace": 5, "mixed": 5,
+}
+
+
+class LayoutResult(NamedTuple):
+    track: str
+    artist: str
+    nanoseconds: int
+    # (which name, line, rendered width, TextMetrics width) of every line over COLUMN_WIDTH
+    wide: List[Tuple[str, str, float, int]]
+    overlap: bool
+
+
+def script_word(rng: random.Random, script: str, length: int) -> str:
+    first, last = SCRIPTS[script]
+    return "".join(chr(rng.randint(first, last)) for _ in range(length))
+
+
+def generate_name(rng: random.Random, kind: str) -> str:
+    """
+    One track or artist name of the given kind (one of KINDS).
+    """
+    if kind == "plain":
+        return " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 6)))
+    if kind == "decorated":
+        name = " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4)))
+        for _ in range(rng.randint(1, 3)):
+            name += " " + rng.choice(DECORATIONS).format(w=rng.choice(WORDS).title())
+        return name
+    if kind == "classical":
+        name = rng.choice(CLASSICAL).format(n=rng.randint(1, 41), key=rng.choice(KEYS), op=rng.randint(1, 626))
+        for _ in range(rng.randint(1, 3)):
+            name += ": " + rng.choice(MOVEMENTS)
+        return name + " · " + ", ".join(rng.sample(PERFORMERS, rng.randint(1, 3)))
+    if kind == "script":
+        script = rng.choice(list(SCRIPTS))
+        return " ".join(script_word(rng, script, rng.randint(1, 12)) for _ in range(rng.randint(1, 6)))
+    if kind == "emoji":
+        words = [rng.choice(WORDS).title() for _ in range(rng.randint(0, 4))] + ["".join(rng.choices(EMOJI, k=rng.randint(1, 6)))]
+        rng.shuffle(words)
+        return " ".join(words)
+    if kind == "giant_word":
+        if rng.random() < 0.3:
+            return rng.choice("AaWwMm@_") * rng.randint(20, 150)
+        return "".join(rng.choice(WORDS) for _ in range(rng.randint(4, 25)))
+    if kind == "accented":
+        return " ".join("".join(rng.choices(ACCENTED, k=rng.randint(2, 10))) + (rng.choice(COMBINING) if rng.random() < 0.3 else "") for _ in range(rng.randint(1, 6)))
+    if kind == "whitespace":
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 6))]
+        return rng.choice(SPACES) + "".join(word + rng.choice(SPACES) for word in words)
+    parts = [generate_name(rng, rng.choice(["plain", "script", "emoji", "accented"])) for _ in range(rng.randint(2, 3))]
+    return " ".join(parts)
+
+
+def generate_corpus(count: int, seed: int) -> List[Tuple[str, str]]:
+    """
+    count (track, artist) pairs, the same ones for the same seed. Artists lean towards shorter names.
+    """
+    rng = random.Random(seed)
+    kinds, weights = list(KINDS), list(KINDS.values())
+    artist_weights = [weight * (3 if kind in ("plain", "accented", "script") else 1) for kind, weight in KINDS.items()]
+    return [
+        (generate_name(rng, rng.choices(kinds, weights)[0]), generate_name(rng, rng.choices(kinds, artist_weights)[0]))
+        for _ in range(count)
+    ]
+
+
+def layout_one(draw: Draw, track: str, artist: str) -> LayoutResult:
+    """
+    Lay out one track and its artist the way draw_track_info() does, timing just the layout,
+    then check the result against the column.
+    """
+    start = perf_counter_ns()
+    track_layout = draw.layout_track_text(track, *TRACK_POS)
+    artist_layout = draw.layout_artist_text(artist, track_layout.line_count, track_layout.text_height, TRACK_POS[0], ARTIST_Y)
+    elapsed = perf_counter_ns() - start
+
+    wide = []
+    for which, layout in (("track", track_layout), ("artist", artist_layout)):
+        font = (draw.DSfnt16, draw.DSfnt32, draw.DSfnt64)[layout.size]
+        for _, line in layout.lines:
+            rendered = font.getlength(line)
+            if rendered > COLUMN_WIDTH:
+                wide.append((which, line, rendered, draw.get_text_width(line, layout.size)))
+    overlap = bool(track_layout.lines and artist_layout.lines) and track_layout.lines[-1][0][1] + TEXT_HEIGHTS[track_layout.size] > artist_layout.lines[0][0][1]
+    return LayoutResult(track, artist, elapsed, wide, overlap)
+
+
+def run(draw: Draw, corpus: List[Tuple[str, str]]) -> Tuple[Dict[str, float], List[LayoutResult], List[Tuple[str, str, str]]]:
+    """
+    Lay out the whole corpus once to warm up (font fallbacks get memoized), then again timed.
+
+    Returns:
+        The summary stats, every result, and (track, artist, error) for any pair that raised.
+    """
+    errors = []
+    for track, artist in corpus:
+        try:
+            layout_one(draw, track, artist)
+        except Exception as e:
+            errors.append((track, artist, repr(e)))
+    failed = {(track, artist) for track, artist, _ in errors}
+
+    results = []
+    gc.disable()
+    try:
+        for track, artist in corpus:
+            if (track, artist) not in failed:
+                results.append(layout_one(draw, track, artist))
+    finally:
+        gc.enable()
+
+    times = sorted(result.nanoseconds for result in results)
+    total_seconds = sum(times) / 1e9
+    stats = {
+        "layouts_per_second": len(times) / total_seconds if total_seconds else 0.0,
+        "p50_us": statistics.median(times) / 1000 if times else 0.0,
+        "p99_us": times[int(len(times) * 0.99)] / 1000 if times else 0.0,
+        "max_us": times[-1] / 1000 if times else 0.0,
+        "wide": sum(1 for result in results if result.wide),
+        "overlap": sum(1 for result in results if result.overlap),
+        "errors": len(errors),
+    }
+    return stats, results, errors
+
+
+def compare(stats: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """
+    Regressions of stats against baseline: throughput down or worst case latency up by more than
+    tolerance (a fraction), or more overflows or errors than before.
+    """
+    regressions = []
+    if stats["layouts_per_second"] < baseline["layouts_per_second"] * (1 - tolerance):
+        regressions.append(f"layouts/s {baseline['layouts_per_second']:.0f} -> {stats['layouts_per_second']:.0f}")
+    for metric in ("p99_us", "max_us"):
+        if stats[metric] > baseline[metric] * (1 + tolerance):
+            regressions.append(f"{metric} {baseline[metric]:.1f} -> {stats[metric]:.1f}")
+    for metric in ("wide", "overlap", "errors"):
+        if stats[metric] > baseline[metric]:
+            regressions.append(f"{metric} {baseline[metric]} -> {stats[metric]}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark and fuzz the Spotify column text layout.")
+    parser.add_argument('--count', type=int, default=5000, help="Generated (track, artist) pairs")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the generated corpus")
+    parser.add_argument('--corpus', help="Lay out the [track, artist] pairs in this JSON file instead of generating them")
+    parser.add_argument('--save-corpus', help="Write the corpus to this JSON file, e.g. to keep the inputs of an overflow")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline to compare against and --save-baseline to")
+    parser.add_argument('--save-baseline', action='store_true', help="Save these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="How much worse than the baseline counts as a regression, as a fraction")
+    parser.add_argument('--show', type=int, default=5, help="How many overflows and slowest inputs to print")
+    parsed_args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    if parsed_args.corpus:
+        with open(parsed_args.corpus, encoding="utf-8") as f:
+            layout_corpus = [tuple(pair) for pair in json.load(f)]
+    else:
+        layout_corpus = generate_corpus(parsed_args.count, parsed_args.seed)
+    if parsed_args.save_corpus:
+        with open(parsed_args.save_corpus, "w", encoding="utf-8") as f:
+            json.dump(layout_corpus, f, ensure_ascii=False, indent=1)
+
+    bench_stats, layout_results, layout_errors = run(Draw(local_run=True), layout_corpus)
+
+    print(f"{len(layout_corpus)} layouts: {bench_stats['layouts_per_second']:.0f}/s, "
+          f"p50 {bench_stats['p50_us']:.1f}us, p99 {bench_stats['p99_us']:.1f}us, max {bench_stats['max_us']:.1f}us")
+    slowest = sorted(layout_results, key=lambda result: result.nanoseconds, reverse=True)[:parsed_args.show]
+    print("slowest:")
+    for result in slowest:
+        print(f"  {result.nanoseconds / 1000:>8.1f}us  {result.track!r} / {result.artist!r}")
+
+    print(f"overflows: {bench_stats['wide']} wider than {COLUMN_WIDTH}px, {bench_stats['overlap']} track/artist overlaps, {bench_stats['errors']} errors")
+    for result in [result for result in layout_results if result.wide][:parsed_args.show]:
+        for which, line, rendered, measured in result.wide:
+            print(f"  wide {which} {rendered:.0f}px (TextMetrics {measured}px): {line!r}")
+    for result in [result for result in layout_results if result.overlap][:parsed_args.show]:
+        print(f"  overlap: {result.track!r} / {result.artist!r}")
+    for track_name, artist_name, error in layout_errors[:parsed_args.show]:
+        print(f"  error {error}: {track_name!r} / {artist_name!r}")
+
+    if parsed_args.save_baseline:
+        os.makedirs(os.path.dirname(parsed_args.baseline) or ".", exist_ok=True)
+        with open(parsed_args.baseline, "w", encoding="utf-8") as f:
+            json.dump(bench_stats, f, indent=4)
+        print(f"Saved baseline to {parsed_args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(parsed_args.baseline):
+        print(f"No baseline at {parsed_args.baseline} yet, save one with --save-baseline")
+        sys.exit(0)
+    with open(parsed_args.baseline, encoding="utf-8") as f:
+        found = compare(bench_stats, json.load(f), parsed_args.tolerance)
+    if found:
+        print(f"{len(found)} regression(s) against {parsed_args.baseline}:")
+        for line in found:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions against {parsed_args.baseline} (tolerance {parsed_args.tolerance:.0%})")
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Tuple
+
+
+class TextLayout:
+    """
+    A finished text layout: every line with the position it's drawn at, plus the
+    DS font tier it was laid out for. Drawing a TextLayout is just text() calls.
+    """
+    def __init__(self, lines: List[Tuple[Tuple[int, int], str]], size: int, text_height: int):
+        self.lines = lines
+        self.size = size  # {0, 1, 2} to denote DS font sizes {16, 32, 64}
+        self.text_height = text_height
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
+
+
+class LayoutCache:
+    """
+    Bounded LRU cache of TextLayouts.
+
+    Track and artist names rarely change between refreshes, so Draw keys their
+    layouts by (text, track line count, track text height, x, y) and only runs the
+    split/measure/pack/hyphenate work on a miss.
+    """
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, TextLayout]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], TextLayout]) -> TextLayout:
+        """
+        Return the cached layout for key, calling build() to create it on a miss.
+        """
+        layout = self._entries.get(key)
+        if layout is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return layout
+
+        self.misses += 1
+        layout = build()
+        self._entries[key] = layout
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return layout
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,215 @@
+from typing import List, Optional, Tuple
+
+from lib.text_metrics import TextMetrics
+
+# Widest line we allow in a Spotify column, in pixels
+COLUMN_WIDTH = 189
+
+# Max rows per DS font tier {0, 1, 2} for a track name, and for an artist name
+# on its own; the artist additionally shares the column's row budget with the
+# track above it (see LineBreaker.layout_artist).
+TRACK_MAX_ROWS = {2: 2, 1: 5}
+ARTIST_MAX_ROWS = {2: 2, 1: 4}
+SHARED_MAX_ROWS = {2: 3, 1: 6}
+
+# Per DS font tier {0, 1, 2}: track/artist line spacing, the text height reported
+# back to Clock, and how far each artist line nudges the block up from its anchor
+LINE_HEIGHTS = (12, 26, 43)
+TEXT_HEIGHTS = (13, 26, 55)
+ARTIST_Y_NUDGES = (12, 25, 42)
+# How far small track text starts below the column's top
+SMALL_TRACK_DROP = 5
+# Pixels from the top of the track to the artist's anchor below it (y 26 to 190), which
+# the track's lines and the artist's (nudged up from the anchor) have to share
+COLUMN_HEIGHT = 164
+# Appended to the last row of a small name cut short to fit the column
+ELLIPSIS = "\u2026"
+
+
+def track_bottom(size: int, rows: int) -> int:
+    """
+    How far below the column's top rows of track text at tier size end.
+    """
+    return (SMALL_TRACK_DROP if size == 0 else 0) + (rows - 1) * LINE_HEIGHTS[size] + TEXT_HEIGHTS[size]
+
+
+def artist_rows_left(track_size: int, track_rows: int, size: int) -> int:
+    """
+    How many rows of artist text at tier size fit under track_rows of track text at track_size.
+    """
+    return (COLUMN_HEIGHT - track_bottom(track_size, track_rows)) // ARTIST_Y_NUDGES[size]
+
+
+# Most rows of small track text that still leave room for a row of small artist text
+SMALL_TRACK_MAX_ROWS = (COLUMN_HEIGHT - ARTIST_Y_NUDGES[0] - track_bottom(0, 1)) // LINE_HEIGHTS[0] + 1
+
+
+class Token:
+    """
+    A breakable unit of text: a whole word, or one piece of a word too wide for
+    the column that had to be hyphenated.
+    """
+    __slots__ = ("text", "width", "must_end_line", "must_start_line")
+
+    def __init__(self, text: str, width: int, must_end_line: bool = False, must_start_line: bool = False):
+        self.text = text
+        self.width = width
+        self.must_end_line = must_end_line
+        self.must_start_line = must_start_line
+
+
+class LineBreaker:
+    """
+    Breaks track/artist names into lines for a fixed-width column.
+
+    Words are measured once per DS font tier, then packed with a dynamic-programming
+    breaker that minimizes the number of lines first and raggedness (sum of squared
+    slack on every line but the last) second. Words wider than the column are
+    hyphenated at character boundaries into pieces that each take their own line.
+    Results depend only on the text and font metrics, so they're deterministic.
+    """
+    def __init__(self, text_metrics: TextMetrics, max_width: int = COLUMN_WIDTH):
+        self.text_metrics = text_metrics
+        self.max_width = max_width
+
+    def tokenize(self, words: List[str], size: int, hyphenate: bool) -> Optional[List[Token]]:
+        """
+        Measure words at the given tier, hyphenating any too wide for the column.
+
+        Returns:
+            List[Token], or None if a word doesn't fit and hyphenate is False.
+        """
+        measure, advance = self.text_metrics.measure, self.text_metrics.advance
+        tokens = []
+        for word in words:
+            width = measure(word, size)
+            if width <= self.max_width:
+                tokens.append(Token(word, width))
+                continue
+            if not hyphenate:
+                return None
+
+            hyphen_width = advance("-", size)
+            piece, piece_width = "", 0
+            pieces = []
+            for c in word:
+                char_width = advance(c, size)
+                if piece and piece_width + char_width + hyphen_width > self.max_width:
+                    pieces.append((piece, piece_width))
+                    piece, piece_width = "", 0
+                piece += c
+                piece_width += char_width
+            for i, (text, text_width) in enumerate(pieces):
+                tokens.append(Token(text + "-", text_width + hyphen_width, must_end_line=True, must_start_line=i == 0))
+            tokens.append(Token(piece, piece_width, must_start_line=not pieces))
+        return tokens
+
+    def break_tokens(self, tokens: List[Token], size: int) -> List[str]:
+        """
+        Pack tokens into lines no wider than the column with the fewest lines,
+        then the least ragged right edge.
+        """
+        n = len(tokens)
+        if n == 0:
+            return []
+        space = self.text_metrics.advance(" ", size)
+
+        # best[i] = (line count, raggedness, end index of first line) for tokens[i:]
+        best: List[Optional[Tuple[int, int, int]]] = [None] * (n + 1)
+        best[n] = (0, 0, n)
+        for i in range(n - 1, -1, -1):
+            width = -space
+            for j in range(i, n):
+                token = tokens[j]
+                if j > i and token.must_start_line:
+                    break
+                width += space + token.width
+                if width > self.max_width and j > i:
+                    break
+                rest = best[j + 1]
+                if rest is not None:
+                    slack = 0 if j == n - 1 else self.max_width - width
+                    candidate = (rest[0] + 1, rest[1] + slack * slack, j + 1)
+                    if best[i] is None or candidate[:2] < best[i][:2]:
+                        best[i] = candidate
+                if token.must_end_line:
+                    break
+
+        lines = []
+        i = 0
+        while i < n:
+            end = best[i][2]
+            lines.append(" ".join(token.text for token in tokens[i:end]))
+            i = end
+        return lines
+
+    def break_text(self, text: str, size: int, hyphenate: bool = True) -> Optional[List[str]]:
+        """
+        Break text into lines at the given DS font tier.
+
+        Args:
+            text (str): The text to break.
+            size (int): {0, 1, 2} to denote DS font sizes {16, 32, 64}.
+            hyphenate (bool): Whether words too wide for the column may be split.
+
+        Returns:
+            List[str], or None if hyphenate is False and a word doesn't fit.
+        """
+        tokens = self.tokenize([word for word in text.split(" ") if word], size, hyphenate)
+        return None if tokens is None else self.break_tokens(tokens, size)
+
+    def truncate(self, lines: List[str], max_rows: int, size: int) -> List[str]:
+        """
+        Cut lines down to max_rows (at least one), ending the last kept row in an ellipsis
+        that still fits the column if any were dropped.
+        """
+        max_rows = max(max_rows, 1)
+        if len(lines) <= max_rows:
+            return lines
+        last = lines[max_rows - 1]
+        while last and self.text_metrics.measure(last + ELLIPSIS, size) > self.max_width:
+            last = last[:-1]
+        return lines[:max_rows - 1] + [last.rstrip() + ELLIPSIS]
+
+    def layout_track(self, track_name: str) -> Tuple[int, List[str]]:
+        """
+        Pick the largest tier a track name fits in.
+
+        Large text must fit in TRACK_MAX_ROWS[2] lines with no hyphenation, medium in
+        TRACK_MAX_ROWS[1] lines, and small is cut to SMALL_TRACK_MAX_ROWS, leaving room
+        for the artist.
+
+        Returns:
+            Tuple[int, List[str]]: The chosen tier {0, 1, 2} and its lines.
+        """
+        lines = self.break_text(track_name, 2, hyphenate=False)
+        if lines is not None and len(lines) <= TRACK_MAX_ROWS[2]:
+            return 2, lines
+        lines = self.break_text(track_name, 1)
+        if len(lines) <= TRACK_MAX_ROWS[1]:
+            return 1, lines
+        return 0, self.truncate(self.break_text(track_name, 0), SMALL_TRACK_MAX_ROWS, 0)
+
+    def layout_artist(self, artist_name: str, track_line_count: int, track_size: int) -> Tuple[int, List[str]]:
+        """
+        Pick the largest tier an artist name fits in, given the track layout above it.
+
+        Large artist text needs a large track to leave room for it within
+        SHARED_MAX_ROWS[2] rows, or a smaller track of fewer than four lines. Medium
+        artist text must fit in ARTIST_MAX_ROWS[1] lines and SHARED_MAX_ROWS[1] rows
+        shared with the track. Either also has to fit in the column height the track leaves.
+        Small is cut to however many rows fit there.
+
+        Returns:
+            Tuple[int, List[str]]: The chosen tier {0, 1, 2} and its lines.
+        """
+        lines = self.break_text(artist_name, 2, hyphenate=False)
+        if lines is not None and len(lines) <= ARTIST_MAX_ROWS[2]:
+            if (track_size == 2 and track_line_count + len(lines) <= SHARED_MAX_ROWS[2] or track_size < 2 and track_line_count < 4) \
+                    and len(lines) <= artist_rows_left(track_size, track_line_count, 2):
+                return 2, lines
+        lines = self.break_text(artist_name, 1)
+        if len(lines) <= ARTIST_MAX_ROWS[1] and track_line_count + len(lines) <= SHARED_MAX_ROWS[1] \
+                and len(lines) <= artist_rows_left(track_size, track_line_count, 1):
+            return 1, lines
+        return 0, self.truncate(self.break_text(artist_name, 0), artist_rows_left(track_size, track_line_count, 0), 0)
@@ -1,64 +1,71 @@
-import os
 from datetime import datetime as dt
+from io import BytesIO
 from typing import Optional, Tuple
 
 import requests
 from PIL import Image
 
+from lib.album_art_cache import album_art_cache, art_key
 from lib.clock_logging import logger
 
+# Refuse to download album art bigger than this; a 640px Spotify cover is ~100KB
+MAX_IMAGE_BYTES = 2 * 1024 * 1024
+
+
 class Misc():
     """
     A class that provides miscellaneous utility functions for image manipulation and retrieval.
     """
     
-    def save_image_from_url(self, track_image_link: str, file_name: str) -> bool:
+    def fetch_image_data(self, track_image_link: str) -> Optional[bytes]:
         """
-        Saves an image from a given URL to a file.
+        Downloads an image from a given URL into memory, streamed so an oversized body
+        is abandoned at MAX_IMAGE_BYTES instead of being read in full.
 
         Args:
-            track_image_link (str): The URL of the image to be saved.
-            file_name (str): The name of the file to save the image as.
+            track_image_link (str): The URL of the image to download.
 
         Returns:
-            bool: True if the image was successfully saved, False otherwise.
+            Optional[bytes]: The encoded image, or None if the download failed or was too big.
         """
-        os.makedirs("cache", exist_ok=True)
-        os.makedirs("cache/album_art", exist_ok=True)
         try:
-            img_data = requests.get(track_image_link, timeout=25).content
+            with requests.get(track_image_link, timeout=25, stream=True) as response:
+                response.raise_for_status()
+                if int(response.headers.get("Content-Length") or 0) > MAX_IMAGE_BYTES:
+                    logger.error("Refusing %s: %s bytes is over the %d byte cap", track_image_link, response.headers["Content-Length"], MAX_IMAGE_BYTES)
+                    return None
+                image_data = bytearray()
+                for chunk in response.iter_content(chunk_size=16 * 1024):
+                    image_data += chunk
+                    if len(image_data) > MAX_IMAGE_BYTES:
+                        logger.error("Abandoned %s after %d bytes, over the %d byte cap", track_image_link, len(image_data), MAX_IMAGE_BYTES)
+                        return None
         except requests.exceptions.RequestException as e:
             logger.error("Failed to get %s: %s", track_image_link, e)
-            return False
-
-        try:
-            with open(f"cache/album_art/{file_name}", 'wb') as handler:
-                handler.write(img_data)
-        except OSError as e:
-            logger.error("Failed to write cache/album_art/%s: %s", file_name, e)
-            return False
+            return None
+        return bytes(image_data)
 
-        return True
-
-    def resize_image(self, image_name: str, size: Tuple[int, int] = (199, 199)) -> None:
+    def resize_image(self, image_data: bytes, size: Tuple[int, int] = (199, 199)) -> Optional[Image.Image]:
         """
-        Resize the given image and save it as a PNG file.
+        Decode an encoded image and shrink it to fit size, in grayscale.
+        JPEGs are draft decoded: straight to grayscale, and at the smallest 1/2, 1/4 or 1/8
+        scale that still leaves the usual 2x margin for the final resample.
 
         Args:
-            image_name (str): The name of the image file to resize.
+            image_data (bytes): The encoded image.
             size (Tuple[int, int]): The desired size of the resized image. Default is (199, 199).
+
+        Returns:
+            Optional[Image.Image]: The resized image, or None if it couldn't be decoded.
         """
-        os.makedirs("cache", exist_ok=True)
-        os.makedirs("cache/album_art", exist_ok=True)
-        postfix = "resize" if any(s >= 100 for s in size) else "thumbnail"
-        outfile = os.path.splitext(image_name)[0] + f"_{postfix}.PNG"
         try:
-            im = Image.open(f"cache/album_art/{image_name}")
-            im.thumbnail(size)
-            im = im.convert("L")
-            im.save(f"cache/album_art/{outfile}", "PNG")
-        except IOError:
-            logger.error("Cannot create %s for '%s'", postfix, image_name)
+            with Image.open(BytesIO(image_data)) as im:
+                im.draft("L", (size[0] * 2, size[1] * 2))
+                im.thumbnail(size)
+                return im.convert("L")
+        except (IOError, Image.DecompressionBombError) as e:
+            logger.error("Cannot resize image to %s: %s", size, e)
+            return None
 
     def has_sun_set(self, sunset_info: Optional[Tuple[int, int]], sunset_flip: bool) -> bool:
         """
@@ -83,21 +90,32 @@ class Misc():
 
         return sunset_flip and ((sunset_hour < current_hour or current_hour < 2) or (sunset_hour == current_hour and sunset_minute <= current_minute))
 
-    def get_album_art(self, track_image_link: str, album_image_name: str = "AlbumImage.PNG") -> bool:
+    def get_album_art(self, track_image_link: str) -> Optional[str]:
         """
-        Downloads the album art from the given track image link and saves it with the specified album image name.
-        The downloaded image is then resized.
-        
+        Makes sure the resized variants of the album art at track_image_link are in the album art cache,
+        downloading and resizing it in memory only if they aren't already there. The cover is
+        decoded once; the thumbnail is shrunk from the 199px resize.
+
         Args:
             track_image_link (str): The URL of the track image.
-            album_image_name (str): The name of the album image file (default is "AlbumImage.PNG").
 
         Returns:
-            bool: True if the album art was successfully downloaded and resized, False otherwise.
+            Optional[str]: The cover's album art cache key, or None if it couldn't be downloaded.
         """
-        if not self.save_image_from_url(track_image_link, album_image_name):
-            return False
-
-        self.resize_image(album_image_name)
-        self.resize_image(album_image_name, (46, 46))
-        return True
\ No newline at end of file
+        key = art_key(track_image_link)
+        if album_art_cache.lookup(key, "resize", "thumbnail"):
+            logger.info("Album art %s found in cache (%d hits, %d misses)", key, album_art_cache.hits, album_art_cache.misses)
+            return key
+
+        image_data = self.fetch_image_data(track_image_link)
+        if image_data is None:
+            return None
+        resized = self.resize_image(image_data)
+        if resized is None:
+            return None
+        thumbnail = resized.copy()
+        thumbnail.thumbnail((46, 46))
+        logger.info("Fetched album art %s: %d bytes", key, len(image_data))
+        album_art_cache.put(key, "resize", resized)
+        album_art_cache.put(key, "thumbnail", thumbnail)
+        return key
@@ -0,0 +1,34 @@
+from typing import Dict
+
+
+class MovingAverages:
+    """
+    Exponentially weighted moving averages of named durations, each starting from an
+    initial estimate until it's been measured. Names never given an initial estimate
+    are estimated as fallback.
+    """
+    def __init__(self, initial: Dict[str, float], fallback: float, alpha: float = 0.3):
+        self.alpha = alpha
+        self.fallback = fallback
+        self.estimates: Dict[str, float] = dict(initial)
+        self.samples: Dict[str, int] = {}
+
+    def estimate(self, name: str) -> float:
+        """
+        Expected seconds for name.
+        """
+        return self.estimates.get(name, self.fallback)
+
+    def record(self, name: str, seconds: float) -> float:
+        """
+        Fold a measured duration into name's estimate; the first measurement replaces the initial one outright.
+
+        Returns:
+            float: The new estimate.
+        """
+        if self.samples.get(name):
+            self.estimates[name] += self.alpha * (seconds - self.estimates[name])
+        else:
+            self.estimates[name] = seconds
+        self.samples[name] = self.samples.get(name, 0) + 1
+        return self.estimates[name]
@@ -0,0 +1,83 @@
+"""
+Windowed partial refreshes for the 4.2in V2 panel (SSD1683 controller).
+
+The vendor display_Partial() always rewrites the whole 400x300 RAM, but the controller
+can be pointed at an arbitrary window: only the changed region (typically the clock
+digits, ~1/10th of the panel) gets sent over SPI and refreshed. The window stays set
+on the controller until something resets it, and the vendor display() and display_Fast()
+don't, so display_window() puts it back to the whole panel once its refresh is done.
+"""
+from typing import Tuple
+
+from PIL import Image
+
+from lib.epd_buffer import pack_1bpp
+
+# SSD1683 commands used to set up and fill a RAM window
+SET_RAM_X_RANGE = 0x44
+SET_RAM_Y_RANGE = 0x45
+SET_RAM_X_COUNTER = 0x4E
+SET_RAM_Y_COUNTER = 0x4F
+WRITE_BW_RAM = 0x24
+BORDER_WAVEFORM = 0x3C
+DISPLAY_UPDATE_CONTROL = 0x21
+
+
+def align_window(box: Tuple[int, int, int, int], width: int, height: int) -> Tuple[int, int, int, int]:
+    """
+    Widen box (left, top, right, bottom, right/bottom exclusive) to whole bytes horizontally,
+    since the controller addresses RAM columns 8 pixels at a time, and clip it to the panel.
+    """
+    left, top, right, bottom = box
+    left = max(left // 8 * 8, 0)
+    right = min((right + 7) // 8 * 8, width)
+    return left, max(top, 0), right, min(bottom, height)
+
+
+def set_window(epd, left: int, top: int, right: int, bottom: int) -> None:
+    """
+    Point the controller's RAM window and address counters at the byte-aligned box
+    (left, top, right, bottom, right/bottom exclusive).
+    """
+    epd.send_command(SET_RAM_X_RANGE)
+    epd.send_data(left // 8)
+    epd.send_data(right // 8 - 1)
+    epd.send_command(SET_RAM_Y_RANGE)
+    epd.send_data(top & 0xFF)
+    epd.send_data(top >> 8)
+    epd.send_data((bottom - 1) & 0xFF)
+    epd.send_data((bottom - 1) >> 8)
+    epd.send_command(SET_RAM_X_COUNTER)
+    epd.send_data(left // 8)
+    epd.send_command(SET_RAM_Y_COUNTER)
+    epd.send_data(top & 0xFF)
+    epd.send_data(top >> 8)
+
+
+def display_window(epd, image: Image.Image, box: Tuple[int, int, int, int]) -> int:
+    """
+    Write the byte-aligned box of image into the panel's RAM window and run a partial
+    refresh, mirroring the command sequence of the vendor epd4in2_V2 display_Partial(),
+    then reset the RAM window to the whole panel so full and fast pushes can follow.
+
+    Returns:
+        int: The number of bytes sent.
+    """
+    left, top, right, bottom = box
+    buf = pack_1bpp(image.crop(box), right - left, bottom - top)
+
+    epd.send_command(BORDER_WAVEFORM)
+    epd.send_data(0x80)
+    epd.send_command(DISPLAY_UPDATE_CONTROL)
+    epd.send_data(0x00)
+    epd.send_data(0x00)
+    epd.send_command(BORDER_WAVEFORM)
+    epd.send_data(0x80)
+
+    set_window(epd, left, top, right, bottom)
+    epd.send_command(WRITE_BW_RAM)
+    epd.send_data2(buf)
+    epd.TurnOnDisplay_Partial()
+    set_window(epd, 0, 0, epd.width, epd.height)
+    return len(buf)
+
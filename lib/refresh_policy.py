@@ -0,0 +1,160 @@
+"""
+Refresh policies: which kind of EPD refresh to use for each frame.
+
+Partial refreshes are fast and barely flash, but every one leaves a little ghosting
+behind in the area it touched, and only a full refresh clears it. GhostingPolicy
+tracks that per region of the panel and decides per frame, against a ghosting budget
+(partials per region), a maximum time between full refreshes and a power budget.
+"""
+import time
+from collections import Counter, deque
+from typing import Deque, Iterator, NamedTuple, Optional, Tuple
+
+from lib.refresh_timer import DEFAULT_REFRESH_SECONDS
+
+Box = Tuple[int, int, int, int]
+
+# Relative energy of each refresh, in full refreshes: the panel drives its waveform for
+# the whole refresh, so this goes with how long each one takes
+REFRESH_COSTS = {mode: seconds / DEFAULT_REFRESH_SECONDS["full"] for mode, seconds in DEFAULT_REFRESH_SECONDS.items()}
+# Ghosting is tracked in square regions of this many pixels
+REGION_SIZE = 50
+
+
+class RefreshDecision(NamedTuple):
+    """
+    How to push one frame: mode is "4gray", "full", "fast" or "window"; box is the
+    window to refresh for "window"; reason says why, for the counters and the log.
+    """
+    mode: str
+    box: Optional[Box]
+    reason: str
+
+
+class RefreshPolicy:
+    """
+    The simplest policy, and the interface every policy implements: a full refresh
+    (or a four gray one in 4 Gray Scale mode) for every frame.
+
+    Clock calls decide() for each frame that changed, pushes it the way the decision
+    says, then calls record() so the policy can account for it.
+    """
+    def __init__(self, four_gray_scale: bool = False):
+        self.four_gray_scale = four_gray_scale
+        self.decisions: Counter = Counter()
+        self.refreshes: Counter = Counter()
+        self.cost = 0.0
+
+    def decide(self, size: Tuple[int, int], changed_box: Optional[Box], dark_mode: bool, now: Optional[float] = None) -> RefreshDecision:
+        """
+        Pick how to push a frame of size whose changed pixels are within changed_box.
+        """
+        return self._count(RefreshDecision("4gray" if self.four_gray_scale else "full", None, "always"))
+
+    def _count(self, decision: RefreshDecision) -> RefreshDecision:
+        self.decisions[f"{decision.mode}:{decision.reason}"] += 1
+        return decision
+
+    def record(self, decision: RefreshDecision, now: Optional[float] = None) -> None:
+        """
+        Account for a refresh that was just pushed as decided.
+        """
+        self.refreshes[decision.mode] += 1
+        self.cost += REFRESH_COSTS.get(decision.mode, 1.0)
+
+    def stats(self, now: Optional[float] = None) -> dict:
+        """
+        Decision and cost counters: how many refreshes of each mode, how often each (mode:reason)
+        was decided, and the total cost in full refreshes.
+        """
+        return {"refreshes": dict(self.refreshes), "decisions": dict(self.decisions), "cost": round(self.cost, 2)}
+
+
+class GhostingPolicy(RefreshPolicy):
+    """
+    Partial refreshes wherever possible, full refreshes only when needed:
+
+    - the first frame, a frame that changed everywhere, and any frame in dark mode
+      (partials there leave a zebra stripe artifact) get a full refresh;
+    - so does any frame once a region it touches has had ghosting_budget partials since
+      the last full refresh, or once full_interval seconds have passed since it;
+    - but if the refreshes in the last hour already cost power_budget (in full refreshes,
+      0 for no limit), a full refresh that's only due to full_interval is put off;
+    - everything else is a windowed partial refresh of just the changed box on V2
+      panels, or a full-buffer fast refresh on V1 panels. A fast refresh uses the same
+      short waveform as a partial one, so it counts as a partial in every region.
+    """
+    def __init__(self, width: int, height: int, windowed: bool, ghosting_budget: int, full_interval: float, power_budget: float = 0.0):
+        super().__init__()
+        self.windowed = windowed
+        self.ghosting_budget = ghosting_budget
+        self.full_interval = full_interval
+        self.power_budget = power_budget
+        self.columns = (width + REGION_SIZE - 1) // REGION_SIZE
+        self.rows = (height + REGION_SIZE - 1) // REGION_SIZE
+        # partial refreshes per region since the last full refresh, row by row
+        self.partials = [[0] * self.columns for _ in range(self.rows)]
+        self.last_full: Optional[float] = None
+        # (time, cost) of every refresh in the last hour, for the power budget
+        self.recent_costs: Deque[Tuple[float, float]] = deque()
+
+    def regions(self, box: Box) -> Iterator[Tuple[int, int]]:
+        """
+        (row, column) of every region box overlaps.
+        """
+        left, top, right, bottom = box
+        for row in range(max(top, 0) // REGION_SIZE, min((bottom - 1) // REGION_SIZE, self.rows - 1) + 1):
+            for column in range(max(left, 0) // REGION_SIZE, min((right - 1) // REGION_SIZE, self.columns - 1) + 1):
+                yield row, column
+
+    def max_partials(self) -> int:
+        """
+        The most partial refreshes any region has had since the last full refresh.
+        """
+        return max(max(row) for row in self.partials)
+
+    def hourly_cost(self, now: float) -> float:
+        """
+        What the refreshes in the hour up to now cost, in full refreshes.
+        """
+        while self.recent_costs and now - self.recent_costs[0][0] > 3600:
+            self.recent_costs.popleft()
+        return sum(cost for _, cost in self.recent_costs)
+
+    def decide(self, size: Tuple[int, int], changed_box: Optional[Box], dark_mode: bool, now: Optional[float] = None) -> RefreshDecision:
+        now = time.time() if now is None else now
+        if self.last_full is None:
+            return self._count(RefreshDecision("full", None, "first"))
+        if changed_box is None or changed_box == (0, 0) + size:
+            return self._count(RefreshDecision("full", None, "whole_frame"))
+        if dark_mode:
+            return self._count(RefreshDecision("full", None, "dark_mode"))
+
+        if any(self.partials[row][column] >= self.ghosting_budget for row, column in self.regions(changed_box)):
+            return self._count(RefreshDecision("full", None, "ghosting"))
+        if now - self.last_full >= self.full_interval:
+            if not self.power_budget or self.hourly_cost(now) + REFRESH_COSTS["full"] <= self.power_budget:
+                return self._count(RefreshDecision("full", None, "interval"))
+            self.decisions["deferred:power"] += 1
+        if not self.windowed:
+            return self._count(RefreshDecision("fast", None, "partial"))
+        return self._count(RefreshDecision("window", changed_box, "partial"))
+
+    def record(self, decision: RefreshDecision, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        super().record(decision, now)
+        self.recent_costs.append((now, REFRESH_COSTS.get(decision.mode, 1.0)))
+        if decision.mode == "full":
+            self.last_full = now
+            self.partials = [[0] * self.columns for _ in range(self.rows)]
+        else:
+            for row, column in self.regions(decision.box or (0, 0, self.columns * REGION_SIZE, self.rows * REGION_SIZE)):
+                self.partials[row][column] += 1
+
+    def stats(self, now: Optional[float] = None) -> dict:
+        now = time.time() if now is None else now
+        stats = super().stats(now)
+        stats["max_region_partials"] = self.max_partials()
+        stats["seconds_since_full"] = round(now - self.last_full) if self.last_full is not None else None
+        stats["hourly_cost"] = round(self.hourly_cost(now), 2)
+        return stats
@@ -0,0 +1,27 @@
+from typing import Dict, Optional
+
+from lib.moving_average import MovingAverages
+
+# Rough wall-clock cost of each refresh on a real 4.2in panel, in seconds: the starting
+# estimates before any refresh has been measured (and what lib/fake_epd.py simulates)
+DEFAULT_REFRESH_SECONDS = {
+    "full": 4.0,
+    "4gray": 5.0,
+    "fast": 1.5,
+    "partial": 0.6,
+    "window": 0.4,
+}
+# Starting estimate for fetching everything and rendering a frame, before it's been measured
+DEFAULT_RENDER_SECONDS = 5.0
+
+
+class RefreshTimer(MovingAverages):
+    """
+    Exponentially weighted moving average of how long each kind of EPD refresh, and
+    building a frame ("render"), actually takes on this board and panel.
+
+    Clock uses the estimates to render the next minute's frame early and start pushing
+    it just soon enough that the refresh finishes on the minute boundary.
+    """
+    def __init__(self, alpha: float = 0.3, initial: Optional[Dict[str, float]] = None):
+        super().__init__(initial if initial is not None else {**DEFAULT_REFRESH_SECONDS, "render": DEFAULT_RENDER_SECONDS}, max(DEFAULT_REFRESH_SECONDS.values()), alpha)
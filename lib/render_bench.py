@@ -0,0 +1,414 @@
+"""
+End-to-end benchmark of building a frame: Clock.build_image() plus packing the frame into
+the EPD buffer, driven by the fixture Spotify and weather data in lib/render_fixtures.json
+across every layout mode (two users, single user with album art left or right, detailed
+weather, 1-bit and four gray, dark mode, long Unicode titles, no album art). No network,
+panel or on-disk album art cache is involved, so the numbers are the rendering alone.
+
+Each scenario is timed twice per run: "first", a fresh Clock drawing everything (the cover
+resized and, in four gray, dithered from scratch), and "tick", the next minute's frame.
+Time is split into stages:
+
+    layout     line breaking, text measuring, bottom bar layout
+    text       glyph blitting
+    art        decoding and resizing covers, pasting album art
+    dither     dithering covers to four grays
+    chrome     drawing the chrome base layer (borders, names) for a theme and layout
+    inversion  dark mode: inverted icon lookups and dark_mode_flip()
+    pack       packing the frame into the EPD buffer
+    wait       build_image blocked on the album art worker
+    other      the rest: snapshot, widget bookkeeping, clearing to the chrome
+
+Stage times are exclusive (text drawn inside the chrome layer counts as text). The album art
+worker resizes and dithers on its own threads while build_image waits, so art, dither and wait
+can add up to more than the total. Peak memory is how far Python's allocations (tracemalloc) rose
+during each phase of a separate untimed run; Pillow's pixel buffers aren't included there, but
+are in the max RSS.
+
+    python -m lib.render_bench [--scenario NAME ...] [--repeat N] [--save-baseline] [--tolerance 0.25]
+
+Results are compared against the baseline in cache/render_bench_baseline.json (saved on this
+machine with --save-baseline); any stage, total or peak that got slower or bigger by more than
+the tolerance is reported and the exit status is 1.
+"""
+import argparse
+import functools
+import io
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+import lib.dither as dither
+from lib.album_art_cache import album_art_cache
+from lib.album_art_worker import AlbumArtWorker
+from lib.clock import Clock
+from lib.clock_logging import logger
+from lib.display_settings import display_settings
+from lib.draw import Draw
+from lib.epd_buffer import pack_1bpp, pack_4gray
+from lib.icon_atlas import IconAtlas
+from lib.misc import Misc
+
+FIXTURES_PATH = "lib/render_fixtures.json"
+BASELINE_PATH = "cache/render_bench_baseline.json"
+STAGES = ("layout", "text", "art", "dither", "chrome", "inversion", "pack", "wait", "other")
+# The frames timed per scenario: a fresh Clock's first frame, then the next minute's
+PHASES = (("first", "12:34pm"), ("tick", "12:35pm"))
+# Display settings every scenario starts from, so runs on differently configured clocks compare
+BASE_SETTINGS = {
+    "single_user": False,
+    "album_art_right_side": True,
+    "four_gray_scale": False,
+    "dither_algorithm": "quantize",
+    "render_budget_seconds": 0,
+    "always_dark_mode": False,
+    "sunset_flip": False,
+    "partial_update": False,
+    "detailed_weather_forecast": False,
+    "minutes_idle_until_detailed_weather": 30,
+    "twenty_four_hour_clock": False,
+    "time_on_right": True,
+    "metric_units": False,
+}
+# Differences below these are noise, however big they are relatively
+NOISE_FLOOR_MS = 0.5
+NOISE_FLOOR_KIB = 64
+
+# Where each stage's time is spent: (owner, attribute) of every function timed as that stage
+STAGE_FUNCTIONS = {
+    "layout": [(Draw, "layout_track_text"), (Draw, "layout_artist_text"), (Draw, "layout_bottom_bar"), (Draw, "get_text_width")],
+    "text": [(Draw, "draw_text")],
+    "art": [(Misc, "resize_image"), (Draw, "draw_album_image")],
+    "dither": [(dither, "dither")],
+    "chrome": [(Draw, "chrome_layer")],
+    "inversion": [(IconAtlas, "get"), (Draw, "dark_mode_flip")],
+    "wait": [(AlbumArtWorker, "result")],
+}
+
+
+class StageTimer:
+    """
+    Exclusive time per stage: a stage called from inside another is taken out of the outer
+    one's time. Each thread keeps its own stack, and main_seconds is how much of the main
+    thread's time was inside some stage, for working out "other".
+    """
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.main_seconds = 0.0
+
+    def wrap(self, stage: str, function):
+        timer = self
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            stack = timer.local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                inner = stack.pop()
+                with timer.lock:
+                    timer.totals[stage] += elapsed - inner
+                    if stack:
+                        stack[-1] += elapsed
+                    elif threading.current_thread() is threading.main_thread():
+                        timer.main_seconds += elapsed
+        return timed
+
+    @contextmanager
+    def instrument(self) -> Iterator["StageTimer"]:
+        """
+        Time every function in STAGE_FUNCTIONS while inside the block.
+        """
+        originals = []
+        for stage, functions in STAGE_FUNCTIONS.items():
+            for owner, name in functions:
+                original = owner.__dict__[name]
+                originals.append((owner, name, original))
+                setattr(owner, name, self.wrap(stage, original))
+        try:
+            yield self
+        finally:
+            for owner, name, original in reversed(originals):
+                setattr(owner, name, original)
+
+
+@functools.lru_cache(maxsize=None)
+def fixture_cover(name: str) -> bytes:
+    """
+    A 640px JPEG cover, like Spotify serves, generated so the fixtures need no image files:
+    smooth gradients (what dithering finds hard) with a few hard edges on top.
+    """
+    ramp = Image.linear_gradient('L').resize((640, 640))
+    radial = Image.radial_gradient('L').resize((640, 640))
+    if name == "warm":
+        image = Image.merge('RGB', (ramp.rotate(90), radial, ramp.point(lambda v: v // 3)))
+    else:
+        image = Image.merge('RGB', (radial.point(lambda v: v // 2), ramp, ramp.rotate(270)))
+    draw = ImageDraw.Draw(image)
+    for i in range(5):
+        inset = 60 + i * 50
+        draw.ellipse((inset, inset, 640 - inset, 640 - inset), outline=(255, 255, 255) if i % 2 else (0, 0, 0), width=6)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class FixtureWeather:
+    """
+    Stands in for Weather with the fixture's current conditions, sunset and forecast.
+    """
+    def __init__(self, weather: dict):
+        self.weather = weather
+
+    def get_current_temperature_info(self):
+        return tuple(self.weather["current"])
+
+    def get_sunset_info(self):
+        return tuple(self.weather["sunset"])
+
+    def get_four_hour_forecast(self):
+        return self.weather["four_hour_forecast"]
+
+
+class FixtureSpotifyUser:
+    """
+    Stands in for SpotifyUser, always returning the same fixture track.
+    """
+    def __init__(self, name: str, track: dict, reauth_days_left: Optional[int]):
+        self.name = name
+        self.track = track
+        self.reauth_days_left = reauth_days_left
+        self.needs_reauth = False
+
+    def days_until_reauth_required(self) -> Optional[int]:
+        return self.reauth_days_left
+
+    def get_spotipy_info(self) -> Tuple[str, str, str, str, str, Optional[str], str]:
+        track = self.track
+        link = f"fixture://{track['cover']}" if track["cover"] else None
+        return track["track"], track["artist"], track["time_since"], track["ctx_type"], track["ctx_title"], link, track["album"]
+
+
+class FixtureMisc(Misc):
+    """
+    Misc with covers "downloaded" from fixture_cover() instead of Spotify's CDN.
+    """
+    def fetch_image_data(self, track_image_link: str) -> Optional[bytes]:
+        return fixture_cover(track_image_link.split("://", 1)[1])
+
+
+class FixtureClock(Clock):
+    """
+    A Clock rendering one scenario from fixtures, with no panel attached.
+    """
+    def __init__(self, fixtures: dict, scenario: dict):
+        self.fixtures = fixtures
+        self.scenario = scenario
+        self.user_tracks = iter(scenario["users"])
+        super().__init__()
+
+    def make_epd(self):
+        self.local_run = True
+        return None
+
+    def make_frame_ring(self) -> None:
+        return None
+
+    def make_weather(self) -> FixtureWeather:
+        return FixtureWeather(self.fixtures["weather"])
+
+    def make_misc(self) -> Misc:
+        return FixtureMisc()
+
+    def make_spotify_user(self, name: str, main_user: bool) -> FixtureSpotifyUser:
+        return FixtureSpotifyUser(name, self.fixtures["tracks"][next(self.user_tracks)], self.scenario.get("reauth_days_left"))
+
+    def close(self) -> None:
+        if self.album_art_worker:
+            self.album_art_worker.fetcher.shutdown()
+            self.album_art_worker.ditherer.shutdown()
+
+
+@contextmanager
+def scenario_settings(settings: dict) -> Iterator[None]:
+    """
+    Apply BASE_SETTINGS and then settings to display_settings inside the block, and keep album art
+    in memory only, starting empty, so every cover is processed from scratch and nothing is written.
+    """
+    overrides = {**BASE_SETTINGS, **settings}
+    unknown = [name for name in overrides if not hasattr(display_settings, name)]
+    if unknown:
+        raise ValueError(f"Unknown display settings in fixtures: {', '.join(unknown)}")
+    saved = {name: getattr(display_settings, name) for name in overrides}
+    saved_art = album_art_cache.persist, album_art_cache.images
+    for name, value in overrides.items():
+        setattr(display_settings, name, value)
+    album_art_cache.persist, album_art_cache.images = False, OrderedDict()
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(display_settings, name, value)
+        album_art_cache.persist, album_art_cache.images = saved_art
+
+
+def render_frame(clock: FixtureClock, time_str: str, timer: StageTimer) -> None:
+    """
+    Build the frame for time_str and pack it for the panel, as Clock.show_frame() would.
+    """
+    clock.build_image(time_str)
+    pack = pack_4gray if display_settings.four_gray_scale else pack_1bpp
+    timer.wrap("pack", pack)(clock.image_obj.get_image_obj())
+
+
+def time_scenario(fixtures: dict, scenario: dict, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Render scenario repeat times, timed by stage.
+
+    Returns:
+        Dict: phase -> {stage or "total": median milliseconds}.
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {phase: defaultdict(list) for phase, _ in PHASES}
+    timer = StageTimer()
+    with scenario_settings(scenario["settings"]), timer.instrument():
+        for _ in range(repeat):
+            album_art_cache.images.clear()
+            clock = FixtureClock(fixtures, scenario)
+            try:
+                for phase, time_str in PHASES:
+                    timer.reset()
+                    start = perf_counter()
+                    render_frame(clock, time_str, timer)
+                    total = perf_counter() - start
+                    timer.totals["other"] = total - timer.main_seconds
+                    for stage in STAGES:
+                        samples[phase][stage].append(timer.totals.get(stage, 0.0) * 1000)
+                    samples[phase]["total"].append(total * 1000)
+            finally:
+                clock.close()
+    return {phase: {name: statistics.median(values) for name, values in stage_samples.items()} for phase, stage_samples in samples.items()}
+
+
+def measure_memory(fixtures: dict, scenario: dict) -> Dict[str, float]:
+    """
+    Peak Python allocations in KiB while rendering each phase of scenario once, over what
+    was already allocated when the phase started.
+    """
+    peaks = {}
+    timer = StageTimer()
+    with scenario_settings(scenario["settings"]):
+        clock = FixtureClock(fixtures, scenario)
+        tracemalloc.start()
+        try:
+            for phase, time_str in PHASES:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                render_frame(clock, time_str, timer)
+                peaks[phase] = (tracemalloc.get_traced_memory()[1] - before) / 1024
+        finally:
+            tracemalloc.stop()
+            clock.close()
+    return peaks
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Every stage, total and peak in results more than tolerance (a fraction) slower or bigger than
+    in baseline, and past the noise floor. Scenarios or phases missing from either are skipped.
+
+    Returns:
+        List[str]: One line per regression.
+    """
+    regressions = []
+    for name, phases in results.items():
+        for phase, measured in phases.items():
+            before = baseline.get(name, {}).get(phase)
+            if before is None:
+                continue
+            for metric, value in measured.items():
+                old = before.get(metric)
+                if old is None:
+                    continue
+                floor = NOISE_FLOOR_KIB if metric == "peak_kib" else NOISE_FLOOR_MS
+                if value > old * (1 + tolerance) and value - old > floor:
+                    unit = "KiB" if metric == "peak_kib" else "ms"
+                    regressions.append(f"{name} {phase} {metric}: {old:.2f}{unit} -> {value:.2f}{unit} ({(value / old - 1) * 100 if old else float('inf'):+.0f}%)")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    header = f"{'scenario':<28} {'phase':<5} {'total':>8} " + " ".join(f"{stage:>9}" for stage in STAGES) + f" {'peak KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, phases in results.items():
+        for phase, measured in phases.items():
+            stages = " ".join(f"{measured[stage]:>9.2f}" for stage in STAGES)
+            print(f"{name:<28} {phase:<5} {measured['total']:>8.2f} {stages} {measured['peak_kib']:>9.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time Clock.build_image by stage for every layout mode, from fixture data.")
+    parser.add_argument('--fixtures', default=FIXTURES_PATH, help="Fixture Spotify and weather data and the scenarios to render")
+    parser.add_argument('--scenario', nargs='*', help="Only these scenarios (default: all of them)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per scenario, the median of each stage is reported")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline to compare against and --save-baseline to")
+    parser.add_argument('--save-baseline', action='store_true', help="Save these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="How much slower or bigger than the baseline counts as a regression, as a fraction")
+    parsed_args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    with open(parsed_args.fixtures, encoding="utf-8") as f:
+        bench_fixtures = json.load(f)
+    scenarios = bench_fixtures["scenarios"]
+    names = parsed_args.scenario or list(scenarios)
+    unknown_scenarios = [name for name in names if name not in scenarios]
+    if unknown_scenarios:
+        print(f"Unknown scenario(s): {', '.join(unknown_scenarios)}. Known: {', '.join(scenarios)}")
+        sys.exit(2)
+
+    bench_results = {}
+    for scenario_name in names:
+        bench_results[scenario_name] = time_scenario(bench_fixtures, scenarios[scenario_name], max(1, parsed_args.repeat))
+        for bench_phase, peak in measure_memory(bench_fixtures, scenarios[scenario_name]).items():
+            bench_results[scenario_name][bench_phase]["peak_kib"] = peak
+
+    print(f"{len(names)} scenario(s), {parsed_args.repeat} run(s) each, median ms per stage")
+    print_results(bench_results)
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+    if parsed_args.save_baseline:
+        os.makedirs(os.path.dirname(parsed_args.baseline) or ".", exist_ok=True)
+        with open(parsed_args.baseline, "w", encoding="utf-8") as f:
+            json.dump(bench_results, f, indent=4)
+        print(f"Saved baseline to {parsed_args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(parsed_args.baseline):
+        print(f"No baseline at {parsed_args.baseline} yet, save one with --save-baseline")
+        sys.exit(0)
+    with open(parsed_args.baseline, encoding="utf-8") as f:
+        found = compare(bench_results, json.load(f), parsed_args.tolerance)
+    if found:
+        print(f"{len(found)} regression(s) against {parsed_args.baseline}:")
+        for line in found:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions against {parsed_args.baseline} (tolerance {parsed_args.tolerance:.0%})")
@@ -0,0 +1,74 @@
+"""
+Quality tiers for album art in 4 Gray Scale, picked frame by frame so dithering a new
+cover can't push a slow board's frame past its minute:
+
+    full       dither_algorithm from display settings (quantize, Pillow's Floyd-Steinberg, by default),
+               seconds on a Pi Zero
+    ordered    Bayer ordered dithering, a single vectorized pass
+    threshold  cached art only: every pixel rounded to the nearest gray, but never while a
+               frame renders. Until the cover's threshold variant has been made in spare time,
+               the frame shows the cover already on screen, or NA, instead.
+
+A tier's dither of a cover costs nothing once it's in the album art cache, so the best
+tier already made is always in the running. Cheaper tiers are kept in memory only;
+Clock dithers the full one in spare time before a later frame, which then shows it.
+"""
+from typing import Iterable
+
+from lib.moving_average import MovingAverages
+
+# Best first
+TIERS = ("full", "ordered", "threshold")
+# The dither algorithm of every tier but full, which uses the display settings' dither_algorithm
+TIER_ALGORITHMS = {"ordered": "bayer", "threshold": "threshold"}
+# Starting estimates, in seconds, for dithering a cover at each tier and for rendering the
+# rest of a frame ("frame"), until they've been measured
+DEFAULT_COSTS = {"full": 3.0, "ordered": 0.2, "threshold": 0.02, "frame": 0.5}
+
+
+def tier_variant(variant: str, tier: str) -> str:
+    """
+    The album art cache variant holding the tier's version of a dither variant ("dither" or "thumbnail_dither").
+    """
+    return variant if tier == "full" else f"{variant}_{tier}"
+
+
+def tier_algorithm(tier: str, dither_algorithm: str) -> str:
+    """
+    The dither algorithm tier uses, given the configured dither_algorithm for full quality.
+    """
+    return TIER_ALGORITHMS.get(tier, dither_algorithm)
+
+
+class ArtQuality:
+    """
+    Picks the album art tier for each frame from a budget of render seconds per frame and
+    moving averages of what rendering the rest of a frame and dithering at each tier
+    has actually cost lately. A budget of 0 means no budget: always full quality.
+    """
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.costs = MovingAverages(DEFAULT_COSTS, max(DEFAULT_COSTS.values()))
+
+    def choose(self, cached: Iterable[str]) -> str:
+        """
+        The best tier that's either already made (in cached) or estimated to fit in what the
+        budget leaves after the rest of the frame; threshold, which only draws cached art, if none does.
+        """
+        if not self.budget_seconds:
+            return "full"
+        cached = set(cached)
+        spare = self.budget_seconds - self.costs.estimate("frame")
+        for tier in TIERS:
+            if tier in cached or (tier != "threshold" and self.costs.estimate(tier) <= spare):
+                return tier
+        return "threshold"
+
+    def record(self, cost: str, seconds: float) -> None:
+        """
+        Fold in a measured cost: a tier's name for dithering a cover at it, "frame" for the rest of a frame.
+        """
+        self.costs.record(cost, seconds)
+
+    def estimate(self, cost: str) -> float:
+        return self.costs.estimate(cost)
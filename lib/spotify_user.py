@@ -6,7 +6,7 @@ import random
 import sys
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
 from requests.exceptions import ReadTimeout
@@ -25,6 +25,9 @@ spotify_logger = logging.getLogger('spotipy.client')
 # See: https://developer.spotify.com/blog/2026-06-18-refresh-token-expiration
 REFRESH_TOKEN_LIFETIME_DAYS = 180
 
+# Album art is drawn at most 199px square, so any cover variant at least this big will do
+ALBUM_ART_MIN_SIZE = 199
+
 # Sentinel distinguishing "the API call itself failed" from a legitimate
 # `None` response (e.g. current_user_playing_track() returns None when
 # nothing is currently playing, which is not a failure).
@@ -84,6 +87,28 @@ def get_time_from_timedelta(td: timedelta) -> Tuple[int, int]:
     minutes = (td.seconds % 3600) // 60
     return hours, minutes
 
+def pick_album_image_url(images: List[Dict[str, Any]], min_size: int = ALBUM_ART_MIN_SIZE) -> Optional[str]:
+    """
+    Pick the smallest of an album's cover variants (Spotify usually lists 640, 300 and 64px)
+    that's still at least min_size on its short side, or the largest if none are.
+
+    Args:
+        images (List[Dict[str, Any]]): The album's "images" list from the Spotify API.
+        min_size (int): The smallest usable size in pixels.
+
+    Returns:
+        Optional[str]: The chosen image URL, or None if the album has no images.
+    """
+    if not images:
+        return None
+    sized = [image for image in images if image.get('width') and image.get('height')]
+    if not sized:
+        return images[0]['url']
+    big_enough = [image for image in sized if min(image['width'], image['height']) >= min_size]
+    if big_enough:
+        return min(big_enough, key=lambda image: image['width'] * image['height'])['url']
+    return max(sized, key=lambda image: image['width'] * image['height'])['url']
+
 def get_time_since_played(hours: int, minutes: int) -> str:
     """ 
     Get str representation of time since last played.
@@ -422,7 +447,7 @@ class SpotifyUser:
                 album_name: name of the album, or None if not a single user
         """
         if self.single_user:
-            return recent['item']['album']['images'][0]['url'], recent['item']['album']['name']
+            return pick_album_image_url(recent['item']['album']['images']), recent['item']['album']['name']
         return None, None
 
     def create_current_info(self, unix_timestamp: int, context_type: str, context_name: str, time_passed: str, track_name: str, artist_name: str, track_image_link: Optional[str], album_name: Optional[str]) -> Dict[str, Union[int, str, Optional[str]]]:
@@ -538,7 +563,7 @@ class SpotifyUser:
             return self.get_stored_json_info(self.ctx_io.read_json_ctx(self.right_side))
         track = tracks[0]
         track_name, artists = track['track']['name'], track['track']['artists']
-        track_image_link = track['track']['album']['images'][0]['url']
+        track_image_link = pick_album_image_url(track['track']['album']['images'])
         album_name = track['track']['album']['name']
         artist_name = ', '.join(artist['name'] for artist in artists)
         last_timestamp = track['played_at']
@@ -0,0 +1,107 @@
+import hashlib
+import os
+from array import array
+from typing import Dict, List
+
+from PIL import ImageFont
+
+from lib.clock_logging import logger
+
+# DS font sizes indexed the same way Draw's layout code does: {0, 1, 2} -> {16, 32, 64}
+DS_FONT_SIZES = (16, 32, 64)
+
+# Code points covered by the precomputed advance tables. Everything the old
+# hand-written width dicts knew about (Latin-1, curly quotes, €, ™) sits well
+# below this; anything above it (CJK, emoji, ...) goes through the memoized
+# FreeType fallback instead.
+TABLE_SIZE = 0x2200
+
+
+def font_fingerprint(font_path: str) -> str:
+    """
+    Short content hash of a font file, used to key anything derived from it on disk.
+    """
+    with open(font_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+class TextMetrics:
+    """
+    Integer advance-width tables for a TrueType font at several sizes.
+
+    Tables are derived once from the font itself via FreeType, so they agree with
+    what ImageDraw.text() actually renders, then stored as packed unsigned shorts
+    under cache/font_metrics/ (keyed by a fingerprint of the font file) so later
+    starts just read them back.
+    """
+    def __init__(self, font_path: str = "ePaperFonts/Nintendo-DS-BIOS.ttf", sizes: tuple = DS_FONT_SIZES, cache_dir: str = "cache/font_metrics"):
+        self.font_path = font_path
+        self.sizes = sizes
+        self.cache_dir = cache_dir
+        self.fonts = [ImageFont.truetype(font_path, size) for size in sizes]
+        self.fingerprint = font_fingerprint(font_path)
+        self.tables: List[array] = [self._load_or_build_table(i) for i in range(len(sizes))]
+        self._fallback: List[Dict[str, int]] = [{} for _ in sizes]
+
+    def _table_path(self, size_index: int) -> str:
+        stem = os.path.splitext(os.path.basename(self.font_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}_{self.sizes[size_index]}_{self.fingerprint}.bin")
+
+    def _load_or_build_table(self, size_index: int) -> array:
+        """
+        Reads the advance table for sizes[size_index] from disk, or builds it from
+        the font and writes it back if it's missing or truncated.
+        """
+        path = self._table_path(size_index)
+        table = array("H")
+        try:
+            with open(path, "rb") as f:
+                table.fromfile(f, TABLE_SIZE)
+            return table
+        except (OSError, EOFError):
+            table = array("H")
+
+        font = self.fonts[size_index]
+        table.extend(round(font.getlength(chr(cp))) for cp in range(TABLE_SIZE))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                table.tofile(f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("Failed to write font metrics %s: %s", path, e)
+        return table
+
+    def advance(self, c: str, size: int) -> int:
+        """
+        Return the advance width in pixels of a single character.
+
+        Args:
+            c (str): The character to measure.
+            size (int): {0, 1, 2} to denote DS font sizes {16, 32, 64}.
+        """
+        cp = ord(c)
+        if cp < TABLE_SIZE:
+            return self.tables[size][cp]
+        fallback = self._fallback[size]
+        width = fallback.get(c)
+        if width is None:
+            width = fallback[c] = round(self.fonts[size].getlength(c))
+        return width
+
+    def measure(self, text: str, size: int) -> int:
+        """
+        Return the width in pixels of a whole string.
+
+        Args:
+            text (str): The text to measure.
+            size (int): {0, 1, 2} to denote DS font sizes {16, 32, 64}.
+        """
+        if not 0 <= size < len(self.tables):
+            raise ValueError(f"Invalid size: {size}")
+        table = self.tables[size]
+        try:
+            return sum(table[ord(c)] for c in text)
+        except IndexError:
+            return sum(self.advance(c, size) for c in text)
@@ -0,0 +1,106 @@
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# (left, top, right, bottom), right/bottom exclusive like PIL crop/paste boxes
+Rect = Tuple[int, int, int, int]
+
+
+def rects_intersect(a: Rect, b: Rect) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class Widget:
+    """
+    One independently invalidated piece of the frame: the inputs it was last rendered
+    from, the rects it draws within, and a callable that draws it.
+    """
+    def __init__(self, name: str, inputs: Any, rects: List[Rect], render: Callable[[], None]):
+        self.name = name
+        self.inputs = inputs
+        self.rects = rects
+        self.render = render
+
+
+class WidgetTree:
+    """
+    Tracks which widgets of a retained canvas need re-rendering.
+
+    Every frame, callers update() each widget with its current inputs; a widget whose
+    inputs (or rects) changed is dirty. render() then works out the damaged area: the
+    old and new rects of every dirty widget, grown until it includes every widget
+    overlapping it (anything overlapping a cleared rect has to be redrawn too). It
+    clears the damage and re-renders just those widgets, in z-order, timing each one.
+    """
+    def __init__(self, order: List[str]):
+        self.order = order
+        self.widgets: Dict[str, Widget] = {}
+        self.dirty: Set[str] = set()
+        self.damage: List[Rect] = []
+        self.full_repaint = True
+        self.timings: Dict[str, float] = {}
+
+    def update(self, name: str, inputs: Any, rects: List[Rect], render: Callable[[], None]) -> bool:
+        """
+        Register a widget's current inputs. Returns True if that made it dirty.
+
+        The render callable is always replaced, so whatever runs is the latest closure
+        even when the widget is only redrawn because a neighbour damaged it.
+        """
+        widget = self.widgets.get(name)
+        if widget is not None and widget.inputs == inputs and widget.rects == rects:
+            widget.render = render
+            return False
+        if widget is not None and widget.rects != rects:
+            self.damage.extend(widget.rects)
+        self.damage.extend(rects)
+        self.widgets[name] = Widget(name, inputs, rects, render)
+        self.dirty.add(name)
+        return True
+
+    def invalidate_all(self) -> None:
+        """
+        Force the next render() to clear the whole canvas and redraw every widget.
+        """
+        self.full_repaint = True
+
+    def _render_order(self) -> List[str]:
+        return [name for name in self.order if name in self.widgets] + [name for name in self.widgets if name not in self.order]
+
+    def render(self, clear: Callable[[Optional[Rect]], None]) -> List[Rect]:
+        """
+        Clear the damaged area with clear(rect) (clear(None) for the whole canvas), then
+        re-render every affected widget.
+
+        Returns:
+            List[Rect]: The rects that were cleared and repainted, empty if nothing changed.
+        """
+        if self.full_repaint:
+            to_render = set(self.widgets)
+            damage = [rect for widget in self.widgets.values() for rect in widget.rects]
+            clear(None)
+        else:
+            to_render = set(self.dirty)
+            damage = list(self.damage)
+            grew = True
+            while grew:
+                grew = False
+                for name, widget in self.widgets.items():
+                    if name not in to_render and any(rects_intersect(r, d) for r in widget.rects for d in damage):
+                        to_render.add(name)
+                        damage.extend(widget.rects)
+                        grew = True
+            for rect in damage:
+                clear(rect)
+
+        timings = {}
+        for name in self._render_order():
+            if name in to_render:
+                start = perf_counter()
+                self.widgets[name].render()
+                timings[name] = perf_counter() - start
+        self.timings = timings
+
+        self.dirty.clear()
+        self.damage = []
+        self.full_repaint = False
+        return damage
@@ -1,6 +1,6 @@
 import logging
 import sys
-from lib.arg_parser import args
+from lib.arg_parser import args, main_parser
 from lib.clock import Clock
 from lib.clock_logging import logger
 
@@ -13,11 +13,12 @@ def _log_uncaught(exc_type, exc_value, exc_tb):
 
 
 if __name__ == "__main__":
+    main_parser().parse_args()
     logging.getLogger().setLevel(logging.INFO)
     sys.excepthook = _log_uncaught
 
     clock = Clock()
-    if args.local or (clock.local_run and not args.clock):
+    if args.local or (clock.local_run and not (args.clock or args.serve)):
         clock.build_image()
         clock.save_local_file()
     else:
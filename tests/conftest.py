@@ -0,0 +1,7 @@
+import os
+import sys
+
+# lib modules load fonts, icons and config by paths relative to the repo root
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO_DIR)
+sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,69 @@
+import os
+from typing import Optional
+
+from PIL import Image
+
+from lib.album_art_cache import VARIANTS, AlbumArtCache
+
+KEYS = [f"{n:016x}" for n in range(1, 7)]
+
+
+def write_cover(cache: AlbumArtCache, key: str, variant_bytes: int = 100, mtime: Optional[float] = None) -> None:
+    """
+    Write every variant of key as variant_bytes of filler, as the clock would after making them, and record it.
+    """
+    for variant in VARIANTS:
+        with open(cache.path(key, variant), "wb") as f:
+            f.write(bytes(variant_bytes))
+        if mtime is not None:
+            os.utime(cache.path(key, variant), (mtime, mtime))
+    cache.record(key)
+
+
+def on_disk(cache: AlbumArtCache) -> set:
+    return {key for key in ["NA"] + KEYS if all(os.path.exists(cache.path(key, variant)) for variant in VARIANTS)}
+
+
+def test_too_many_covers_evicts_the_oldest_but_never_na(tmp_path):
+    cache = AlbumArtCache(str(tmp_path), max_entries=3)
+    write_cover(cache, "NA")
+    for key in KEYS:
+        write_cover(cache, key)
+    assert on_disk(cache) == {"NA", KEYS[-2], KEYS[-1]}
+    assert list(cache.entries) == ["NA", KEYS[-2], KEYS[-1]]
+
+
+def test_too_many_bytes_evicts_the_oldest_but_never_na(tmp_path):
+    # every cover is 4 variants of 100 bytes, so 1000 bytes holds two of them
+    cache = AlbumArtCache(str(tmp_path), max_bytes=1000)
+    write_cover(cache, "NA")
+    for key in KEYS[:4]:
+        write_cover(cache, key)
+    assert on_disk(cache) == {"NA", KEYS[3]}
+    # even when NA alone is over the limit
+    write_cover(cache, "NA", variant_bytes=1000)
+    assert on_disk(cache) == {"NA"}
+
+
+def test_recency_survives_a_restart(tmp_path):
+    cache = AlbumArtCache(str(tmp_path), max_entries=3)
+    for i, key in enumerate(KEYS[:3]):
+        write_cover(cache, key, mtime=1_000_000 + i)
+    assert cache.lookup(KEYS[0], *VARIANTS)
+
+    restarted = AlbumArtCache(str(tmp_path), max_entries=3)
+    assert list(restarted.entries) == [KEYS[1], KEYS[2], KEYS[0]]
+    write_cover(restarted, KEYS[3])
+    assert on_disk(restarted) == {KEYS[0], KEYS[2], KEYS[3]}
+
+
+def test_put_writes_behind_and_evicts_once_flushed(tmp_path):
+    cache = AlbumArtCache(str(tmp_path), max_entries=3, max_memory_entries=2)
+    for key in ["NA"] + KEYS[:4]:
+        for variant in VARIANTS:
+            cache.put(key, variant, Image.new("L", (46, 46), 0x80))
+    # the newest covers are in memory straight away, whatever the disk is up to
+    assert list(cache.images) == [KEYS[2], KEYS[3]]
+    cache.flush()
+    assert on_disk(cache) == {"NA", KEYS[2], KEYS[3]}
+    assert cache.get("NA", "dither").size == (46, 46)
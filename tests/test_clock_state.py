@@ -0,0 +1,42 @@
+import json
+
+from lib.clock_state import ClockState, TrackState, freeze, thaw
+from lib.render_bench import FIXTURES_PATH
+
+FORECAST = {"1PM": {"temp": 74, "desc_icon_id": "01d"}, "4PM": {"temp": 77, "desc_icon_id": "03d"}}
+
+
+def make_state(**fields) -> ClockState:
+    track = TrackState("alice", "Song", "Band", "2m ago", "album", "Record")
+    defaults = {field: None for field in ClockState._fields}
+    defaults.update(time_str="12:34pm", dark_mode=False, user_1=track, album_name="", album_art_key="NA", detailed_weather=False)
+    defaults.update(fields)
+    return ClockState(**defaults)
+
+
+def test_equal_inputs_give_equal_hashable_states():
+    a = make_state(forecast=freeze(FORECAST))
+    b = make_state(forecast=freeze({key: dict(value) for key, value in FORECAST.items()}))
+    assert a == b and hash(a) == hash(b)
+    assert a.diff(b) == {}
+
+
+def test_diff_lists_changed_fields_and_user_fields():
+    old = make_state()
+    new = make_state(time_str="12:35pm", user_1=old.user_1._replace(track="Other Song", time_since="now"))
+    assert new.diff(old) == {
+        "time_str": ("12:34pm", "12:35pm"),
+        "user_1.track": ("Song", "Other Song"),
+        "user_1.time_since": ("2m ago", "now"),
+    }
+    assert set(new.diff(None)) == set(ClockState._fields)
+
+
+def test_forecasts_thaw_back_to_what_was_frozen():
+    with open(FIXTURES_PATH) as f:
+        forecast = json.load(f)["weather"]["four_hour_forecast"]
+    assert make_state(forecast=freeze(forecast)).forecast_dict() == forecast
+    # nothing is guessed from a value's shape: lists stay lists, and tuples of pairs stay tuples
+    odd = {"1PM": {"temps": [74, 75], "pairs": (("feels", 72),)}, "hours": []}
+    assert thaw(freeze(odd)) == odd
+    assert freeze({}) != freeze([])
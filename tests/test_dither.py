@@ -0,0 +1,29 @@
+import random
+
+import pytest
+from PIL import Image
+
+from lib.dither import ALGORITHMS, dither
+from lib.epd_buffer import FOUR_GRAY_LEVELS
+
+
+def random_cover(seed: int, size=(61, 47)) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new('RGB', size)
+    image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(size[0] * size[1])])
+    return image
+
+
+@pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+def test_dithering_leaves_only_the_four_gray_levels(algorithm):
+    cover = random_cover(14)
+    dithered = dither(cover, algorithm)
+    assert dithered.mode == 'L' and dithered.size == cover.size
+    assert set(dithered.getdata()) <= set(FOUR_GRAY_LEVELS)
+
+
+@pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+def test_flat_gray_levels_come_through_unchanged(algorithm):
+    for level in FOUR_GRAY_LEVELS:
+        flat = Image.new('L', (20, 20), level)
+        assert set(dither(flat, algorithm).getdata()) == {level}
@@ -0,0 +1,11 @@
+import math
+
+from lib.dither_bench import SIZES, bench, fixture_cover
+
+
+def test_fixture_cover_scores_every_algorithm():
+    assert fixture_cover() == fixture_cover()
+    results = bench([fixture_cover()], repeat=1)
+    assert {size for _, size in results} == set(SIZES)
+    for (name, size), (ms, score) in results.items():
+        assert math.isfinite(score), f"{name} at {size} dithered the fixture perfectly"
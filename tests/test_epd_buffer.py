@@ -0,0 +1,66 @@
+import random
+
+from PIL import Image
+
+from lib.epd_buffer import EPD_HEIGHT, EPD_WIDTH, pack_1bpp, pack_4gray
+
+
+# Pure Python ports of waveshare_epd.epd4in2's EPD.getbuffer() and EPD.getbuffer_4Gray(),
+# pixel loops and all, for the packers to match byte for byte
+def vendor_getbuffer(image, width=EPD_WIDTH, height=EPD_HEIGHT):
+    buf = [0xFF] * (int(width / 8) * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[int((x + y * width) / 8)] &= ~(0x80 >> (x % 8))
+    elif imwidth == height and imheight == width:
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = height - x - 1
+                if pixels[x, y] == 0:
+                    buf[int((newx + newy * width) / 8)] &= ~(0x80 >> (y % 8))
+    return bytearray(byte & 0xFF for byte in buf)
+
+
+def vendor_getbuffer_4gray(image, width=EPD_WIDTH, height=EPD_HEIGHT):
+    buf = [0xFF] * (int(width / 4) * height)
+    image_monocolor = image.convert('L')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    i = 0
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0xC0:
+                    pixels[x, y] = 0x80
+                elif pixels[x, y] == 0x80:
+                    pixels[x, y] = 0x40
+                i = i + 1
+                if i % 4 == 0:
+                    buf[int((x + (y * width)) / 4)] = ((pixels[x - 3, y] & 0xc0) | (pixels[x - 2, y] & 0xc0) >> 2 | (pixels[x - 1, y] & 0xc0) >> 4 | (pixels[x, y] & 0xc0) >> 6)
+    return bytearray(buf)
+
+
+def random_image(mode, size, seed, levels=None):
+    rng = random.Random(seed)
+    values = [rng.choice(levels) if levels else rng.randrange(256) for _ in range(size[0] * size[1])]
+    image = Image.new('L', size)
+    image.putdata(values)
+    return image.convert('1', dither=Image.Dither.NONE) if mode == '1' else image
+
+
+def test_pack_1bpp_matches_the_vendor_getbuffer():
+    for seed, mode, size in ((1, '1', (EPD_WIDTH, EPD_HEIGHT)), (2, 'L', (EPD_WIDTH, EPD_HEIGHT)), (3, '1', (EPD_HEIGHT, EPD_WIDTH)), (4, 'L', (EPD_HEIGHT, EPD_WIDTH))):
+        image = random_image(mode, size, seed)
+        assert pack_1bpp(image) == vendor_getbuffer(image), (mode, size)
+
+
+def test_pack_4gray_matches_the_vendor_getbuffer_4gray():
+    for seed, mode, levels in ((5, 'L', None), (6, 'L', [0x00, 0x80, 0xC0, 0xFF]), (7, '1', None)):
+        image = random_image(mode, (EPD_WIDTH, EPD_HEIGHT), seed, levels)
+        assert pack_4gray(image) == vendor_getbuffer_4gray(image), (mode, levels)
@@ -0,0 +1,47 @@
+import random
+
+from PIL import Image
+
+from lib.epd_buffer import pack_frame, unpack_buffer
+from lib.frame_ring import FrameRing, read_ring
+
+
+def random_frame(seed: int, mode: str) -> Image.Image:
+    rng = random.Random(seed)
+    levels = (0x00, 0x80, 0xC0, 0xFF) if mode == 'L' else (0x00, 0xFF)
+    image = Image.new('L', (400, 300))
+    image.putdata([rng.choice(levels) for _ in range(400 * 300)])
+    return image if mode == 'L' else image.convert('1')
+
+
+def test_ring_keeps_the_newest_frames_and_round_trips_them(tmp_path):
+    path = str(tmp_path / "frame_ring.bin")
+    ring = FrameRing(3, path)
+    frames = {}
+    for seq in range(1, 6):
+        image = random_frame(seq, 'L' if seq % 2 else '1')
+        buffer, bits = pack_frame(image)
+        assert ring.record(buffer, bits, "full", state_hash=seq * 1000, render_ms=seq / 2, timestamp=1_700_000_000 + seq * 60) == seq
+        frames[seq] = image
+    ring.close()
+
+    kept = read_ring(path)
+    assert [frame.seq for frame in kept] == [3, 4, 5]
+    for frame in kept:
+        assert (frame.state_hash, frame.render_ms, frame.timestamp, frame.mode) == (frame.seq * 1000, frame.seq / 2, 1_700_000_000 + frame.seq * 60, "full")
+        assert frame.bits == (2 if frame.seq % 2 else 1)
+        assert unpack_buffer(frame.buffer, frame.bits).tobytes() == frames[frame.seq].tobytes()
+
+
+def test_ring_picks_up_where_it_left_off(tmp_path):
+    path = str(tmp_path / "frame_ring.bin")
+    ring = FrameRing(2, path)
+    ring.record(bytes(15000), 1, "window", 1, 1.0, 1.0)
+    ring.close()
+    ring = FrameRing(2, path)
+    assert ring.record(bytes(15000), 1, "fast", 2, 1.0, 2.0) == 2
+    ring.close()
+    assert [(frame.seq, frame.mode) for frame in read_ring(path)] == [(1, "window"), (2, "fast")]
+    # a different slot count starts a new ring
+    FrameRing(4, path).close()
+    assert read_ring(path) == []
@@ -0,0 +1,69 @@
+import random
+
+from lib.frame_server import HEADER, MERGE_GAP, RUN, FrameServer, apply_delta, blank_buffer, encode_delta
+
+SIZE = 400 // 8 * 300
+
+
+def round_trip(buffer: bytes, base: bytes) -> bytes:
+    return bytes(apply_delta(bytearray(base), encode_delta(buffer, base)))
+
+
+def run_count(payload: bytes) -> int:
+    runs, offset = 0, 0
+    while offset < len(payload):
+        _, count = RUN.unpack_from(payload, offset)
+        offset += RUN.size + count
+        runs += 1
+    return runs
+
+
+def changed_at(base: bytes, positions) -> bytes:
+    buffer = bytearray(base)
+    for position in positions:
+        buffer[position] ^= 0x5A
+    return bytes(buffer)
+
+
+def test_delta_round_trips():
+    rng = random.Random(23)
+    base = bytes(rng.randrange(256) for _ in range(SIZE))
+    cases = {
+        "none changed": base,
+        "all changed": bytes(byte ^ 0xFF for byte in base),
+        "gap of MERGE_GAP": changed_at(base, (100, 100 + MERGE_GAP)),
+        "gap of MERGE_GAP + 1": changed_at(base, (100, 101 + MERGE_GAP)),
+        "last byte": changed_at(base, (SIZE - 1,)),
+        "first and last byte": changed_at(base, (0, SIZE - 1)),
+        "random": changed_at(base, rng.sample(range(SIZE), 500)),
+    }
+    for name, buffer in cases.items():
+        assert round_trip(buffer, base) == buffer, name
+    assert encode_delta(base, base) == b""
+    # changes MERGE_GAP apart share a run, one further apart start a new one
+    assert run_count(encode_delta(cases["gap of MERGE_GAP"], base)) == 1
+    assert run_count(encode_delta(cases["gap of MERGE_GAP + 1"], base)) == 2
+
+
+def test_delta_from_a_blank_frame_round_trips():
+    rng = random.Random(24)
+    buffer = bytes(rng.randrange(256) for _ in range(SIZE))
+    assert round_trip(buffer, bytes(blank_buffer(400, 300, 1))) == buffer
+
+
+def test_unknown_since_gets_a_delta_against_the_blank_frame():
+    server = FrameServer("127.0.0.1", 0)
+    try:
+        first, second = bytes(range(256)) * (SIZE // 256) + bytes(SIZE % 256), bytes(SIZE)
+        server.publish(first, 1, due=0)
+        server.publish(second, 1, due=60)
+        for since in (0, 99):
+            body = server.encode(since)
+            magic, _, bits, width, height, frame, base, due, length = HEADER.unpack_from(body)
+            assert (magic, bits, frame, base, due) == (b"EPDF", 1, 2, 0, 60)
+            buffer = apply_delta(blank_buffer(width, height, bits), body[HEADER.size:HEADER.size + length])
+            assert bytes(buffer) == second
+        _, _, _, _, _, _, base, _, length = HEADER.unpack_from(server.encode(1))
+        assert base == 1
+    finally:
+        server.httpd.server_close()
@@ -0,0 +1,63 @@
+from lib.draw import Draw
+from lib.layout_bench import generate_corpus, layout_one
+from lib.line_breaker import COLUMN_WIDTH, ELLIPSIS, SMALL_TRACK_MAX_ROWS, TRACK_MAX_ROWS, LineBreaker
+from lib.text_metrics import TextMetrics
+
+breaker = LineBreaker(TextMetrics())
+
+
+def test_lines_fit_the_column_and_keep_every_word():
+    text = "Symphony No. 9 in D minor, Op. 125 Choral: IV. Presto - Allegro assai - Alla marcia"
+    for size in (0, 1):
+        lines = breaker.break_text(text, size)
+        assert " ".join(lines) == text
+        assert all(breaker.text_metrics.measure(line, size) <= COLUMN_WIDTH for line in lines)
+
+
+def test_fewest_lines_then_least_ragged():
+    words = ["Hey", "Jude", "Don't", "Make", "It", "Bad"]
+    lines = breaker.break_text(" ".join(words), 2)
+    greedy, line = [], ""
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if line and breaker.text_metrics.measure(candidate, 2) > COLUMN_WIDTH:
+            greedy.append(line)
+            candidate = word
+        line = candidate
+    greedy.append(line)
+    assert len(lines) == len(greedy)
+
+    def raggedness(lines):
+        return sum((COLUMN_WIDTH - breaker.text_metrics.measure(line, 2)) ** 2 for line in lines[:-1])
+    assert raggedness(lines) <= raggedness(greedy)
+
+
+def test_words_wider_than_the_column_are_hyphenated():
+    word = "Supercalifragilisticexpialidocious" * 2
+    assert breaker.break_text(word, 1, hyphenate=False) is None
+    lines = breaker.break_text(word, 1)
+    assert len(lines) > 1
+    assert all(line.endswith("-") for line in lines[:-1])
+    assert "".join(line[:-1] for line in lines[:-1]) + lines[-1] == word
+    assert all(breaker.text_metrics.measure(line, 1) <= COLUMN_WIDTH for line in lines)
+
+
+def test_track_drops_to_a_smaller_tier_when_it_needs_too_many_rows():
+    assert breaker.layout_track("Let It Be") == (2, ["Let It Be"])
+    size, lines = breaker.layout_track("The Long and Winding Road to Nowhere in Particular")
+    assert size == 1 and len(lines) <= TRACK_MAX_ROWS[1]
+
+
+def test_fuzz_corpus_has_no_track_artist_overlaps():
+    draw = Draw(True)
+    overlaps = [(r.track, r.artist) for r in (layout_one(draw, track, artist) for track, artist in generate_corpus(3000, 1)) if r.overlap]
+    assert overlaps == []
+
+
+def test_small_track_is_cut_to_its_row_cap_with_an_ellipsis():
+    draw = Draw(True)
+    size, lines = draw.line_breaker.layout_track(" ".join(["Allegro"] * 200))
+    assert size == 0
+    assert len(lines) == SMALL_TRACK_MAX_ROWS
+    assert lines[-1].endswith(ELLIPSIS)
+    assert draw.text_metrics.measure(lines[-1], 0) <= COLUMN_WIDTH
@@ -0,0 +1,36 @@
+from PIL import Image, ImageDraw
+
+from lib.epd_buffer import EPD_HEIGHT, EPD_WIDTH, pack_1bpp
+from lib.fake_epd import FakeEPD
+from lib.partial_refresh import align_window, display_window
+
+
+def test_window_is_widened_to_whole_bytes_and_clipped():
+    assert align_window((205, 40, 330, 110), EPD_WIDTH, EPD_HEIGHT) == (200, 40, 336, 110)
+    assert align_window((-3, -1, 401, 320), EPD_WIDTH, EPD_HEIGHT) == (0, 0, EPD_WIDTH, EPD_HEIGHT)
+
+
+def test_window_push_sends_just_the_box():
+    epd = FakeEPD(time_scale=0)
+    epd.init()
+    frame = Image.new('1', (EPD_WIDTH, EPD_HEIGHT), 1)
+    ImageDraw.Draw(frame).rectangle((210, 50, 320, 100), fill=0)
+    box = align_window((205, 40, 330, 110), EPD_WIDTH, EPD_HEIGHT)
+
+    sent = display_window(epd, frame, box)
+    assert sent == (box[2] - box[0]) // 8 * (box[3] - box[1])
+    _, mode, buf = epd.pushes[-1]
+    assert mode == "window"
+    assert buf == bytes(pack_1bpp(frame.crop(box), box[2] - box[0], box[3] - box[1]))
+
+
+def test_full_push_after_a_window_push_sees_the_whole_panel():
+    epd = FakeEPD(time_scale=0)
+    epd.init()
+    frame = Image.new('1', (EPD_WIDTH, EPD_HEIGHT), 1)
+    display_window(epd, frame, align_window((205, 40, 330, 110), EPD_WIDTH, EPD_HEIGHT))
+    assert epd.ram_window() == epd._full_window()
+
+    epd.display(pack_1bpp(frame, EPD_WIDTH, EPD_HEIGHT))
+    epd.display_Fast(pack_1bpp(frame, EPD_WIDTH, EPD_HEIGHT))
+    assert [mode for _, mode, _ in epd.pushes] == ["window", "full", "fast"]
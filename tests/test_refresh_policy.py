@@ -0,0 +1,40 @@
+from lib.refresh_policy import GhostingPolicy, RefreshPolicy
+
+SIZE = (400, 300)
+DIGITS = (200, 40, 330, 110)
+
+
+def push(policy, changed_box, now, dark_mode=False):
+    decision = policy.decide(SIZE, changed_box, dark_mode, now)
+    policy.record(decision, now)
+    return decision.mode, decision.reason
+
+
+def test_plain_policy_always_refreshes_fully():
+    assert RefreshPolicy().decide(SIZE, DIGITS, False).mode == "full"
+    assert RefreshPolicy(four_gray_scale=True).decide(SIZE, DIGITS, False).mode == "4gray"
+
+
+def test_windows_until_the_ghosting_budget_is_spent():
+    policy = GhostingPolicy(*SIZE, windowed=True, ghosting_budget=2, full_interval=3600)
+    pushes = [push(policy, DIGITS, 60 * minute) for minute in range(5)]
+    assert pushes == [("full", "first"), ("window", "partial"), ("window", "partial"), ("full", "ghosting"), ("window", "partial")]
+    assert policy.decide(SIZE, DIGITS, False, 300).box == DIGITS
+
+
+def test_other_reasons_for_a_full_refresh():
+    policy = GhostingPolicy(*SIZE, windowed=False, ghosting_budget=10, full_interval=600)
+    assert push(policy, DIGITS, 0) == ("full", "first")
+    # V1 panels get a fast refresh of the whole buffer instead of a window
+    assert push(policy, DIGITS, 60) == ("fast", "partial")
+    assert push(policy, (0, 0) + SIZE, 120) == ("full", "whole_frame")
+    assert push(policy, DIGITS, 180, dark_mode=True) == ("full", "dark_mode")
+    assert push(policy, DIGITS, 240) == ("fast", "partial")
+    assert push(policy, DIGITS, 780) == ("full", "interval")
+
+
+def test_power_budget_puts_off_interval_refreshes():
+    policy = GhostingPolicy(*SIZE, windowed=True, ghosting_budget=10, full_interval=60, power_budget=1.5)
+    assert push(policy, DIGITS, 0) == ("full", "first")
+    assert push(policy, DIGITS, 120) == ("window", "partial")
+    assert policy.decisions["deferred:power"] == 1
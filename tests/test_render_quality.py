@@ -0,0 +1,37 @@
+import json
+from datetime import datetime as dt, timedelta
+
+from lib.album_art_cache import album_art_cache
+from lib.render_bench import FIXTURES_PATH, FixtureClock, scenario_settings
+from lib.render_quality import ArtQuality
+
+
+def test_cheapest_tier_that_fits_or_is_cached():
+    assert ArtQuality(0).choose([]) == "full"
+    # 1s leaves 0.5s after the default frame estimate: enough for ordered, not full
+    assert ArtQuality(1.0).choose([]) == "ordered"
+    assert ArtQuality(1.0).choose(["full"]) == "full"
+    # nothing fits in 0.3s, and threshold is never made during a frame, however cheap
+    assert ArtQuality(0.3).choose([]) == "threshold"
+    assert ArtQuality(0.3).choose(["threshold", "ordered"]) == "ordered"
+
+
+def test_threshold_tier_shows_cached_art_until_the_upgrade():
+    with open(FIXTURES_PATH) as f:
+        fixtures = json.load(f)
+    with scenario_settings({"single_user": True, "four_gray_scale": True, "render_budget_seconds": 0.01}):
+        clock = FixtureClock(fixtures, fixtures["scenarios"]["four_gray_budget"])
+        try:
+            clock.build_image("12:34pm")
+            cover = clock.pending_album_art
+            assert cover not in (None, "NA")
+            assert (clock.rendered_state.album_art_key, clock.rendered_state.album_art_tier) == ("NA", "full")
+            # nothing of the new cover was dithered during the frame
+            assert not any(variant.endswith(("dither", "threshold")) for variant in album_art_cache.images.get(cover, {}))
+
+            clock.upgrade_album_art(dt.now() + timedelta(minutes=10))
+            clock.build_image("12:35pm")
+            assert clock.pending_album_art is None
+            assert (clock.rendered_state.album_art_key, clock.rendered_state.album_art_tier) == (cover, "full")
+        finally:
+            clock.close()
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime as dt
+
+from lib.fake_epd import FakeEPD
+from lib.render_bench import FIXTURES_PATH, FixtureClock, scenario_settings
+
+
+class PanelClock(FixtureClock):
+    """
+    A FixtureClock pushing its frames to a FakeEPD instead of saving them.
+    """
+    def make_epd(self) -> FakeEPD:
+        epd = FakeEPD(time_scale=0)
+        epd.init_fast(epd.Seconds_1_5S)
+        return epd
+
+
+def test_full_push_follows_window_pushes_cleanly():
+    with open(FIXTURES_PATH) as f:
+        fixtures = json.load(f)
+    settings = {"partial_update": True, "partial_refresh_budget": 2, "full_refresh_interval_minutes": 60}
+    with scenario_settings(settings):
+        clock = PanelClock(fixtures, fixtures["scenarios"]["two_user"])
+        try:
+            for minute in range(34, 39):
+                clock.build_image(f"12:{minute}pm")
+                clock.show_frame(dt.now())
+        finally:
+            clock.close()
+    modes = [mode for _, mode, _ in clock.epd.pushes]
+    assert modes == ["full", "window", "window", "full", "window"]
+    assert clock.epd.ram_window() == clock.epd._full_window()